@@ -1,42 +1,62 @@
-from flask import Flask, render_template, request, jsonify
-import pandas as pd
+from flask import Flask, Response, g, render_template, request, jsonify
 import os
-from data_preprocessing import get_team_stats, prepare_features
-from model_training import train_models, save_models, load_models, MODELS_DIR
-from prediction_functions import predict_match_result, predict_score, predict_ht_ft, predict_btts
-from prediction import get_team_performance_stats
+import time
+from data_preprocessing import get_team_stats
+from model_store import save_models
+from model_registry import model_registry
+from prediction import get_team_performance_stats, get_last_matches, get_head_to_head_matches
+from batch_prediction import predict_fixtures
+from prediction_batcher import PredictionBatcher
+from prediction_matrix import predict_match, refresh_registry_matrix
+from model_warmup import ModelWarmup, RETRY_AFTER
+from latency_metrics import latency_metrics
+from profiling import REQUEST_PROFILING, start_profiler, save_profile
 
 app = Flask(__name__)
 
-def init_models():
-    """Modelleri yükler veya yeniden eğitir."""
-    try:
-        # Önce kaydedilmiş modelleri yüklemeyi dene
-        models, scaler = load_models()
-        if models is not None and scaler is not None:
-            print("Kaydedilmiş modeller başarıyla yüklendi.")
-            return models, scaler
-        
-        print("Kaydedilmiş modeller bulunamadı. Yeniden eğitiliyor...")
-        
-        # Tüm takımların verilerini birleştir
-        all_data = []
-        for file in os.listdir('stats'):
-            if file.endswith('.csv'):
-                team_name = file[:-4]
-                team_data = get_team_stats(team_name)
-                all_data.append(team_data)
-        
-        # Özellikleri hazırla
-        features, y_match, y_score, y_htft, y_btts = prepare_features(pd.concat(all_data))
-        
-        # Modelleri eğit
-        models, scaler = train_models(features, y_match, y_score, y_htft, y_btts)
+def load_or_train_models():
+    """
+    Modelleri yükler veya yeniden eğitir; hata durumunda istisnayı çağırana bırakır.
+    Eğitim modülleri yalnızca güncelleme veya eğitim gerektiğinde yüklenir; sunucunun
+    açılışı sklearn'ün eğitim yığınını beklemez.
+    """
+    from training_data import load_training_data
+    from model_training import train_models, update_models, build_training_state
+    
+    # Önce kaydedilmiş modelleri yüklemeyi dene
+    models, scaler = model_registry.load()
+    if models is not None and scaler is not None:
+        print("Kaydedilmiş modeller başarıyla yüklendi.")
+        model_registry.print_report()
         
-        # Modelleri kaydet
-        save_models(models, scaler)
-        print("Modeller eğitildi ve kaydedildi.")
+        # Son eğitimden sonra eklenen maçlarla modelleri artımlı güncelle
+        models, scaler, training_state = update_models(models, scaler)
+        if training_state is not None:
+            save_models(models, scaler, training_state=training_state)
+            model_registry.set(models, scaler)
+            print("Modeller yeni maçlarla güncellendi ve kaydedildi.")
         return models, scaler
+    
+    print("Kaydedilmiş modeller bulunamadı. Yeniden eğitiliyor...")
+    
+    # Eğitim verisini takım takım, önceden ayrılmış float32 matrise oku
+    features, y_match, y_score, y_htft, y_btts = load_training_data()
+    
+    # Modelleri eğit
+    models, scaler = train_models(features, y_match, y_score, y_htft, y_btts)
+    
+    # Modelleri kaydet
+    save_models(models, scaler, training_state=build_training_state())
+    model_registry.set(models, scaler)
+    print("Modeller eğitildi ve kaydedildi.")
+    return models, scaler
+
+def init_models():
+    """
+    Modelleri yükler veya yeniden eğitir; hata olursa (None, None) döndürür.
+    """
+    try:
+        return load_or_train_models()
     except Exception as e:
         print(f"Model eğitimi sırasında hata oluştu: {str(e)}")
         return None, None
@@ -158,64 +178,97 @@ def analyze_team_comparison(home_team, away_team, home_stats, away_stats):
         'conclusion': conclusion
     }
 
-def get_last_matches(team_data, count=5):
-    """Takımın son maçlarını döndürür."""
-    last_matches = []
-    for _, match in team_data.head(count).iterrows():
-        result = {
-            'date': match['Tarih'],
-            'opponent': match['Rakip'],
-            'is_home': match['Ev Sahibi/Deplasman'] == 'Ev Sahibi',
-            'score': f"{match['MS Gol']}-{match['MS Yenilen Gol']}",
-            'result': 'Galibiyet' if match['MS Gol'] > match['MS Yenilen Gol'] else 
-                     'Beraberlik' if match['MS Gol'] == match['MS Yenilen Gol'] else 'Mağlubiyet'
-        }
-        last_matches.append(result)
-    return last_matches
-
-def get_head_to_head_matches(home_team, away_team, home_data, away_data):
-    """İki takım arasındaki son karşılaşmaları döndürür."""
-    h2h_matches = []
-    
-    # Ev sahibi takımın maçlarından bul
-    for _, match in home_data.iterrows():
-        if match['Rakip'] == away_team:
-            h2h_matches.append({
-                'date': match['Tarih'],
-                'home_team': home_team,
-                'away_team': away_team,
-                'score': f"{match['MS Gol']}-{match['MS Yenilen Gol']}",
-                'result': 'Ev Sahibi Galip' if match['MS Gol'] > match['MS Yenilen Gol'] else 
-                         'Beraberlik' if match['MS Gol'] == match['MS Yenilen Gol'] else 'Deplasman Galip'
-            })
-    
-    # Deplasman takımın maçlarından bul
-    for _, match in away_data.iterrows():
-        if match['Rakip'] == home_team:
-            h2h_matches.append({
-                'date': match['Tarih'],
-                'home_team': away_team,
-                'away_team': home_team,
-                'score': f"{match['MS Yenilen Gol']}-{match['MS Gol']}",  # Skorları ters çevir
-                'result': 'Ev Sahibi Galip' if match['MS Gol'] > match['MS Yenilen Gol'] else 
-                         'Beraberlik' if match['MS Gol'] == match['MS Yenilen Gol'] else 'Deplasman Galip'
-            })
-    
-    # Tarihe göre sırala
-    h2h_matches.sort(key=lambda x: x['date'], reverse=True)
-    return h2h_matches[:5]  # Son 5 maç
-
-# Modelleri yükle
-print("\nModeller yükleniyor...")
-models, scaler = init_models()
+def warm_up_models():
+    """
+    Modelleri yükler veya eğitir ve tüm takım eşleşmelerinin tahminlerini önceden
+    hesaplar (değişen takımlar yeniden hesaplanır). Arka plan işçisinde çalışır.
+    """
+    print("\nModeller yükleniyor...")
+    # Hata /readyz'de görünsün diye init_models yerine istisna fırlatan yol kullanılır
+    load_or_train_models()
+    refresh_registry_matrix(model_registry)
+    print("Modeller hazır.")
 
-if models is None or scaler is None:
-    print("HATA: Modeller yüklenemedi!")
-    exit(1)
+# Sunucu modelleri beklemeden açılır; modeller arka planda yüklenir. debug modunda
+# yeniden yükleyicinin dosya izleyen ana süreci istek almadığı için modelleri yüklemez.
+model_warmup = ModelWarmup(warm_up_models)
+if __name__ != '__main__' or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+    model_warmup.start()
 
 # Takım listesini al
 teams = get_available_teams()
 
+# API isteklerini kısa bir pencerede toplayıp tek model çağrısında hesaplayan işçi
+batcher = PredictionBatcher(lambda pairs: predict_fixtures(pairs, *model_registry.load()))
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_time(response):
+    started = g.pop('request_started', None)
+    if started is not None and latency_metrics.enabled:
+        latency_metrics.observe('request', (request.endpoint or 'bilinmeyen',), time.perf_counter() - started)
+    return response
+
+def profiling_requested():
+    """
+    İstek ?profile=1 veya X-Profile: 1 başlığıyla profil istiyorsa True döndürür.
+    cProfile yalnızca isteği işleyen iş parçacığını ölçer; bu yüzden profillenen
+    /api/predict istekleri PredictionBatcher işçisine gönderilmeden aynı iş
+    parçacığında hesaplanır (başka isteklerle birleştirilmez).
+    """
+    flags = (request.args.get('profile'), request.headers.get('X-Profile'))
+    return REQUEST_PROFILING and any(flag in ('1', 'true') for flag in flags)
+
+@app.before_request
+def start_request_profiler():
+    if profiling_requested():
+        g.profiler = start_profiler()
+
+@app.after_request
+def save_request_profile(response):
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        path = save_profile(profiler, f"web-{request.endpoint or 'bilinmeyen'}")
+        response.headers['X-Profile-File'] = path
+        print(f"İstek profili {path} dosyasına kaydedildi.")
+    return response
+
+@app.teardown_request
+def stop_request_profiler(exc):
+    # İstek hata ile biterse after_request çalışmaz; profil yine de kaydedilir
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        print(f"İstek profili {save_profile(profiler, 'web-hata')} dosyasına kaydedildi.")
+
+@app.before_request
+def require_models():
+    """
+    Modeller hazır olana kadar tahmin isteklerine beklemeden 503 ve Retry-After döndürür;
+    ana sayfa kendini yenileyen bir "hazırlanıyor" sayfası gösterir.
+    """
+    # Çatallanan süreçlerde (gunicorn --preload) hazırlık burada yeniden başlatılır
+    model_warmup.start()
+    if model_warmup.is_ready() or request.endpoint not in ('index', 'api_predict'):
+        return None
+    status = model_warmup.status()
+    if request.endpoint == 'api_predict':
+        response = jsonify({'error': "Modeller hazırlanıyor, lütfen daha sonra tekrar deneyin.", **status})
+        response.status_code = 503
+    else:
+        response = Response(render_template('warming_up.html', status=status, retry_after=RETRY_AFTER), status=503)
+    response.headers['Retry-After'] = str(RETRY_AFTER)
+    return response
+
+def render_index(**context):
+    """
+    Ana sayfa şablonunu oluşturur ve süresini ölçer.
+    """
+    with latency_metrics.timed('render_template'):
+        return render_template('index.html', **context)
+
 @app.route('/', methods=['GET', 'POST'])
 def index():
     if request.method == 'POST':
@@ -223,10 +276,10 @@ def index():
         away_team = request.form.get('away_team')
         
         if not home_team or not away_team:
-            return render_template('index.html', teams=teams, error="Lütfen her iki takımı da seçin.")
+            return render_index(teams=teams, error="Lütfen her iki takımı da seçin.")
         
         if home_team == away_team:
-            return render_template('index.html', teams=teams, error="Aynı takımı iki kez seçemezsiniz.")
+            return render_index(teams=teams, error="Aynı takımı iki kez seçemezsiniz.")
         
         # Takım istatistiklerini al
         home_data = get_team_stats(home_team)
@@ -239,13 +292,15 @@ def index():
         # Son maçları al
         home_last_matches = get_last_matches(home_data)
         away_last_matches = get_last_matches(away_data)
-        h2h_matches = get_head_to_head_matches(home_team, away_team, home_data, away_data)
+        h2h_matches = get_head_to_head_matches(home_team, away_team)
         
-        # Tahminleri yap
-        match_result = predict_match_result(home_team, away_team, models, scaler)
-        home_goals, away_goals, score_prob = predict_score(home_team, away_team, models, scaler)
-        ht_ft_result, ht_ft_prob = predict_ht_ft(home_team, away_team, models, scaler)
-        btts_result, btts_prob = predict_btts(home_team, away_team, models, scaler)
+        # Tahminleri önceden hesaplanmış matristen al (yoksa modellerle hesaplanır)
+        with latency_metrics.timed('predict_match'):
+            prediction = predict_match(home_team, away_team, model_registry)
+        match_result = prediction['match_result']
+        home_goals, away_goals, score_prob = prediction['score']
+        ht_ft_result, ht_ft_prob = prediction['htft']
+        btts_result, btts_prob = prediction['btts']
         
         # Takım karşılaştırma analizini yap
         analysis = analyze_team_comparison(home_team, away_team, home_stats, away_stats)
@@ -271,10 +326,117 @@ def index():
             }
         }
         
-        return render_template('index.html', teams=teams, predictions=predictions, 
-                             home_team=home_team, away_team=away_team)
+        return render_index(teams=teams, predictions=predictions, 
+                            home_team=home_team, away_team=away_team)
     
-    return render_template('index.html', teams=teams)
+    return render_index(teams=teams)
+
+def parse_fixtures(payload):
+    """
+    API isteğinden (ev sahibi, deplasman) listesini çıkarır.
+    Tek maç nesnesi, maç listesi veya {"fixtures": [...]} kabul edilir.
+    Hata varsa (None, hata mesajı) döndürür.
+    """
+    if isinstance(payload, dict) and 'fixtures' in payload:
+        fixtures = payload['fixtures']
+    elif isinstance(payload, dict):
+        fixtures = [payload]
+    else:
+        fixtures = payload
+    
+    if not isinstance(fixtures, list) or not fixtures:
+        return None, "En az bir maç belirtilmelidir."
+    
+    pairs = []
+    for fixture in fixtures:
+        if not isinstance(fixture, dict):
+            return None, "Her maç home_team ve away_team alanları olan bir nesne olmalıdır."
+        home_team = fixture.get('home_team')
+        away_team = fixture.get('away_team')
+        if not home_team or not away_team:
+            return None, "Lütfen her iki takımı da seçin."
+        if home_team == away_team:
+            return None, "Aynı takımı iki kez seçemezsiniz."
+        for team in (home_team, away_team):
+            if team not in teams:
+                return None, f"Bilinmeyen takım: {team}"
+        pairs.append((home_team, away_team))
+    return pairs, None
+
+def format_api_prediction(home_team, away_team, row):
+    """
+    Toplu tahmin satırını index sayfasındaki tahmin türleriyle aynı JSON yapısına çevirir.
+    """
+    if row is None:
+        return {'home_team': home_team, 'away_team': away_team, 'error': "Takım verisi hazırlanamadı."}
+    return {
+        'home_team': home_team,
+        'away_team': away_team,
+        'match_result': {
+            'home_win': float(row['home_win']),
+            'draw': float(row['draw']),
+            'away_win': float(row['away_win'])
+        },
+        'score': {
+            'home_goals': int(row['home_goals']),
+            'away_goals': int(row['away_goals']),
+            'probability': float(row['score_prob'])
+        },
+        'iy_ms': {'result': row['htft'], 'probability': float(row['htft_prob'])},
+        'kg': {'result': row['btts'], 'probability': float(row['btts_prob'])},
+        'best': {'prediction': row['best'], 'probability': float(row['best_prob'])}
+    }
+
+@app.route('/api/predict', methods=['POST'])
+def api_predict():
+    """
+    Bir veya birden fazla maçın tahminlerini JSON olarak döndürür.
+    Eşzamanlı istekler tek bir vektörel model çağrısında birleştirilir.
+    """
+    started = time.perf_counter()
+    pairs, error = parse_fixtures(request.get_json(silent=True))
+    if error:
+        return jsonify({'error': error}), 400
+    
+    try:
+        if g.get('profiler') is not None:
+            rows, timing = batcher.predict_inline(pairs)
+        else:
+            rows, timing = batcher.predict(pairs)
+    except Exception as e:
+        return jsonify({'error': f"Tahmin sırasında bir hata oluştu: {str(e)}"}), 500
+    
+    timing['total_ms'] = (time.perf_counter() - started) * 1000
+    return jsonify({
+        'predictions': [format_api_prediction(home, away, row) for (home, away), row in zip(pairs, rows)],
+        'timing': timing
+    })
+
+@app.route('/healthz')
+def healthz():
+    """
+    Canlılık kontrolü: süreç istek alabiliyorsa modellerden bağımsız olarak 200 döndürür.
+    """
+    return jsonify({'status': 'ok'})
+
+@app.route('/readyz')
+def readyz():
+    """
+    Hazırlık kontrolü: modeller yüklenip tahmin matrisi hazırlanınca 200, öncesinde
+    veya hazırlık başarısız olduysa 503 döndürür.
+    """
+    status = model_warmup.status()
+    if model_warmup.is_ready():
+        status['model_version'] = model_registry.version
+        return jsonify(status)
+    return jsonify(status), 503
+
+@app.route('/metrics')
+def metrics():
+    """
+    Aşama, model ve istek sürelerinin histogramlarını Prometheus metin biçiminde döndürür.
+    """
+    return Response(latency_metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
 
 if __name__ == '__main__':
     app.run(debug=True) 
\ No newline at end of file
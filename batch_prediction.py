@@ -0,0 +1,143 @@
+import argparse
+import itertools
+import numpy as np
+import pandas as pd
+from data_preprocessing import team_form_vector
+from latency_metrics import latency_metrics
+from model_store import load_models
+from prediction_functions import MARKET_COMBINERS, team_market_outputs
+from utils import list_teams
+
+def build_team_matrix(teams, scaler):
+    """
+    Takımların son 5 maç ortalamasından ölçeklenmiş özellik matrisini hazırlar.
+    Veri okunamayan takımlar atlanır; matrise giren takımların listesi de döndürülür.
+    """
+    rows = []
+    valid_teams = []
+    for team in teams:
+        try:
+            rows.append(team_form_vector(team, 5))
+            valid_teams.append(team)
+        except Exception as e:
+            print(f"{team} için veri hazırlanamadı: {str(e)}")
+    
+    if not rows:
+        return valid_teams, None
+    
+    # Ölçekleme satır bazlı olduğu için tüm takımlar tek seferde ölçeklenir
+    with latency_metrics.timed('scaler_transform'):
+        return valid_teams, scaler.transform(np.vstack(rows))
+
+def predict_fixtures(pairs, models, scaler):
+    """
+    Verilen (ev sahibi, deplasman) eşleşmelerinin tüm tahminlerini tek seferde yapar.
+    Her takımın özellik vektörü bir kez hazırlanır ve her model tüm takım matrisi
+    üzerinde yalnızca bir kez çalıştırılır. Sonuçlar DataFrame olarak döndürülür.
+    """
+    pairs = list(pairs)
+    teams = sorted({team for pair in pairs for team in pair})
+    valid_teams, X_scaled = build_team_matrix(teams, scaler)
+    
+    # Verisi olmayan takımların maçlarını çıkar
+    team_index = {team: i for i, team in enumerate(valid_teams)}
+    pairs = [(home, away) for home, away in pairs if home in team_index and away in team_index]
+    
+    columns = [
+        'home_team', 'away_team', 'home_win', 'draw', 'away_win',
+        'home_goals', 'away_goals', 'score_prob', 'htft', 'htft_prob',
+        'btts', 'btts_prob', 'best', 'best_prob'
+    ]
+    if not pairs:
+        return pd.DataFrame(columns=columns)
+    
+    home_idx = np.array([team_index[home] for home, _ in pairs])
+    away_idx = np.array([team_index[away] for _, away in pairs])
+    
+    results = {}
+    for market, combine in MARKET_COMBINERS.items():
+        outputs = team_market_outputs(market, X_scaled, models)
+        results[market] = combine(outputs, home_idx, away_idx)
+    
+    home_win, draw, away_win = results['match_result']
+    home_goals, away_goals, score_prob = results['score']
+    htft, htft_prob = results['htft']
+    btts, btts_prob = results['btts']
+    
+    # En yüksek olasılıklı tahmin (get_highest_probability_prediction ile aynı sıra)
+    best_labels = np.array(['Ev Sahibi Kazanır', 'Beraberlik', 'Deplasman Kazanır',
+                            'Tahmini Skor', 'İY/MS', 'Karşılıklı Gol'])
+    best_matrix = np.vstack([home_win, draw, away_win, score_prob, htft_prob, btts_prob])
+    best_idx = np.argmax(best_matrix, axis=0)
+    
+    return pd.DataFrame({
+        'home_team': [home for home, _ in pairs],
+        'away_team': [away for _, away in pairs],
+        'home_win': home_win,
+        'draw': draw,
+        'away_win': away_win,
+        'home_goals': home_goals,
+        'away_goals': away_goals,
+        'score_prob': score_prob,
+        'htft': htft,
+        'htft_prob': htft_prob,
+        'btts': btts,
+        'btts_prob': btts_prob,
+        'best': best_labels[best_idx],
+        'best_prob': best_matrix[best_idx, np.arange(len(pairs))]
+    }, columns=columns)
+
+def all_fixture_pairs(teams=None):
+    """
+    Takımlar arasındaki tüm (ev sahibi, deplasman) eşleşmelerini döndürür.
+    """
+    if teams is None:
+        teams = list_teams()
+    return list(itertools.permutations(teams, 2))
+
+def read_fixture_file(path):
+    """
+    home_team,away_team sütunlarına sahip CSV dosyasından fikstürü okur.
+    """
+    fixtures = pd.read_csv(path, encoding='utf-8')
+    return list(zip(fixtures['home_team'], fixtures['away_team']))
+
+def main(argv=None):
+    """
+    Toplu tahmin komut satırı arayüzü.
+    """
+    parser = argparse.ArgumentParser(description="Fikstür listesi için toplu maç tahmini")
+    parser.add_argument('fixtures', nargs='*', help="'Ev Sahibi:Deplasman' biçiminde maçlar")
+    parser.add_argument('--file', help="home_team,away_team sütunlu fikstür CSV dosyası")
+    parser.add_argument('--all-pairs', action='store_true', help="Tüm takım eşleşmelerini tahmin et")
+    parser.add_argument('--output', help="Sonuçların yazılacağı CSV dosyası")
+    args = parser.parse_args(argv)
+    
+    pairs = []
+    for fixture in args.fixtures:
+        teams = fixture.split(':')
+        if len(teams) != 2 or not all(team.strip() for team in teams):
+            parser.error(f"Geçersiz maç: '{fixture}' ('Ev Sahibi:Deplasman' biçiminde olmalıdır)")
+        pairs.append(tuple(teams))
+    if args.file:
+        pairs.extend(read_fixture_file(args.file))
+    if args.all_pairs:
+        pairs.extend(all_fixture_pairs())
+    if not pairs:
+        parser.error("En az bir maç, --file veya --all-pairs belirtilmelidir.")
+    
+    models, scaler = load_models()
+    if models is None:
+        print("HATA: Modeller yüklenemedi! Önce main.py ile modelleri eğitin.")
+        return 1
+    
+    predictions = predict_fixtures(pairs, models, scaler)
+    if args.output:
+        predictions.to_csv(args.output, index=False, encoding='utf-8')
+        print(f"{len(predictions)} maç tahmini {args.output} dosyasına kaydedildi.")
+    else:
+        print(predictions.to_string(index=False))
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,677 @@
+import argparse
+import ast
+import contextlib
+import copy
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import numpy as np
+import pandas as pd
+from data_preprocessing import (
+    preprocess_team_data, clean_percentage, clean_numeric, parse_date,
+    clean_percentage_column, clean_numeric_column, parse_date_column,
+    NUMERIC_COLUMNS, PERCENTAGE_COLUMNS, get_team_stats, prepare_features,
+    team_form_vector, team_stats_cache, get_head_to_head_stats
+)
+from feature_store import load_all_teams
+from prediction import format_date, get_last_matches, get_head_to_head_matches, recent_match_records
+
+# Kayıtlı benchmark fonksiyonları
+BENCHMARKS = {}
+
+# Model eğiten, dakikalar süren benchmarklar; yalnızca adıyla veya --all ile çalışır
+SLOW_BENCHMARKS = set()
+
+# --baseline değer verilmeden kullanıldığında karşılaştırılan sonuç dosyası
+BASELINE_FILE = 'benchmark_baseline.json'
+
+# Açılış süresi ölçülen giriş noktaları
+ENTRY_POINTS = ['main.py', 'app.py']
+
+# Açılışta yüklenip yüklenmediği raporlanan ağır paketler
+HEAVY_PACKAGES = ['sklearn', 'scipy', 'lightgbm', 'xgboost', 'lazypredict']
+
+# Kayıtlı modeller yüklenemezse tahmin benchmarkları için eğitilen örnek veri boyutu
+SAMPLE_ROWS = 1000
+
+def benchmark(name, slow=False):
+    """
+    Bir fonksiyonu isimle benchmark olarak kaydeder.
+    """
+    def register(fn):
+        BENCHMARKS[name] = fn
+        if slow:
+            SLOW_BENCHMARKS.add(name)
+        return fn
+    return register
+
+def time_call(fn, repeat=5):
+    """
+    Fonksiyonu repeat kez çalıştırır; en iyi ve ortalama süreyi saniye olarak döndürür.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return {'best': min(timings), 'mean': sum(timings) / len(timings)}
+
+def stats_files(stats_dir='stats'):
+    """
+    stats klasöründeki tüm CSV dosyalarının yollarını döndürür.
+    """
+    return [os.path.join(stats_dir, file) for file in sorted(os.listdir(stats_dir)) if file.endswith('.csv')]
+
+@benchmark('preprocessing')
+def bench_preprocessing(repeat=5):
+    """
+    Tüm takım CSV'lerinin eski (hücre bazlı) ve vektörel temizleme sürelerini karşılaştırır.
+    İki yolun çıktısının birebir aynı olduğunu da doğrular.
+    """
+    files = stats_files()
+    rows = 0
+    for path in files:
+        legacy = preprocess_team_data(path, vectorized=False)
+        vectorized = preprocess_team_data(path, vectorized=True)
+        pd.testing.assert_frame_equal(legacy, vectorized, check_exact=True)
+        rows += len(vectorized)
+    
+    legacy_time = time_call(lambda: [preprocess_team_data(path, vectorized=False) for path in files], repeat)
+    vectorized_time = time_call(lambda: [preprocess_team_data(path, vectorized=True) for path in files], repeat)
+    
+    # Dosya başına sabit maliyetten bağımsız olarak yalnızca temizleme adımını
+    # tüm satırlar tek bir ham tabloda iken ölç
+    raw = pd.concat([pd.read_csv(path, encoding='utf-8', engine='python') for path in files], ignore_index=True)
+    other_numeric = [col for col in NUMERIC_COLUMNS if col not in PERCENTAGE_COLUMNS]
+    
+    def clean_legacy():
+        raw['Tarih'].apply(parse_date)
+        for col in PERCENTAGE_COLUMNS:
+            raw[col].apply(clean_percentage)
+        for col in other_numeric:
+            raw[col].apply(clean_numeric)
+    
+    def clean_vectorized():
+        parse_date_column(raw['Tarih'])
+        for col in PERCENTAGE_COLUMNS:
+            clean_percentage_column(raw[col])
+        for col in other_numeric:
+            clean_numeric_column(raw[col])
+    
+    cleaning_legacy = time_call(clean_legacy, repeat)
+    cleaning_vectorized = time_call(clean_vectorized, repeat)
+    return {
+        'files': len(files),
+        'rows': rows,
+        'legacy': legacy_time,
+        'vectorized': vectorized_time,
+        'speedup': legacy_time['best'] / vectorized_time['best'],
+        'cleaning_legacy': cleaning_legacy,
+        'cleaning_vectorized': cleaning_vectorized,
+        'cleaning_speedup': cleaning_legacy['best'] / cleaning_vectorized['best']
+    }
+
+@benchmark('form_vectors')
+def bench_form_vectors(repeat=5, last_n=5):
+    """
+    Takım form vektörünün prepare_features(...).mean() yolu ile team_form_vector
+    (önbelleksiz ve önbellekli) sürelerini karşılaştırır; sonuçların aynı olduğunu doğrular.
+    """
+    teams = [os.path.basename(path)[:-4] for path in stats_files()]
+    for team in teams:
+        X_team, _, _, _, _ = prepare_features(get_team_stats(team).head(last_n))
+        np.testing.assert_array_equal(X_team.mean().values, team_form_vector(team, last_n))
+    
+    def legacy():
+        for team in teams:
+            X_team, _, _, _, _ = prepare_features(get_team_stats(team).head(last_n))
+            X_team.mean().values
+    
+    def cold():
+        team_stats_cache.clear_derived()
+        for team in teams:
+            team_form_vector(team, last_n)
+    
+    def warm():
+        for team in teams:
+            team_form_vector(team, last_n)
+    
+    # Ayrıştırılmış takım verisi önbellekte iken yalnızca özellik hesabı ölçülür
+    team_stats_cache.clear()
+    legacy()
+    legacy_time = time_call(legacy, repeat)
+    cold_time = time_call(cold, repeat)
+    warm_time = time_call(warm, repeat)
+    return {
+        'teams': len(teams),
+        'legacy': legacy_time,
+        'form_vector': cold_time,
+        'form_vector_cached': warm_time,
+        'speedup': legacy_time['best'] / cold_time['best'],
+        'cached_speedup': legacy_time['best'] / warm_time['best']
+    }
+
+@benchmark('targets')
+def bench_targets(repeat=5, scales=(1, 4, 16)):
+    """
+    prepare_features hedeflerinin eski (satır bazlı) ve vektörel sürelerini tüm takım
+    verisinin 1, 4 ve 16 katı büyüklüğünde karşılaştırır; çıktıların aynı olduğunu doğrular.
+    """
+    all_data = pd.concat([preprocess_team_data(path) for path in stats_files()], ignore_index=True)
+    for legacy_output, vectorized_output in zip(prepare_features(all_data.copy(), vectorized=False),
+                                                prepare_features(all_data.copy(), vectorized=True)):
+        if isinstance(legacy_output, pd.DataFrame):
+            pd.testing.assert_frame_equal(legacy_output, vectorized_output, check_exact=True)
+        else:
+            pd.testing.assert_series_equal(legacy_output, vectorized_output, check_exact=True)
+    
+    result = {'rows': len(all_data)}
+    for scale in scales:
+        data = pd.concat([all_data] * scale, ignore_index=True)
+        legacy_time = time_call(lambda: prepare_features(data.copy(), vectorized=False), repeat)
+        vectorized_time = time_call(lambda: prepare_features(data.copy(), vectorized=True), repeat)
+        result[f'legacy_x{scale}'] = legacy_time
+        result[f'vectorized_x{scale}'] = vectorized_time
+        result[f'speedup_x{scale}'] = legacy_time['best'] / vectorized_time['best']
+    return result
+
+def legacy_last_matches(team_data, count=5):
+    """
+    get_last_matches'in eski, iterrows tabanlı hali (yalnızca karşılaştırma için).
+    """
+    last_matches = []
+    for _, match in team_data.head(count).iterrows():
+        last_matches.append({
+            'date': match['Tarih'],
+            'opponent': match['Rakip'],
+            'is_home': match['Ev Sahibi/Deplasman'] == 'Ev Sahibi',
+            'score': f"{match['MS Gol']}-{match['MS Yenilen Gol']}",
+            'result': 'Galibiyet' if match['MS Gol'] > match['MS Yenilen Gol'] else
+                     'Beraberlik' if match['MS Gol'] == match['MS Yenilen Gol'] else 'Mağlubiyet'
+        })
+    return last_matches
+
+def legacy_head_to_head_matches(home_team, away_team, count=5):
+    """
+    get_head_to_head_matches'in eski, iterrows tabanlı hali (yalnızca karşılaştırma için).
+    """
+    home_vs_away, away_vs_home = get_head_to_head_stats(home_team, away_team, count)
+    h2h_matches = []
+    for frame, owner, opponent, reverse in [(home_vs_away, home_team, away_team, False),
+                                            (away_vs_home, away_team, home_team, True)]:
+        for _, match in frame.iterrows():
+            goals = (match['MS Yenilen Gol'], match['MS Gol']) if reverse else (match['MS Gol'], match['MS Yenilen Gol'])
+            h2h_matches.append({
+                'date': match['Tarih'],
+                'home_team': owner,
+                'away_team': opponent,
+                'score': f"{goals[0]}-{goals[1]}",
+                'result': 'Ev Sahibi Galip' if match['MS Gol'] > match['MS Yenilen Gol'] else
+                         'Beraberlik' if match['MS Gol'] == match['MS Yenilen Gol'] else 'Deplasman Galip'
+            })
+    h2h_matches.sort(key=lambda x: x['date'], reverse=True)
+    return h2h_matches[:count]
+
+def legacy_recent_matches(team_data, last_n=5):
+    """
+    'Son Maçlar' listesinin eski, iterrows tabanlı hali (yalnızca karşılaştırma için).
+    """
+    return [
+        {'Tarih': format_date(match['Tarih']), 'Rakip': match['Rakip'], 'Gol': match['MS Gol'], 'Sonuç': match['Sonuç']}
+        for _, match in team_data.head(last_n).iterrows()
+    ]
+
+@benchmark('match_summaries')
+def bench_match_summaries(repeat=5):
+    """
+    Web sayfasındaki maç özetlerinin (son maçlar, karşılıklı maçlar, 'Son Maçlar')
+    iterrows ve vektörel sürelerini tüm takımlar için karşılaştırır; çıktıların aynı
+    olduğunu doğrular.
+    """
+    teams = [os.path.basename(path)[:-4] for path in stats_files()]
+    frames = {team: get_team_stats(team) for team in teams}
+    pairs = [(home, away) for home in teams for away in teams if home != away]
+    for team, frame in frames.items():
+        assert legacy_last_matches(frame) == get_last_matches(frame)
+        assert legacy_recent_matches(frame) == recent_match_records(frame.head(5))
+    for home, away in pairs:
+        assert legacy_head_to_head_matches(home, away) == get_head_to_head_matches(home, away)
+    
+    result = {'teams': len(teams), 'pairs': len(pairs)}
+    for name, legacy, vectorized in [
+        ('last_matches', lambda: [legacy_last_matches(frame) for frame in frames.values()],
+         lambda: [get_last_matches(frame) for frame in frames.values()]),
+        ('recent_matches', lambda: [legacy_recent_matches(frame) for frame in frames.values()],
+         lambda: [recent_match_records(frame.head(5)) for frame in frames.values()]),
+        ('head_to_head', lambda: [legacy_head_to_head_matches(home, away) for home, away in pairs],
+         lambda: [get_head_to_head_matches(home, away) for home, away in pairs])
+    ]:
+        legacy_time = time_call(legacy, repeat)
+        vectorized_time = time_call(vectorized, repeat)
+        result[f'{name}_legacy'] = legacy_time
+        result[f'{name}_vectorized'] = vectorized_time
+        result[f'{name}_speedup'] = legacy_time['best'] / vectorized_time['best']
+    return result
+
+@benchmark('gb_backends', slow=True)
+def bench_gb_backends(repeat=5, markets=('match_result', 'score', 'btts'), backends=None):
+    """
+    train_models'taki gradient boosting modelini her kütüphaneyle (gb_backends.py)
+    aynı parametrelerle eğitir; eğitim süresini, tek maç ve toplu tahmin gecikmesini,
+    test ve CV skorlarını (sınıflandırmada doğruluk, skor için RMSE) karşılaştırır.
+    Modeller tek süreçte sırayla eğitilir; KG modeli seçici olmadan tüm özelliklerle çalışır.
+    """
+    from sklearn.metrics import accuracy_score, mean_squared_error
+    from sklearn.preprocessing import StandardScaler
+    from gb_backends import GB_BACKENDS, gradient_boosting
+    from model_training import GB_PARAMS
+    from time_splits import load_splits
+    from training_data import load_training_data
+    
+    features, y_match, y_score, y_htft, y_btts = load_training_data()
+    X = StandardScaler().fit_transform(features)
+    test_start, folds = load_splits(features.index)
+    targets = {'match_result': y_match, 'score': y_score, 'htft': y_htft, 'btts': y_btts}
+    
+    def score(model_type, y_true, y_pred):
+        if model_type == 'regression':
+            return float(np.sqrt(mean_squared_error(y_true, y_pred)))
+        return accuracy_score(y_true, y_pred)
+    
+    result = {'rows': len(X), 'test_rows': len(X) - test_start}
+    for market in markets:
+        model_type = 'regression' if market == 'score' else 'classification'
+        y = np.asarray(targets[market])
+        for backend in backends or GB_BACKENDS:
+            def make_model():
+                return gradient_boosting(model_type, backend, X.shape[1], **GB_PARAMS[market])
+            
+            start = time.perf_counter()
+            model = make_model().fit(X[:test_start], y[:test_start])
+            fit_time = time.perf_counter() - start
+            
+            row = X[test_start:test_start + 1]
+            single = time_call(lambda: model.predict(row), repeat)
+            batch = time_call(lambda: model.predict(X[test_start:]), repeat)
+            cv_scores = [
+                score(model_type, y[test_idx], make_model().fit(X[train_idx], y[train_idx]).predict(X[test_idx]))
+                for train_idx, test_idx in folds
+            ]
+            key = f'{market}/{backend}'
+            result[f'{key} fit_s'] = fit_time
+            result[f'{key} predict_1'] = single
+            result[f'{key} predict_test'] = batch
+            result[f'{key} test'] = score(model_type, y[test_start:], model.predict(X[test_start:]))
+            result[f'{key} cv'] = float(np.mean(cv_scores))
+    return result
+
+@benchmark('team_load')
+def bench_team_load(repeat=5):
+    """
+    Takım CSV'lerinin okunup temizlenme süresini (preprocess_team_data) ve
+    get_team_stats'in önbelleksiz ve önbellekli sürelerini ölçer.
+    """
+    files = stats_files()
+    teams = [os.path.basename(path)[:-4] for path in files]
+    
+    def cold():
+        team_stats_cache.clear()
+        for team in teams:
+            get_team_stats(team)
+    
+    def warm():
+        for team in teams:
+            get_team_stats(team)
+    
+    load_time = time_call(lambda: [preprocess_team_data(path) for path in files], repeat)
+    cold_time = time_call(cold, repeat)
+    warm()
+    warm_time = time_call(warm, repeat)
+    return {
+        'files': len(files),
+        'preprocess_team_data': load_time,
+        'per_team_ms': load_time['best'] / len(files) * 1000,
+        'get_team_stats': cold_time,
+        'get_team_stats_cached': warm_time
+    }
+
+@benchmark('features')
+def bench_features(repeat=5):
+    """
+    Tüm veri üzerinde prepare_features(load_all_teams()) ve load_training_data sürelerini ölçer.
+    """
+    from training_data import load_training_data
+    
+    all_data = load_all_teams()
+    return {
+        'rows': len(all_data),
+        'load_all_teams': time_call(load_all_teams, repeat),
+        'prepare_features': time_call(lambda: prepare_features(all_data.copy()), repeat),
+        'load_training_data': time_call(load_training_data, repeat)
+    }
+
+def _quietly(fn, *args, **kwargs):
+    """
+    Fonksiyonu çalıştırır ve yazdırdıklarını gizler (eğitim çıktısı ölçümleri bastırmasın).
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+def training_sample(rows=SAMPLE_ROWS):
+    """
+    Eğitim verisinin en yeni rows maçını (tarih sırasını bozmadan) döndürür.
+    """
+    from training_data import load_training_data
+    
+    return tuple(part.iloc[-rows:] for part in load_training_data())
+
+def benchmark_models(rows=SAMPLE_ROWS):
+    """
+    Tahmin benchmarkları için modelleri kayıttan yükler. Kayıtlı modeller yoksa veya
+    okunamıyorsa örnek veriyle modeller eğitilip (diske yazılmadan) kayda yerleştirilir.
+    """
+    from model_registry import model_registry
+    from model_training import train_models
+    
+    models, scaler = _quietly(model_registry.load)
+    if models is None:
+        print(f"Kayıtlı modeller yüklenemedi, tahmin ölçümleri için {rows} maçlık örnekle modeller eğitiliyor...")
+        models, scaler = _quietly(train_models, *training_sample(rows))
+        model_registry.set(models, scaler, version=f'benchmark-{rows}')
+    return model_registry
+
+def benchmark_pair():
+    """
+    Tahmin benchmarklarında kullanılan sabit eşleşme (ilk iki takım).
+    """
+    teams = [os.path.basename(path)[:-4] for path in stats_files()]
+    return teams[0], teams[1]
+
+@benchmark('predict')
+def bench_predict(repeat=5):
+    """
+    Tek bir maçın her predict_* fonksiyonuyla ve MatchPredictor ile tahmin süresini ölçer.
+    Takım verileri önbellekte iken (sürekli çalışan sunucu) ve önbellekler boşken ayrı ölçülür.
+    """
+    from prediction_functions import predict_match_result, predict_score, predict_ht_ft, predict_btts
+    
+    registry = benchmark_models()
+    models, scaler = registry.load()
+    predictor = registry.predictor()
+    home_team, away_team = benchmark_pair()
+    
+    def cold():
+        team_stats_cache.clear()
+        predictor.predict(home_team, away_team)
+    
+    result = {'fixture': f'{home_team} - {away_team}'}
+    for fn in [predict_match_result, predict_score, predict_ht_ft, predict_btts]:
+        fn(home_team, away_team, models, scaler)
+        result[fn.__name__] = time_call(lambda: fn(home_team, away_team, models, scaler), repeat)
+    result['MatchPredictor.predict'] = time_call(lambda: predictor.predict(home_team, away_team), repeat)
+    result['MatchPredictor.predict_cold'] = time_call(cold, repeat)
+    return result
+
+@benchmark('web_index')
+def bench_web_index(repeat=5):
+    """
+    Flask test istemcisiyle ana sayfaya tam bir tahmin POST isteğinin süresini ölçer
+    (takım istatistikleri, tahmin matrisi, analiz ve şablon oluşturma dahil).
+    """
+    benchmark_models()
+    app_module = _quietly(__import__, 'app')
+    _quietly(app_module.model_warmup.wait)
+    home_team, away_team = benchmark_pair()
+    client = app_module.app.test_client()
+    form = {'home_team': home_team, 'away_team': away_team}
+    
+    def post():
+        response = client.post('/', data=form)
+        assert response.status_code == 200, response.status_code
+    
+    first = time_call(post, 1)
+    return {
+        'fixture': f'{home_team} - {away_team}',
+        'first_post': first,
+        'post': time_call(post, repeat),
+        'get': time_call(lambda: client.get('/'), repeat)
+    }
+
+@benchmark('training', slow=True)
+def bench_training(repeat=5, rows=SAMPLE_ROWS):
+    """
+    train_models'in en yeni rows maçlık örnek veri üzerindeki süresini ölçer.
+    Eğitim uzun sürdüğü için repeat'ten bağımsız olarak bir kez çalıştırılır.
+    """
+    from model_training import train_models
+    
+    sample = training_sample(rows)
+    return {
+        'rows': len(sample[0]),
+        'train_models': time_call(lambda: _quietly(train_models, *sample), 1)
+    }
+
+@benchmark('tree_rescaling')
+def bench_tree_rescaling(repeat=5, rows=SAMPLE_ROWS, new_fraction=0.1):
+    """
+    update_models'teki eşik taşımanın (_rescale_tree_thresholds) doğruluğunu ve süresini
+    ölçer. En yeni rows maçın eski kısmıyla scaler ve ağaç toplulukları eğitilir, scaler
+    en yeni new_fraction kadar maçla partial_fit edilir ve eşikler yeni ölçeğe taşınır.
+    Taşınan ağaçların yeni scaler girdileriyle, özgün ağaçların eski scaler girdileriyle
+    aynı yaprakları ve olasılıkları verdiği kontrol edilir (uyuşmazlık sayısı 0 olmalıdır);
+    karşılaştırma için eşikler taşınmadan oluşan uyuşmazlıklar da raporlanır.
+    """
+    from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+    from sklearn.preprocessing import StandardScaler
+    from model_training import _rescale_tree_thresholds, _scaled_feature_values
+    
+    X, y_match = training_sample(rows)[:2]
+    y = np.asarray(y_match)
+    split = len(X) - int(len(X) * new_fraction)
+    old_scaler = StandardScaler().fit(X[:split])
+    new_scaler = copy.deepcopy(old_scaler).partial_fit(X[split:])
+    X_old, X_new = old_scaler.transform(X), new_scaler.transform(X)
+    old_values, new_values = _scaled_feature_values(X, old_scaler), _scaled_feature_values(X, new_scaler)
+    
+    result = {'rows': len(X), 'new_rows': len(X) - split}
+    for name, model in [
+        ('RandomForest', RandomForestClassifier(n_estimators=100, max_depth=8, random_state=42)),
+        ('GradientBoosting', GradientBoostingClassifier(n_estimators=100, max_depth=4, random_state=42))
+    ]:
+        model.fit(X_old[:split], y[:split])
+        
+        def rescale():
+            rescaled = copy.deepcopy(model)
+            _rescale_tree_thresholds(rescaled, old_values, new_values)
+            return rescaled
+        
+        rescaled = rescale()
+        leaves = model.apply(X_old).reshape(len(X), -1)
+        result[f'{name} leaf_mismatches'] = int((rescaled.apply(X_new).reshape(len(X), -1) != leaves).sum())
+        result[f'{name} unrescaled_leaf_mismatches'] = int((model.apply(X_new).reshape(len(X), -1) != leaves).sum())
+        result[f'{name} max_proba_diff'] = float(np.abs(rescaled.predict_proba(X_new) - model.predict_proba(X_old)).max())
+        result[f'{name} rescale'] = time_call(rescale, repeat)
+    return result
+
+def entry_point_imports(path):
+    """
+    Giriş noktasının modül düzeyindeki import satırlarını döndürür. app.py içe
+    aktarılırken modelleri de yüklediği için açılış yalnızca bu satırlarla ölçülür.
+    """
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+    return '\n'.join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+def import_time_report(code):
+    """
+    Kodu yeni bir Python sürecinde -X importtime ile çalıştırır; duvar saati süresini
+    ve en üst düzey modüllerin kümülatif içe aktarma süresini (saniye) döndürür.
+    """
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                               capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - start
+    modules = {}
+    for line in completed.stderr.splitlines():
+        # Biçim: "import time: self [us] | cumulative | imported package"
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        if not name.startswith(' ') or name.startswith('  '):
+            continue
+        modules[name.strip()] = int(parts[1]) / 1e6
+    return wall, modules
+
+@benchmark('startup')
+def bench_startup(repeat=5):
+    """
+    main.py ve app.py'nin modül düzeyindeki içe aktarmalarının soğuk açılış süresini
+    her seferinde yeni bir süreçte ölçer. Ayrıca yüklenen ağır paketleri ve en uzun
+    süren 5 içe aktarmayı (-X importtime) raporlar. Modellerin yüklenmesi dahil değildir.
+    """
+    result = {}
+    for path in ENTRY_POINTS:
+        code = entry_point_imports(path)
+        timings = []
+        for _ in range(repeat):
+            wall, modules = import_time_report(code)
+            timings.append(wall)
+        # Yüklenen paketler için ayrı bir süreçte sys.modules'a bakılır
+        check = code + f"\nimport sys\nprint(','.join(name for name in {HEAVY_PACKAGES!r} if name in sys.modules))"
+        loaded = subprocess.run([sys.executable, '-c', check], capture_output=True, text=True, check=True)
+        slowest = sorted(modules.items(), key=lambda item: -item[1])[:5]
+        result[path] = {'best': min(timings), 'mean': sum(timings) / len(timings)}
+        result[f'{path} heavy_packages'] = loaded.stdout.strip().splitlines()[-1] if loaded.stdout.strip() else '-'
+        result[f'{path} slowest_imports'] = ', '.join(f'{name} {seconds * 1000:.0f} ms' for name, seconds in slowest)
+    return result
+
+def print_result(name, result):
+    """
+    Benchmark sonucunu okunabilir biçimde yazdırır.
+    """
+    print(f"\n{name}:")
+    for key, value in result.items():
+        if isinstance(value, dict):
+            print(f"  {key}: en iyi {value['best'] * 1000:.1f} ms, ortalama {value['mean'] * 1000:.1f} ms")
+        elif isinstance(value, float):
+            print(f"  {key}: {value:.4g}")
+        else:
+            print(f"  {key}: {value}")
+
+def _json_value(value):
+    """
+    NumPy sayılarını JSON'a yazılabilir Python sayılarına çevirir.
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"JSON'a yazılamayan değer: {value!r}")
+
+def save_results(path, results, repeat):
+    """
+    Sonuçları ortam bilgisiyle birlikte JSON dosyasına yazar.
+    """
+    import sklearn
+    
+    payload = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'repeat': repeat,
+        'environment': {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'processor_count': os.cpu_count(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'scikit-learn': sklearn.__version__
+        },
+        'results': results
+    }
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2, default=_json_value)
+    print(f"\nSonuçlar {path} dosyasına kaydedildi.")
+
+def compare_results(results, baseline, tolerance):
+    """
+    Süre ölçümlerinin (en iyi süre) temel sonuçlara oranını hesaplar. Oranı 1 + tolerance
+    değerini aşan ölçümler gerileme sayılır. (benchmark, ölçüm, temel, şimdiki, oran,
+    gerileme mi) satırlarını döndürür.
+    """
+    rows = []
+    for name, result in results.items():
+        for key, value in result.items():
+            previous = baseline.get(name, {}).get(key)
+            if not (isinstance(value, dict) and isinstance(previous, dict)) or not previous.get('best'):
+                continue
+            ratio = value['best'] / previous['best']
+            rows.append((name, key, previous['best'], value['best'], ratio, ratio > 1 + tolerance))
+    return rows
+
+def print_comparison(rows, baseline_path, tolerance):
+    """
+    Temel sonuçlarla karşılaştırmayı yazdırır; gerileme sayısını döndürür.
+    """
+    print(f"\n{baseline_path} ile karşılaştırma (tolerans %{tolerance * 100:.0f}):")
+    for name, key, previous, current, ratio, regressed in rows:
+        mark = "  GERİLEME" if regressed else ""
+        print(f"  {name}/{key}: {previous * 1000:.1f} ms -> {current * 1000:.1f} ms ({ratio:.2f}x){mark}")
+    regressions = sum(1 for row in rows if row[-1])
+    if not rows:
+        print("  Karşılaştırılabilir ölçüm bulunamadı.")
+    elif regressions:
+        print(f"{regressions} ölçüm temel sonuçlardan yavaş.")
+    else:
+        print("Gerileme yok.")
+    return regressions
+
+def main(argv=None):
+    """
+    Benchmark komut satırı arayüzü. Sonuçlar --output ile JSON'a yazılabilir ve
+    --baseline ile önceki bir çıktıyla karşılaştırılabilir; gerileme varsa çıkış kodu 1 olur.
+    """
+    parser = argparse.ArgumentParser(description="Performans ölçümleri")
+    parser.add_argument('names', nargs='*', help=f"Çalıştırılacak benchmarklar: {', '.join(BENCHMARKS)}")
+    parser.add_argument('--repeat', type=int, default=5, help="Tekrar sayısı")
+    parser.add_argument('--all', action='store_true',
+                        help=f"Model eğiten yavaş benchmarkları da çalıştır ({', '.join(sorted(SLOW_BENCHMARKS))})")
+    parser.add_argument('--output', help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument('--baseline', nargs='?', const=BASELINE_FILE,
+                        help=f"Karşılaştırılacak önceki JSON çıktısı (varsayılan: {BASELINE_FILE})")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="Gerileme sayılmadan önce izin verilen yavaşlama oranı")
+    args = parser.parse_args(argv)
+    
+    names = args.names or [name for name in BENCHMARKS if args.all or name not in SLOW_BENCHMARKS]
+    for name in names:
+        if name not in BENCHMARKS:
+            parser.error(f"Bilinmeyen benchmark: {name}")
+    
+    baseline = None
+    if args.baseline:
+        try:
+            with open(args.baseline, encoding='utf-8') as f:
+                baseline = json.load(f)['results']
+        except (OSError, ValueError, KeyError) as e:
+            parser.error(f"Temel sonuçlar okunamadı: {str(e)}")
+    
+    results = {}
+    for name in names:
+        results[name] = BENCHMARKS[name](repeat=args.repeat)
+        print_result(name, results[name])
+    
+    if args.output:
+        save_results(args.output, results, args.repeat)
+    if baseline is not None:
+        rows = compare_results(results, baseline, args.tolerance)
+        if print_comparison(rows, args.baseline, args.tolerance):
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
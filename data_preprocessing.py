@@ -1,6 +1,13 @@
 import pandas as pd
 import numpy as np
+import os
+import threading
+from collections import OrderedDict
 from datetime import datetime
+from latency_metrics import timed_stage
+
+# Takım verisi önbelleğinde tutulacak en fazla dosya sayısı
+TEAM_CACHE_SIZE = 64
 
 def clean_percentage(value):
     """
@@ -38,59 +45,127 @@ def parse_date(date_str):
         print(f"Tarih dönüştürme hatası: {str(e)}")
         return None
 
-def preprocess_team_data(file_path):
+# Temizlenen sayısal sütunlar
+NUMERIC_COLUMNS = [
+    'MS Gol', 'İY Gol', 'MS Yenilen Gol', 'İY Yenilen Gol',
+    'Topla Oynama', 'İkili Mücadele Kazanma',
+    'Hava Topu Kazanma', 'Pas Arası', 'Toplam Pas', 'İsabetli Pas',
+    'Pas İsabeti %', 'Toplam Orta', 'İsabetli Orta', 'Toplam Şut',
+    'İsabetli Şut', 'İsabetsiz Şut', 'Engellenen Şut', 'Gol Beklentisi (xG)',
+    'Rakip Ceza Sahasında Topla Buluşma', 'Uzaklaştırma', 'Faul', 'Ofsayt'
+]
+
+# Yüzdelik sütunlar
+PERCENTAGE_COLUMNS = ['Topla Oynama', 'Pas İsabeti %']
+
+def _is_text_column(column):
+    """
+    Sütunun string değerler içerip içermediğini kontrol eder.
+    """
+    return pd.api.types.is_object_dtype(column) or pd.api.types.is_string_dtype(column)
+
+def clean_percentage_column(column):
+    """
+    clean_percentage fonksiyonunun vektörel karşılığı. String olmayan değerler
+    olduğu gibi bırakılır.
+    """
+    if not _is_text_column(column):
+        return column
+    text = column.str.strip('%').str.strip().str.replace(',', '.', regex=False)
+    # .str işlemleri string olmayan hücreler için NaN döndürür; onları geri koy
+    return pd.to_numeric(text.where(text.notna(), column)).astype('float64')
+
+def clean_numeric_column(column):
+    """
+    clean_numeric fonksiyonunun vektörel karşılığı. Dönüştürülemeyen ve eksik
+    değerler 0.0 olur.
+    """
+    if not _is_text_column(column):
+        return column.fillna(0.0) if column.hasnans else column
+    text = column.str.replace(',', '.', regex=False)
+    return pd.to_numeric(text, errors='coerce').astype('float64').fillna(0.0)
+
+def parse_date_column(column):
+    """
+    parse_date fonksiyonunun vektörel karşılığı (DD.MM.YYYY).
+    """
+    dates = pd.to_datetime(column, format='%d.%m.%Y', errors='coerce')
+    for value in column[dates.isna() & column.notna()]:
+        print(f"Tarih dönüştürme hatası: {value!r} DD.MM.YYYY formatında değil")
+    return dates
+
+def _read_team_csv(file_path, vectorized):
+    """
+    Takım CSV dosyasını okur. Vektörel yol C parser'ı ve virgüllü ondalık
+    ayrıştırmayı kullanır; diğer yol eski Python engine davranışını korur.
+    """
+    if vectorized:
+        return pd.read_csv(file_path,
+                           encoding='utf-8',
+                           on_bad_lines='skip',         # Hatalı satırları atla
+                           sep=',',                     # Ayırıcı olarak virgül kullan
+                           decimal=',',                 # "1,27" gibi değerleri doğrudan float oku
+                           float_precision='round_trip')  # float() ile birebir aynı sonuç
+    return pd.read_csv(file_path,
+                       encoding='utf-8',
+                       on_bad_lines='skip',  # Hatalı satırları atla
+                       sep=',',              # Ayırıcı olarak virgül kullan
+                       engine='python')       # Python engine'i kullan
+
+@timed_stage('preprocess_team_data')
+def preprocess_team_data(file_path, vectorized=True):
     """
     Takım verilerini okur ve ön işleme yapar.
+    vectorized=False eski, hücre bazlı temizleme yolunu kullanır.
     """
     try:
         # CSV'yi okurken hataları yönet
-        df = pd.read_csv(file_path, 
-                        encoding='utf-8',
-                        on_bad_lines='skip',  # Hatalı satırları atla
-                        sep=',',              # Ayırıcı olarak virgül kullan
-                        engine='python')       # Python engine'i kullan
+        df = _read_team_csv(file_path, vectorized)
         
         # Tarihi datetime'a dönüştür
-        df['Tarih'] = df['Tarih'].apply(parse_date)
+        if vectorized:
+            df['Tarih'] = parse_date_column(df['Tarih'])
+        else:
+            df['Tarih'] = df['Tarih'].apply(parse_date)
         
         # Tarihe göre sırala (en yeni maç en üstte)
         df = df.sort_values('Tarih', ascending=False).reset_index(drop=True)
         
-        # Tüm sayısal sütunları temizle
-        numeric_columns = [
-            'MS Gol', 'İY Gol', 'MS Yenilen Gol', 'İY Yenilen Gol',
-            'Topla Oynama', 'İkili Mücadele Kazanma',
-            'Hava Topu Kazanma', 'Pas Arası', 'Toplam Pas', 'İsabetli Pas',
-            'Pas İsabeti %', 'Toplam Orta', 'İsabetli Orta', 'Toplam Şut',
-            'İsabetli Şut', 'İsabetsiz Şut', 'Engellenen Şut', 'Gol Beklentisi (xG)',
-            'Rakip Ceza Sahasında Topla Buluşma', 'Uzaklaştırma', 'Faul', 'Ofsayt'
-        ]
-        
-        # Yüzdelik sütunlar
-        percentage_columns = ['Topla Oynama', 'Pas İsabeti %']
-        
         # Diğer sayısal sütunlar
-        other_numeric = [col for col in numeric_columns if col not in percentage_columns]
+        other_numeric = [col for col in NUMERIC_COLUMNS if col not in PERCENTAGE_COLUMNS]
         
         # Yüzdelik değerleri temizle
-        for col in percentage_columns:
+        for col in PERCENTAGE_COLUMNS:
             if col in df.columns:
-                df[col] = df[col].apply(clean_percentage)
+                if vectorized:
+                    column = df[col]
+                    cleaned = clean_percentage_column(column)
+                    if cleaned is not column:
+                        df[col] = cleaned
+                else:
+                    df[col] = df[col].apply(clean_percentage)
         
         # Diğer sayısal değerleri temizle
         for col in other_numeric:
             if col in df.columns:
-                df[col] = df[col].apply(clean_numeric)
+                if vectorized:
+                    column = df[col]
+                    cleaned = clean_numeric_column(column)
+                    # Zaten temiz olan sütunları yeniden atama
+                    if cleaned is not column:
+                        df[col] = cleaned
+                else:
+                    df[col] = df[col].apply(clean_numeric)
         
         # Eksik sütunları kontrol et ve gerekirse ekle
-        required_columns = numeric_columns + ['Tarih', 'Rakip', 'Sonuç']
+        required_columns = NUMERIC_COLUMNS + ['Tarih', 'Rakip', 'Sonuç']
         for col in required_columns:
             if col not in df.columns:
                 print(f"Uyarı: {col} sütunu eksik. Sıfır ile doldurulacak.")
                 df[col] = 0
         
         return df
-        
+    
     except Exception as e:
         print(f"Veri okuma hatası: {str(e)}")
         print(f"Dosya: {file_path}")
@@ -101,88 +176,274 @@ def preprocess_team_data(file_path):
             print(f"Sütunlar: {header}")
         raise
 
+@timed_stage('load_team_frame')
+def load_team_frame(file_path):
+    """
+    Takım verisini derlenmiş özellik deposundan okur; depo yoksa veya dosya
+    değişmişse CSV'yi ön işler.
+    """
+    # Döngüsel import'u önlemek için burada import edilir
+    from feature_store import load_team_from_store
+    df = load_team_from_store(file_path)
+    if df is None:
+        df = preprocess_team_data(file_path)
+    return df
+
+class TeamStatsCache:
+    """
+    Ön işlenmiş takım verilerini bellekte tutan, thread-safe LRU önbellek.
+    Anahtar dosya yolu; dosyanın mtime/boyut bilgisi değişirse kayıt
+    geçersiz sayılır ve CSV yeniden okunur. Veriden türetilen değerler (ör. form
+    vektörleri) kaydın içinde tutulur ve kayıtla birlikte silinir.
+    """
+    def __init__(self, max_size=TEAM_CACHE_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _signature(file_path):
+        stat = os.stat(file_path)
+        return stat.st_mtime_ns, stat.st_size
+    
+    def _entry(self, file_path):
+        """
+        Dosyanın önbellekteki (imza, DataFrame, rakip indeksi, türetilmiş değerler)
+        kaydını döndürür; kayıt yoksa veya dosya değişmişse CSV okunur ve indeks
+        yeniden oluşturulur.
+        """
+        signature = self._signature(file_path)
+        with self._lock:
+            entry = self._entries.get(file_path)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(file_path)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        
+        # Okuma kilit dışında yapılır, böylece farklı takımlar paralel okunabilir
+        df = load_team_frame(file_path)
+        # Rakip -> satır numaraları; veri tarihe göre yeniden eskiye sıralı olduğu için
+        # her dizinin ilk elemanları son karşılaşmalardır
+        opponents = df.groupby('Rakip', sort=False).indices if 'Rakip' in df.columns else {}
+        
+        entry = (signature, df, opponents, {})
+        with self._lock:
+            self._entries[file_path] = entry
+            self._entries.move_to_end(file_path)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return entry
+    
+    def get(self, file_path):
+        """
+        Dosyanın ön işlenmiş DataFrame'ini döndürür. Çağıranlar veriyi
+        değiştirebildiği için her zaman bir kopya verilir.
+        """
+        return self._entry(file_path)[1].copy()
+    
+    def matches_against(self, file_path, opponent, last_n=None):
+        """
+        Dosyadaki takımın verilen rakiple oynadığı maçları yeniden eskiye döndürür.
+        Satırlar rakip indeksinden doğrudan seçildiği için tüm tablo taranmaz;
+        last_n verilirse yalnızca son last_n karşılaşma alınır.
+        """
+        _, df, opponents, _ = self._entry(file_path)
+        positions = opponents.get(opponent, np.empty(0, dtype=np.intp))
+        if last_n is not None:
+            positions = positions[:last_n]
+        return df.iloc[positions].copy()
+    
+    def derived(self, file_path, key, compute):
+        """
+        Takım verisinden compute(df) ile türetilen değeri key altında kayıtla birlikte
+        saklar ve döndürür. Değer dosya değişince veya kayıt LRU'dan çıkınca silinir.
+        compute kilit dışında çalışır ve df'i değiştirmemelidir.
+        """
+        _, df, _, values = self._entry(file_path)
+        with self._lock:
+            if key in values:
+                return values[key]
+        value = compute(df)
+        with self._lock:
+            return values.setdefault(key, value)
+    
+    def clear_derived(self):
+        """
+        Takım verilerini tutup yalnızca türetilmiş değerleri siler.
+        """
+        with self._lock:
+            for entry in self._entries.values():
+                entry[3].clear()
+    
+    def version(self, file_path):
+        """
+        Dosyanın güncel veri sürümünü (mtime, boyut) döndürür.
+        """
+        return self._signature(file_path)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries),
+                'max_size': self.max_size
+            }
+
+# Tüm modüllerin paylaştığı önbellek
+team_stats_cache = TeamStatsCache()
+
+@timed_stage('get_team_stats')
 def get_team_stats(team_name):
     """
     Bir takımın istatistiklerini getirir.
     """
     file_path = f'stats/{team_name}.csv'
-    return preprocess_team_data(file_path)
+    return team_stats_cache.get(file_path)
 
-def get_head_to_head_stats(team1_name, team2_name):
+def get_head_to_head_stats(team1_name, team2_name, last_n=None):
     """
     İki takım arasındaki geçmiş maç istatistiklerini getirir.
+    last_n verilirse her takım için yalnızca son last_n karşılaşma döndürülür.
     """
-    team1_data = get_team_stats(team1_name)
-    team2_data = get_team_stats(team2_name)
-    
     # Takım 1'in takım 2 ile olan maçları
-    team1_vs_team2 = team1_data[team1_data['Rakip'] == team2_name]
+    team1_vs_team2 = team_stats_cache.matches_against(f'stats/{team1_name}.csv', team2_name, last_n)
     
     # Takım 2'nin takım 1 ile olan maçları
-    team2_vs_team1 = team2_data[team2_data['Rakip'] == team1_name]
+    team2_vs_team1 = team_stats_cache.matches_against(f'stats/{team2_name}.csv', team1_name, last_n)
     
     return team1_vs_team2, team2_vs_team1
 
-def prepare_features(team_data):
+# Türetilmiş oran özellikleri: sütun -> (pay, payda); payda 0 ise 1 kabul edilir
+DERIVED_FEATURES = {
+    'Şut İsabet Oranı': ('İsabetli Şut', 'Toplam Şut'),
+    'Orta İsabet Oranı': ('İsabetli Orta', 'Toplam Orta'),
+    'Gol Dönüşüm Oranı': ('MS Gol', 'İsabetli Şut')
+}
+
+POSITIVE_FEATURES = [
+    # Temel gol istatistikleri
+    'MS Gol', 'İY Gol',
+    'Gol Beklentisi (xG)',
+    'Gol Dönüşüm Oranı',
+    
+    # Top kontrolü
+    'Topla Oynama',
+    'İkili Mücadele Kazanma',
+    'Hava Topu Kazanma',
+    
+    # Pas istatistikleri
+    'Pas Arası',
+    'Toplam Pas',
+    'İsabetli Pas',
+    'Pas İsabeti %',
+    
+    # Orta istatistikleri
+    'Toplam Orta',
+    'İsabetli Orta',
+    'Orta İsabet Oranı',
+    
+    # Şut istatistikleri
+    'Toplam Şut',
+    'İsabetli Şut',
+    'Şut İsabet Oranı',
+    
+    # Diğer pozitif istatistikler
+    'Rakip Ceza Sahasında Topla Buluşma',
+    'Uzaklaştırma'
+]
+
+NEGATIVE_FEATURES = [
+    # Yenilen goller
+    'MS Yenilen Gol',
+    'İY Yenilen Gol',
+    
+    # Kartlar
+    'Sarı Kart',
+    'İkinci Sarıdan Kırmızı Kart',
+    'Kırmızı Kart',
+    
+    # Diğer negatif istatistikler
+    'Ofsayt',
+    'İsabetsiz Şut',
+    'Engellenen Şut',
+    'Faul'
+]
+
+# Modele giren özelliklerin sırası
+FEATURE_COLUMNS = POSITIVE_FEATURES + NEGATIVE_FEATURES
+
+# İY/MS etiketleri; sıra numarası İY sonuç kodu * 3 + MS sonuç kodudur
+HTFT_LABELS = np.array(['1-1', '1-X', '1-2', 'X-1', 'X-X', 'X-2', '2-1', '2-X', '2-2'], dtype=object)
+
+@timed_stage('team_form_vector')
+def team_form_vector(team_name, last_n=5):
+    """
+    Takımın son last_n maçındaki özelliklerin ortalamasını FEATURE_COLUMNS sırasıyla
+    döndürür; prepare_features(...).mean() ile aynı değerleri hedef değişkenleri
+    oluşturmadan doğrudan NumPy dizilerinden hesaplar. Sonuç takımın önbellek kaydında
+    saklanır (dosya değişince veya kayıt çıkınca silinir); dönen dizi salt okunurdur.
+    """
+    return team_stats_cache.derived(f'stats/{team_name}.csv', ('form', last_n),
+                                    lambda df: _form_vector(df, last_n))
+
+def _form_vector(team_data, last_n):
+    """
+    team_form_vector'ın önbelleksiz hesabı: son last_n maçın özellik ortalamaları.
+    """
+    recent = team_data.head(last_n)
+    columns = {}
+    for col, (numerator, denominator) in DERIVED_FEATURES.items():
+        divisor = recent[denominator].to_numpy(dtype=np.float64)
+        columns[col] = recent[numerator].to_numpy(dtype=np.float64) / np.where(divisor == 0, 1, divisor)
+    
+    # Özellik sütunları tek matriste toplanır; eksik değerler prepare_features gibi 0 olur
+    matrix = np.empty((len(recent), len(FEATURE_COLUMNS)), order='F')
+    for i, col in enumerate(FEATURE_COLUMNS):
+        matrix[:, i] = columns[col] if col in columns else recent[col].to_numpy(dtype=np.float64)
+    matrix[np.isnan(matrix)] = 0
+    vector = matrix.mean(axis=0)
+    vector.flags.writeable = False
+    return vector
+
+def result_codes(goals_for, goals_against):
+    """
+    Gol sütunlarından sonuç kodlarını (0: '1', 1: 'X', 2: '2') vektörel olarak hesaplar.
+    Eksik değerli satırlar eski satır bazlı karşılaştırmadaki gibi '2' sayılır.
+    """
+    goals_for = np.asarray(goals_for, dtype=np.float64)
+    goals_against = np.asarray(goals_against, dtype=np.float64)
+    return np.select([goals_for > goals_against, goals_for == goals_against], [0, 1], default=2)
+
+def htft_labels(team_data):
+    """
+    İY/MS etiketlerini ('1-1', 'X-2', ...) tüm satırlar için tek seferde oluşturur.
+    """
+    ht = result_codes(team_data['İY Gol'], team_data['İY Yenilen Gol'])
+    ft = result_codes(team_data['MS Gol'], team_data['MS Yenilen Gol'])
+    return pd.Series(HTFT_LABELS[ht * 3 + ft], index=team_data.index)
+
+@timed_stage('prepare_features')
+def prepare_features(team_data, vectorized=True):
     """
     Model için özellikleri hazırlar.
+    vectorized=False İY/MS hedefini eski, satır bazlı yoldan oluşturur.
     """
     # Türetilmiş özellikleri hesapla
-    team_data['Şut İsabet Oranı'] = team_data['İsabetli Şut'] / team_data['Toplam Şut'].replace(0, 1)
-    team_data['Orta İsabet Oranı'] = team_data['İsabetli Orta'] / team_data['Toplam Orta'].replace(0, 1)
-    team_data['Gol Dönüşüm Oranı'] = team_data['MS Gol'] / team_data['İsabetli Şut'].replace(0, 1)
-    
-    positive_features = [
-        # Temel gol istatistikleri
-        'MS Gol', 'İY Gol',
-        'Gol Beklentisi (xG)',
-        'Gol Dönüşüm Oranı',
-        
-        # Top kontrolü
-        'Topla Oynama',
-        'İkili Mücadele Kazanma',
-        'Hava Topu Kazanma',
-        
-        # Pas istatistikleri
-        'Pas Arası',
-        'Toplam Pas',
-        'İsabetli Pas',
-        'Pas İsabeti %',
-        
-        # Orta istatistikleri
-        'Toplam Orta',
-        'İsabetli Orta',
-        'Orta İsabet Oranı',
-        
-        # Şut istatistikleri
-        'Toplam Şut',
-        'İsabetli Şut',
-        'Şut İsabet Oranı',
-        
-        # Diğer pozitif istatistikler
-        'Rakip Ceza Sahasında Topla Buluşma',
-        'Uzaklaştırma'
-    ]
-    
-    negative_features = [
-        # Yenilen goller
-        'MS Yenilen Gol',
-        'İY Yenilen Gol',
-        
-        # Kartlar
-        'Sarı Kart',
-        'İkinci Sarıdan Kırmızı Kart',
-        'Kırmızı Kart',
-        
-        # Diğer negatif istatistikler
-        'Ofsayt',
-        'İsabetsiz Şut',
-        'Engellenen Şut',
-        'Faul'
-    ]
+    for col, (numerator, denominator) in DERIVED_FEATURES.items():
+        team_data[col] = team_data[numerator] / team_data[denominator].replace(0, 1)
     
     # Eksik değerleri 0 ile doldur
-    features = team_data[positive_features + negative_features].fillna(0)
+    features = team_data[FEATURE_COLUMNS].fillna(0)
     
     # Maç sonucu için hedef değişken (0: Mağlup, 1: Berabere, 2: Galip)
     result_mapping = {'Galip': 2, 'Berabere': 1, 'Mağlup': 0}
@@ -192,14 +453,17 @@ def prepare_features(team_data):
     y_score = team_data['MS Gol']
     
     # İY/MS için hedef değişken
-    def get_htft_label(row):
-        ht_goals = row['İY Gol']
-        ft_goals = row['MS Gol']
-        ht_result = '1' if ht_goals > row['İY Yenilen Gol'] else 'X' if ht_goals == row['İY Yenilen Gol'] else '2'
-        ft_result = '1' if ft_goals > row['MS Yenilen Gol'] else 'X' if ft_goals == row['MS Yenilen Gol'] else '2'
-        return f"{ht_result}-{ft_result}"
-    
-    y_htft = team_data.apply(get_htft_label, axis=1)
+    if vectorized:
+        y_htft = htft_labels(team_data)
+    else:
+        def get_htft_label(row):
+            ht_goals = row['İY Gol']
+            ft_goals = row['MS Gol']
+            ht_result = '1' if ht_goals > row['İY Yenilen Gol'] else 'X' if ht_goals == row['İY Yenilen Gol'] else '2'
+            ft_result = '1' if ft_goals > row['MS Yenilen Gol'] else 'X' if ft_goals == row['MS Yenilen Gol'] else '2'
+            return f"{ht_result}-{ft_result}"
+        
+        y_htft = team_data.apply(get_htft_label, axis=1)
     
     # KG tahmini için hedef değişken
     y_btts = (team_data['MS Gol'] > 0) & (team_data['MS Yenilen Gol'] > 0)
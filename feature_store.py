@@ -0,0 +1,383 @@
+import argparse
+import hashlib
+import json
+import os
+import threading
+import numpy as np
+import pandas as pd
+from data_preprocessing import preprocess_team_data
+
+# Derlenmiş özellik deposunun klasörü
+STORE_DIR = 'feature_store'
+STATS_DIR = 'stats'
+MANIFEST_FILE = 'manifest.json'
+STORE_FORMAT_VERSION = 1
+
+def file_checksum(file_path):
+    """
+    Dosyanın SHA-256 özetini döndürür.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _file_signature(file_path):
+    stat = os.stat(file_path)
+    return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+def _atomic_save(array, path):
+    """
+    Diziyi önce geçici dosyaya yazar, sonra tek adımda yerine taşır.
+    """
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array, allow_pickle=False)
+    os.replace(tmp_path, path)
+
+class FeatureStore:
+    """
+    stats/*.csv dosyalarının ön işlenmiş halini sütun bazlı .npy dizilerinde tutar.
+    Sayısal sütunlar tek bir float64 matriste, metin sütunları sabit genişlikli
+    unicode matriste, tarihler ayrı bir dizide saklanır. Takım indeksi her takımın
+    satır aralığını ve CSV dosyasının özetini manifest.json içinde kaydeder.
+    Diziler mmap ile açıldığı için tüm takımları yüklemek tek bir okuma kadar ucuzdur.
+    """
+    def __init__(self, store_dir=STORE_DIR):
+        self.store_dir = store_dir
+        self.manifest = None
+        self.numeric = None
+        self.text = None
+        self.text_missing = None
+        self.dates = None
+    
+    @property
+    def manifest_path(self):
+        return os.path.join(self.store_dir, MANIFEST_FILE)
+    
+    def exists(self):
+        return os.path.exists(self.manifest_path)
+    
+    def load(self):
+        """
+        Manifest'i okur ve dizileri mmap ile açar.
+        """
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('format_version') != STORE_FORMAT_VERSION:
+            raise ValueError(f"Desteklenmeyen özellik deposu sürümü: {manifest.get('format_version')}")
+        
+        arrays = manifest['arrays']
+        self.numeric = np.load(os.path.join(self.store_dir, arrays['numeric']), mmap_mode='r')
+        self.text = np.load(os.path.join(self.store_dir, arrays['text']), mmap_mode='r')
+        self.text_missing = np.load(os.path.join(self.store_dir, arrays['text_missing']), mmap_mode='r')
+        self.dates = np.load(os.path.join(self.store_dir, arrays['dates']), mmap_mode='r')
+        self.manifest = manifest
+        return self
+    
+    @property
+    def teams(self):
+        return list(self.manifest['teams'])
+    
+    def is_fresh(self, team, file_path):
+        """
+        Depodaki takım kaydının CSV dosyasıyla aynı içerikte olup olmadığını kontrol eder.
+        Önce mtime/boyut karşılaştırılır; farklıysa özet hesaplanır.
+        """
+        entry = self.manifest['teams'].get(team)
+        if entry is None or not os.path.exists(file_path):
+            return False
+        signature = _file_signature(file_path)
+        if signature['mtime_ns'] == entry['mtime_ns'] and signature['size'] == entry['size']:
+            return True
+        return signature['size'] == entry['size'] and file_checksum(file_path) == entry['sha256']
+    
+    def _build_frame(self, start, stop, columns, dtypes, index):
+        """
+        Satır aralığından istenen sütunlarla DataFrame oluşturur.
+        Sütunlar numpy dizileri olarak hazırlanıp DataFrame tek seferde kurulur.
+        """
+        layout = self.manifest['layout']
+        data = {}
+        for col in columns:
+            kind, pos = layout[col]
+            if kind == 'date':
+                data[col] = np.array(self.dates[start:stop])
+            elif kind == 'numeric':
+                data[col] = self.numeric[start:stop, pos].astype(dtypes[col])
+            else:
+                values = self.text[start:stop, pos].astype(object)
+                missing = self.text_missing[start:stop, pos]
+                if missing.any():
+                    values[missing] = np.nan
+                data[col] = values
+        df = pd.DataFrame(data, index=index, columns=columns)
+        
+        # Metin sütunlarının tipi pandas sürümüne göre object veya str olabilir
+        for col in columns:
+            if str(df[col].dtype) != dtypes[col]:
+                df[col] = df[col].astype(dtypes[col])
+        return df
+    
+    def team_frame(self, team):
+        """
+        Takımın ön işlenmiş DataFrame'ini preprocess_team_data çıktısıyla aynı biçimde döndürür.
+        """
+        entry = self.manifest['teams'][team]
+        start, stop = entry['start'], entry['stop']
+        return self._build_frame(start, stop, entry['columns'], entry['dtypes'], pd.RangeIndex(stop - start))
+    
+    def all_teams_frame(self, teams=None):
+        """
+        Tüm takımların verisini tek bir DataFrame olarak döndürür.
+        Sonuç, takım DataFrame'lerinin pd.concat ile birleştirilmesine eşittir.
+        """
+        teams = self.teams if teams is None else list(teams)
+        entries = [self.manifest['teams'][team] for team in teams]
+        if not entries:
+            return pd.DataFrame()
+        
+        columns = []
+        for entry in entries:
+            columns.extend(col for col in entry['columns'] if col not in columns)
+        
+        # pd.concat ile aynı ortak tipleri kullan
+        layout = self.manifest['layout']
+        dtypes = {}
+        for col in columns:
+            team_dtypes = sorted({entry['dtypes'][col] for entry in entries if col in entry['dtypes']})
+            if len(team_dtypes) == 1:
+                dtypes[col] = team_dtypes[0]
+            elif layout[col][0] == 'numeric':
+                dtypes[col] = str(np.result_type(*team_dtypes))
+            else:
+                dtypes[col] = 'object'
+        
+        # Takımlar depoda ardışık olduğundan tek bir aralık yeterlidir
+        contiguous = all(entries[i]['stop'] == entries[i + 1]['start'] for i in range(len(entries) - 1))
+        index = np.concatenate([np.arange(entry['stop'] - entry['start']) for entry in entries])
+        if contiguous and all(entry['columns'] == columns for entry in entries):
+            return self._build_frame(entries[0]['start'], entries[-1]['stop'], columns, dtypes, index)
+        return pd.concat([self.team_frame(team) for team in teams])
+
+def _frame_layout(frames):
+    """
+    Takım DataFrame'lerinden sütunların depodaki yerleşimini belirler.
+    """
+    layout = {}
+    numeric_count = 0
+    text_count = 0
+    for df in frames:
+        for col in df.columns:
+            if col == 'Tarih':
+                kind = 'date'
+            elif pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col]):
+                kind = 'numeric'
+            else:
+                kind = 'text'
+            if col in layout:
+                if layout[col][0] != kind:
+                    raise ValueError(f"{col} sütunu takımlar arasında farklı tiplerde")
+                continue
+            if kind == 'numeric':
+                layout[col] = (kind, numeric_count)
+                numeric_count += 1
+            elif kind == 'text':
+                layout[col] = (kind, text_count)
+                text_count += 1
+            else:
+                layout[col] = (kind, 0)
+    return layout, numeric_count, text_count
+
+def compile_feature_store(stats_dir=STATS_DIR, store_dir=STORE_DIR, verbose=True):
+    """
+    stats klasöründeki CSV'leri ön işleyip tek bir sütunlu depoya derler.
+    Özeti değişmeyen takımlar eski depodan kopyalanır, yalnızca değişenler yeniden okunur.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    
+    old_store = FeatureStore(store_dir)
+    try:
+        old_store = old_store.load() if old_store.exists() else None
+    except Exception as e:
+        print(f"Eski özellik deposu okunamadı, baştan derlenecek: {str(e)}")
+        old_store = None
+    
+    teams = sorted(file[:-4] for file in os.listdir(stats_dir) if file.endswith('.csv'))
+    frames = []
+    entries = {}
+    rebuilt = []
+    for team in teams:
+        file_path = os.path.join(stats_dir, f'{team}.csv')
+        signature = _file_signature(file_path)
+        checksum = file_checksum(file_path)
+        old_entry = old_store.manifest['teams'].get(team) if old_store else None
+        if old_entry is not None and old_entry['sha256'] == checksum:
+            df = old_store.team_frame(team)
+        else:
+            df = preprocess_team_data(file_path)
+            rebuilt.append(team)
+        frames.append(df)
+        entries[team] = {
+            'file': file_path,
+            'sha256': checksum,
+            'mtime_ns': signature['mtime_ns'],
+            'size': signature['size'],
+            'rows': len(df),
+            'columns': list(df.columns),
+            'dtypes': {col: str(dtype) for col, dtype in df.dtypes.items()}
+        }
+    
+    removed = sorted(set(old_store.manifest['teams']) - set(teams)) if old_store else []
+    if old_store is not None and not rebuilt and not removed:
+        # Yalnızca mtime değişmiş olabilir; manifest'i güncellemek yeterli
+        arrays = old_store.manifest['arrays']
+        layout = old_store.manifest['layout']
+        for team, entry in entries.items():
+            entry['start'] = old_store.manifest['teams'][team]['start']
+            entry['stop'] = old_store.manifest['teams'][team]['stop']
+    else:
+        layout, numeric_count, text_count = _frame_layout(frames)
+        total = sum(len(df) for df in frames)
+        # Sütun dilimleri bitişik olsun diye sayısal matris sütun öncelikli tutulur
+        numeric = np.full((total, numeric_count), np.nan, dtype=np.float64, order='F')
+        text_values = np.full((total, text_count), '', dtype=object)
+        text_missing = np.ones((total, text_count), dtype=bool)
+        dates = np.full(total, np.datetime64('NaT'), dtype=frames[0]['Tarih'].dtype if frames else 'datetime64[ns]')
+        
+        offset = 0
+        for team, df in zip(teams, frames):
+            stop = offset + len(df)
+            entries[team]['start'] = offset
+            entries[team]['stop'] = stop
+            for col in df.columns:
+                kind, pos = layout[col]
+                if kind == 'date':
+                    dates[offset:stop] = df[col].to_numpy(dtype=dates.dtype)
+                elif kind == 'numeric':
+                    numeric[offset:stop, pos] = df[col].to_numpy(dtype=np.float64)
+                else:
+                    values = df[col].to_numpy(dtype=object)
+                    missing = pd.isna(values)
+                    text_missing[offset:stop, pos] = missing
+                    text_values[offset:stop, pos] = np.where(missing, '', values)
+            offset = stop
+        # mmap ile açılabilmesi için sabit genişlikli unicode diziye çevir
+        text_values = text_values.astype(str)
+        
+        # Dizi adları içerik özetine bağlıdır; manifest en son yazıldığı için
+        # okuyucular hiçbir zaman yarım yazılmış bir depo görmez
+        version = hashlib.sha256(''.join(entries[team]['sha256'] for team in teams).encode()).hexdigest()[:16]
+        arrays = {
+            'numeric': f'numeric-{version}.npy',
+            'text': f'text-{version}.npy',
+            'text_missing': f'text_missing-{version}.npy',
+            'dates': f'dates-{version}.npy'
+        }
+        _atomic_save(numeric, os.path.join(store_dir, arrays['numeric']))
+        _atomic_save(text_values, os.path.join(store_dir, arrays['text']))
+        _atomic_save(text_missing, os.path.join(store_dir, arrays['text_missing']))
+        _atomic_save(dates, os.path.join(store_dir, arrays['dates']))
+    
+    manifest = {
+        'format_version': STORE_FORMAT_VERSION,
+        'stats_dir': stats_dir,
+        'arrays': arrays,
+        'layout': layout,
+        'teams': entries
+    }
+    manifest_path = os.path.join(store_dir, MANIFEST_FILE)
+    tmp_path = f"{manifest_path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, manifest_path)
+    
+    # Artık kullanılmayan eski dizileri sil
+    for file in os.listdir(store_dir):
+        if file.endswith('.npy') and file not in arrays.values():
+            os.remove(os.path.join(store_dir, file))
+    
+    if verbose:
+        print(f"Özellik deposu derlendi: {len(teams)} takım, {len(rebuilt)} takım yeniden okundu"
+              + (f", {len(removed)} takım silindi" if removed else "") + ".")
+    _store_cache.clear()
+    return FeatureStore(store_dir).load()
+
+# Açılmış depoları manifest değişene kadar paylaş
+_store_cache = {}
+_store_lock = threading.Lock()
+
+def get_feature_store(store_dir=STORE_DIR):
+    """
+    Derlenmiş özellik deposunu döndürür; depo yoksa veya okunamıyorsa None döner.
+    """
+    manifest_path = os.path.join(store_dir, MANIFEST_FILE)
+    try:
+        mtime = os.stat(manifest_path).st_mtime_ns
+    except OSError:
+        return None
+    with _store_lock:
+        cached = _store_cache.get(store_dir)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        try:
+            store = FeatureStore(store_dir).load()
+        except Exception as e:
+            print(f"Özellik deposu okunamadı: {str(e)}")
+            return None
+        _store_cache[store_dir] = (mtime, store)
+        return store
+
+def load_team_from_store(file_path, store_dir=STORE_DIR):
+    """
+    CSV dosyası depodaki haliyle aynıysa takım verisini depodan döndürür, değilse None.
+    """
+    store = get_feature_store(store_dir)
+    if store is None:
+        return None
+    team = os.path.splitext(os.path.basename(file_path))[0]
+    entry = store.manifest['teams'].get(team)
+    if entry is None or os.path.normpath(entry['file']) != os.path.normpath(file_path):
+        return None
+    if not store.is_fresh(team, file_path):
+        return None
+    return store.team_frame(team)
+
+def fresh_feature_store(stats_dir=STATS_DIR, store_dir=STORE_DIR):
+    """
+    Depoyu gerekiyorsa artımlı olarak güncelleyip (depo, takım listesi) döndürür.
+    Takımlar stats klasöründeki CSV dosyalarının adlarına göre sıralıdır.
+    """
+    store = get_feature_store(store_dir)
+    teams = sorted(file[:-4] for file in os.listdir(stats_dir) if file.endswith('.csv'))
+    stale = (
+        store is None
+        or store.manifest['stats_dir'] != stats_dir
+        or sorted(store.manifest['teams']) != teams
+        or not all(store.is_fresh(team, os.path.join(stats_dir, f'{team}.csv')) for team in teams)
+    )
+    if stale:
+        store = compile_feature_store(stats_dir, store_dir)
+    return store, teams
+
+def load_all_teams(stats_dir=STATS_DIR, store_dir=STORE_DIR):
+    """
+    Depoyu gerekiyorsa artımlı olarak güncelleyip tüm takımların verisini tek DataFrame olarak döndürür.
+    """
+    store, teams = fresh_feature_store(stats_dir, store_dir)
+    return store.all_teams_frame(teams)
+
+def main(argv=None):
+    """
+    Özellik deposunu derleyen komut satırı arayüzü.
+    """
+    parser = argparse.ArgumentParser(description="stats/*.csv dosyalarını sütunlu özellik deposuna derler")
+    parser.add_argument('--stats-dir', default=STATS_DIR, help="Takım CSV klasörü")
+    parser.add_argument('--store-dir', default=STORE_DIR, help="Derlenmiş deponun klasörü")
+    args = parser.parse_args(argv)
+    compile_feature_store(args.stats_dir, args.store_dir)
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
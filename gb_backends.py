@@ -0,0 +1,155 @@
+import os
+import re
+import numpy as np
+import sklearn
+from sklearn.base import BaseEstimator, ClassifierMixin, clone
+from sklearn.ensemble import (
+    GradientBoostingClassifier, GradientBoostingRegressor,
+    HistGradientBoostingClassifier, HistGradientBoostingRegressor
+)
+from sklearn.preprocessing import LabelEncoder
+
+# Gradient boosting modelleri için kullanılabilecek kütüphaneler
+GB_BACKENDS = ['sklearn', 'hist', 'lightgbm', 'xgboost']
+
+# Varsayılan kütüphane; GB_BACKEND ortam değişkeniyle değiştirilebilir
+GB_BACKEND = os.environ.get('GB_BACKEND') or 'sklearn'
+
+# HistGradientBoosting* max_features parametresini scikit-learn 1.4'ten itibaren destekler
+_SKLEARN_VERSION = tuple(int(part) for part in re.match(r'(\d+)\.(\d+)', sklearn.__version__).groups())
+HIST_MAX_FEATURES = _SKLEARN_VERSION >= (1, 4)
+
+class EncodedLabelClassifier(ClassifierMixin, BaseEstimator):
+    """
+    Yalnızca 0..n-1 tam sayı etiketlerle eğitilebilen sınıflandırıcıları (XGBoost)
+    'X-1' veya True gibi etiketlerle kullanılabilir hale getiren sarmalayıcı.
+    """
+    def __init__(self, estimator):
+        self.estimator = estimator
+    
+    def fit(self, X, y):
+        self.label_encoder_ = LabelEncoder().fit(y)
+        self.classes_ = self.label_encoder_.classes_
+        self.estimator_ = clone(self.estimator).fit(X, self.label_encoder_.transform(y))
+        return self
+    
+    def predict_proba(self, X):
+        return self.estimator_.predict_proba(X)
+    
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+    
+    @property
+    def feature_importances_(self):
+        return self.estimator_.feature_importances_
+
+def _feature_fraction(max_features, n_features):
+    """
+    sklearn'ün max_features değerini (None, 'sqrt', 'log2', oran veya sayı) 0-1 arası orana çevirir.
+    """
+    if max_features is None or n_features is None:
+        return 1.0
+    if max_features == 'sqrt':
+        count = max(1, int(np.sqrt(n_features)))
+    elif max_features == 'log2':
+        count = max(1, int(np.log2(n_features)))
+    elif isinstance(max_features, float):
+        return max_features
+    else:
+        count = int(max_features)
+    return min(1.0, count / n_features)
+
+def gradient_boosting(model_type, backend=GB_BACKEND, n_features=None, n_estimators=100, learning_rate=0.1,
+                      max_depth=3, min_samples_split=2, min_samples_leaf=1, subsample=1.0,
+                      max_features=None, random_state=None):
+    """
+    sklearn GradientBoosting* parametreleriyle verilen kütüphanenin modelini oluşturur.
+    
+    - hist: HistGradientBoosting*; ağaç sayısı max_iter, yaprak sınırı 2**max_depth.
+      Alt örnekleme (subsample) ve min_samples_split karşılığı yoktur; özellik
+      alt örneklemesi (max_features) yalnızca scikit-learn 1.4 ve sonrasında uygulanır.
+    - lightgbm: num_leaves=2**max_depth, min_child_samples=min_samples_leaf,
+      max_features düğüm başına özellik oranı (feature_fraction_bynode) olur.
+    - xgboost: hist ağaç yöntemi, min_child_weight=min_samples_leaf (sınıflandırmada
+      lojistik kaybın hessian'ı en fazla 0.25 olduğu için 0.25 ile çarpılır),
+      max_features colsample_bynode olur. Etiketler EncodedLabelClassifier ile kodlanır.
+    
+    Modeller train_models'ta zaten ayrı süreçlerde paralel eğitildiği için
+    LightGBM ve XGBoost tek iş parçacığıyla çalıştırılır. Kütüphane yüklü değilse
+    uyarı yazdırılıp sklearn modeli kullanılır.
+    """
+    if backend not in GB_BACKENDS:
+        raise ValueError(f"Bilinmeyen gradient boosting kütüphanesi: {backend} (seçenekler: {', '.join(GB_BACKENDS)})")
+    classification = model_type == 'classification'
+    fraction = _feature_fraction(max_features, n_features)
+    
+    if backend == 'hist':
+        estimator = HistGradientBoostingClassifier if classification else HistGradientBoostingRegressor
+        params = dict(
+            max_iter=n_estimators,
+            learning_rate=learning_rate,
+            max_depth=max_depth,
+            max_leaf_nodes=2 ** max_depth,
+            min_samples_leaf=min_samples_leaf,
+            early_stopping=False,
+            random_state=random_state
+        )
+        if HIST_MAX_FEATURES:
+            params['max_features'] = fraction
+        return estimator(**params)
+    
+    if backend == 'lightgbm':
+        try:
+            from lightgbm import LGBMClassifier, LGBMRegressor
+        except ImportError:
+            print("Uyarı: lightgbm yüklü değil, sklearn GradientBoosting kullanılacak.")
+            backend = 'sklearn'
+        else:
+            estimator = LGBMClassifier if classification else LGBMRegressor
+            return estimator(
+                n_estimators=n_estimators,
+                learning_rate=learning_rate,
+                max_depth=max_depth,
+                num_leaves=2 ** max_depth,
+                min_child_samples=min_samples_leaf,
+                subsample=subsample,
+                subsample_freq=1 if subsample < 1.0 else 0,
+                feature_fraction_bynode=fraction,
+                random_state=random_state,
+                n_jobs=1,
+                verbose=-1
+            )
+    
+    if backend == 'xgboost':
+        try:
+            from xgboost import XGBClassifier, XGBRegressor
+        except ImportError:
+            print("Uyarı: xgboost yüklü değil, sklearn GradientBoosting kullanılacak.")
+            backend = 'sklearn'
+        else:
+            params = dict(
+                n_estimators=n_estimators,
+                learning_rate=learning_rate,
+                max_depth=max_depth,
+                min_child_weight=min_samples_leaf * (0.25 if classification else 1.0),
+                subsample=subsample,
+                colsample_bynode=fraction,
+                tree_method='hist',
+                random_state=random_state,
+                n_jobs=1
+            )
+            if classification:
+                return EncodedLabelClassifier(XGBClassifier(**params))
+            return XGBRegressor(**params)
+    
+    estimator = GradientBoostingClassifier if classification else GradientBoostingRegressor
+    return estimator(
+        n_estimators=n_estimators,
+        learning_rate=learning_rate,
+        max_depth=max_depth,
+        min_samples_split=min_samples_split,
+        min_samples_leaf=min_samples_leaf,
+        subsample=subsample,
+        max_features=max_features,
+        random_state=random_state
+    )
@@ -0,0 +1,197 @@
+import bisect
+import functools
+import os
+import threading
+import time
+
+# Histogram kova sınırları (saniye); Prometheus'un varsayılanlarına milisaniye altı kovalar eklenmiştir
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Ölçüm aileleri: Prometheus metrik adı, açıklaması ve etiket adları
+FAMILIES = {
+    'stage': ('football_ai_stage_seconds', "Tahmin hattı aşamalarının süresi", ('stage',)),
+    'model': ('football_ai_model_seconds', "Modellerin predict/predict_proba süresi", ('market', 'model', 'method')),
+    'request': ('football_ai_request_seconds', "Web isteklerinin toplam süresi", ('endpoint',))
+}
+
+# Ölçümler varsayılan olarak açıktır; LATENCY_METRICS=0 ile kapatılabilir
+METRICS_ENABLED = os.environ.get('LATENCY_METRICS', '1') != '0'
+
+class Histogram:
+    """
+    Sabit kovalı süre histogramı: kova sayıları, toplam, adet ve en uzun süre.
+    """
+    __slots__ = ('counts', 'total', 'count', 'max')
+    
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+    
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+        if seconds > self.max:
+            self.max = seconds
+    
+    def quantile(self, q):
+        """
+        Prometheus'un histogram_quantile'ı gibi yüzdeliği kova içinde doğrusal olarak tahmin eder;
+        sonuç gözlenen en uzun süreyi geçmez.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = BUCKETS[i - 1] if i > 0 else 0.0
+                upper = BUCKETS[i] if i < len(BUCKETS) else self.max
+                return min(self.max, lower + (upper - lower) * (rank - seen) / bucket_count)
+            seen += bucket_count
+        return self.max
+
+class _Timer:
+    """
+    with bloğunun süresini ölçüp histograma ekleyen hafif zamanlayıcı.
+    """
+    __slots__ = ('metrics', 'family', 'labels', 'start')
+    
+    def __init__(self, metrics, family, labels):
+        self.metrics = metrics
+        self.family = family
+        self.labels = labels
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.metrics.observe(self.family, self.labels, time.perf_counter() - self.start)
+        return False
+
+class _NullTimer:
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+class LatencyMetrics:
+    """
+    Aşama, model ve web isteği süreleri için thread-safe histogram kaydı. Ölçüm başına
+    maliyet bir perf_counter çağrısı ve kilit altında bir kova artırımıdır; üretimde
+    açık bırakılabilir. Sonuçlar Prometheus metin biçiminde (/metrics) veya komut
+    satırı özeti olarak alınır.
+    """
+    def __init__(self, enabled=METRICS_ENABLED):
+        self.enabled = enabled
+        self._histograms = {family: {} for family in FAMILIES}
+        self._lock = threading.Lock()
+    
+    def observe(self, family, labels, seconds):
+        """
+        Bir süreyi (saniye) ailenin verilen etiketli histogramına ekler.
+        """
+        with self._lock:
+            histogram = self._histograms[family].get(labels)
+            if histogram is None:
+                histogram = self._histograms[family][labels] = Histogram()
+            histogram.observe(seconds)
+    
+    def timer(self, family, *labels):
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, family, labels)
+    
+    def timed(self, stage):
+        """
+        with bloğunu bir aşama olarak ölçer: with latency_metrics.timed('prepare_features'): ...
+        """
+        return self.timer('stage', stage)
+    
+    def model_timer(self, market, model, method):
+        """
+        Bir modelin predict/predict_proba çağrısını ölçer.
+        """
+        return self.timer('model', market, model, method)
+    
+    def clear(self):
+        with self._lock:
+            for histograms in self._histograms.values():
+                histograms.clear()
+    
+    def snapshot(self):
+        """
+        Tüm histogramların (aile, etiketler, histogram kopyası) listesini döndürür.
+        """
+        with self._lock:
+            rows = []
+            for family, histograms in self._histograms.items():
+                for labels, histogram in sorted(histograms.items()):
+                    copy = Histogram()
+                    copy.counts = list(histogram.counts)
+                    copy.total, copy.count, copy.max = histogram.total, histogram.count, histogram.max
+                    rows.append((family, labels, copy))
+            return rows
+    
+    def render_prometheus(self):
+        """
+        Histogramları Prometheus metin biçiminde (text/plain; version=0.0.4) döndürür.
+        """
+        rows = self.snapshot()
+        lines = []
+        for family, (name, description, label_names) in FAMILIES.items():
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} histogram")
+            for row_family, labels, histogram in rows:
+                if row_family != family:
+                    continue
+                label_text = ','.join(f'{key}="{_escape_label(value)}"' for key, value in zip(label_names, labels))
+                cumulative = 0
+                for bound, bucket_count in zip(BUCKETS + ('+Inf',), histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f'{name}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_sum{{{label_text}}} {histogram.total!r}')
+                lines.append(f'{name}_count{{{label_text}}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+    
+    def print_summary(self):
+        """
+        Her aşama ve model için adet, ortalama, p50, p95 ve en uzun süreyi yazdırır.
+        """
+        rows = [row for row in self.snapshot() if row[2].count]
+        if not rows:
+            return
+        print("\nGecikme özeti (ms):")
+        print(f"{'ölçüm':<55} {'adet':>6} {'ort.':>9} {'p50':>9} {'p95':>9} {'en uzun':>9}")
+        for family, labels, histogram in sorted(rows, key=lambda row: -row[2].total):
+            name = f"{family}: {' / '.join(str(label) for label in labels)}"
+            print(f"{name:<55} {histogram.count:>6} {histogram.total / histogram.count * 1000:>9.2f} "
+                  f"{histogram.quantile(0.5) * 1000:>9.2f} {histogram.quantile(0.95) * 1000:>9.2f} "
+                  f"{histogram.max * 1000:>9.2f}")
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+# Tüm modüllerin paylaştığı ölçüm kaydı
+latency_metrics = LatencyMetrics()
+
+def timed_stage(stage):
+    """
+    Fonksiyonun her çağrısını verilen aşama adıyla ölçen dekoratör.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with latency_metrics.timed(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
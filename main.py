@@ -1,69 +1,68 @@
+import argparse
 from utils import get_team_selection
-from data_preprocessing import get_team_stats, prepare_features
-from model_training import train_models, save_models, load_models, MODELS_DIR
+from model_store import save_models, models_exist
+from model_registry import model_registry
 from prediction import display_predictions
-import os
-import pandas as pd
+from prediction_matrix import refresh_registry_matrix
+from latency_metrics import latency_metrics
+from profiling import PROFILE_DIR, profile_call
 
-def main():
+def train_and_save_models(training_options):
     """
-    Ana program akışı
+    Modelleri tüm veriyle eğitir, kaydeder ve kayda yerleştirir. Eğitim modülleri
+    (ve sklearn eğitim yığını) yalnızca eğitim gerektiğinde yüklenir.
+    training_options train_models'e iletilir (ör. n_jobs).
     """
+    from training_data import load_training_data
+    from model_training import train_models, build_training_state
+    
+    print("\nModeller eğitiliyor...")
+    
+    # Eğitim verisini takım takım, önceden ayrılmış float32 matrise oku
+    features, y_match, y_score, y_htft, y_btts = load_training_data()
+    
+    # Modelleri eğit
+    models, scaler = train_models(features, y_match, y_score, y_htft, y_btts, **training_options)
+    
+    # Modelleri kaydet
+    save_models(models, scaler, training_state=build_training_state())
+    model_registry.set(models, scaler)
+    print("Modeller eğitildi ve kaydedildi.")
+
+def run(jobs=None):
+    """
+    Ana program akışı. jobs verilirse eğitim ve güncelleme o kadar paralel işçiyle
+    yapılır (varsayılan: TRAINING_JOBS veya tüm çekirdekler).
+    """
+    training_options = {} if jobs is None else {'n_jobs': jobs}
     print("Futbol Maç Tahmin Sistemi")
     print("=" * 50)
     
     # Model dosyalarını kontrol et
-    model_files_exist = all(
-        os.path.exists(os.path.join(MODELS_DIR, f'{name}_model.joblib'))
-        for name in ['RandomForest', 'GradientBoosting', 'SVC']
-    ) and os.path.exists(os.path.join(MODELS_DIR, 'scaler.joblib'))
+    model_files_exist = models_exist()
     
     # Modeller yoksa veya yüklenemezse yeniden eğit
     if not model_files_exist:
-        print("\nModeller eğitiliyor...")
-        
-        # Tüm takımların verilerini birleştir
-        all_data = []
-        for file in os.listdir('stats'):
-            if file.endswith('.csv'):
-                team_name = file[:-4]
-                team_data = get_team_stats(team_name)
-                all_data.append(team_data)
-        
-        # Özellikleri hazırla
-        features, y_match, y_score, y_htft, y_btts = prepare_features(pd.concat(all_data))
-        
-        # Modelleri eğit
-        models, scaler = train_models(features, y_match, y_score, y_htft, y_btts)
-        
-        # Modelleri kaydet
-        save_models(models, scaler)
-        print("Modeller eğitildi ve kaydedildi.")
+        train_and_save_models(training_options)
     else:
-        # Modelleri yüklemeyi dene
-        models, scaler = load_models()
+        # Modelleri yüklemeyi dene (tahminler aynı kaydı kullanır, tekrar yüklenmez)
+        models, scaler = model_registry.load()
         if models is None:  # Yükleme başarısız olduysa yeniden eğit
-            print("\nModeller eğitiliyor...")
-            
-            # Tüm takımların verilerini birleştir
-            all_data = []
-            for file in os.listdir('stats'):
-                if file.endswith('.csv'):
-                    team_name = file[:-4]
-                    team_data = get_team_stats(team_name)
-                    all_data.append(team_data)
-            
-            # Özellikleri hazırla
-            features, y_match, y_score, y_htft, y_btts = prepare_features(pd.concat(all_data))
-            
-            # Modelleri eğit
-            models, scaler = train_models(features, y_match, y_score, y_htft, y_btts)
-            
-            # Modelleri kaydet
-            save_models(models, scaler)
-            print("Modeller eğitildi ve kaydedildi.")
+            train_and_save_models(training_options)
         else:
             print("\nKaydedilmiş modeller yüklendi.")
+            model_registry.print_report()
+            
+            # Son eğitimden sonra eklenen maçlarla modelleri artımlı güncelle
+            from model_training import update_models
+            models, scaler, training_state = update_models(models, scaler, **training_options)
+            if training_state is not None:
+                save_models(models, scaler, training_state=training_state)
+                model_registry.set(models, scaler)
+                print("Modeller yeni maçlarla güncellendi ve kaydedildi.")
+    
+    # Tüm takım eşleşmelerinin tahminlerini önceden hesapla (değişen takımlar yeniden hesaplanır)
+    refresh_registry_matrix(model_registry)
     
     while True:
         # Takım seçimi
@@ -77,7 +76,29 @@ def main():
         if input().upper() != 'E':
             break
     
+    # Oturumdaki okuma, ölçekleme ve model sürelerinin özeti
+    latency_metrics.print_summary()
     print("\nProgram sonlandırıldı.")
 
+def main(argv=None):
+    """
+    Komut satırı seçeneklerini okuyup programı çalıştırır. --profile verilirse eğitim
+    ve tahminler dahil tüm çalıştırma cProfile altında yapılır ve profil kaydedilir.
+    """
+    parser = argparse.ArgumentParser(description="Futbol Maç Tahmin Sistemi")
+    parser.add_argument('--profile', action='store_true',
+                        help="Çalıştırmayı cProfile ile profille ve .prof dosyası yaz")
+    parser.add_argument('--profile-dir', default=PROFILE_DIR, help="Profil dosyalarının klasörü")
+    parser.add_argument('--jobs', type=int, default=None,
+                        help="Eğitimdeki paralel işçi sayısı (-1: tüm çekirdekler, 1: sıralı; varsayılan TRAINING_JOBS)")
+    args = parser.parse_args(argv)
+    if args.jobs == 0:
+        parser.error("--jobs 0 olamaz (-1: tüm çekirdekler)")
+    
+    if args.profile:
+        profile_call(run, args.jobs, name='main', profile_dir=args.profile_dir)
+    else:
+        run(args.jobs)
+
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,251 @@
+import argparse
+import hashlib
+import importlib.metadata
+import json
+import os
+import platform
+import shutil
+import threading
+from datetime import datetime
+import joblib
+
+# Sürümlü model paketlerinin klasörü ve geçerli sürümü gösteren dosya
+BUNDLES_DIR = 'bundles'
+CURRENT_FILE = 'CURRENT'
+MANIFEST_FILE = 'manifest.json'
+BUNDLE_FORMAT_VERSION = 1
+
+# Geri dönüş için saklanacak en fazla paket sayısı
+MAX_BUNDLE_VERSIONS = 5
+
+def _bundles_dir(models_dir, prefix=''):
+    return os.path.join(models_dir, f'{prefix}{BUNDLES_DIR}')
+
+def _current_path(models_dir, prefix=''):
+    return os.path.join(models_dir, f'{prefix}{CURRENT_FILE}')
+
+def _atomic_write_text(path, text):
+    """
+    Metni önce yazana özel (süreç ve iş parçacığı numaralı) geçici dosyaya yazar,
+    sonra tek adımda yerine taşır; eşzamanlı yazanlar birbirinin dosyasını ezmez.
+    """
+    tmp_path = f'{path}.tmp-{os.getpid()}-{threading.get_ident()}'
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def training_data_hash(training_state):
+    """
+    Eğitim durumundaki takım dosyası özetlerinden eğitim verisinin özetini hesaplar.
+    """
+    teams = training_state.get('teams', {})
+    checksums = [(team, teams[team].get('checksum')) for team in sorted(teams)]
+    return hashlib.sha256(json.dumps(checksums).encode('utf-8')).hexdigest()
+
+def current_version(models_dir, prefix=''):
+    """
+    Geçerli paket sürümünü döndürür; paket yoksa None.
+    """
+    path = _current_path(models_dir, prefix)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        version = f.read().strip()
+    if not os.path.exists(os.path.join(_bundles_dir(models_dir, prefix), version, MANIFEST_FILE)):
+        return None
+    return version
+
+def list_versions(models_dir, prefix=''):
+    """
+    Kaydedilmiş paket sürümlerini eskiden yeniye döndürür.
+    """
+    bundles_dir = _bundles_dir(models_dir, prefix)
+    if not os.path.isdir(bundles_dir):
+        return []
+    return sorted(
+        name for name in os.listdir(bundles_dir)
+        if not name.startswith('.') and os.path.exists(os.path.join(bundles_dir, name, MANIFEST_FILE))
+    )
+
+def read_manifest(models_dir, version=None, prefix=''):
+    """
+    Verilen (varsayılan: geçerli) sürümün manifest'ini döndürür; paket yoksa None.
+    """
+    version = version or current_version(models_dir, prefix)
+    if version is None:
+        return None
+    with open(os.path.join(_bundles_dir(models_dir, prefix), version, MANIFEST_FILE), encoding='utf-8') as f:
+        return json.load(f)
+
+def bundle_artifact_paths(models_dir, manifest, prefix=''):
+    """
+    Paketteki dosyaları manifest sırasıyla (tahmin türü, model adı, yol) olarak döndürür.
+    Selector ve scaler için model adı None'dır.
+    """
+    bundle_dir = os.path.join(_bundles_dir(models_dir, prefix), manifest['version'])
+    return [
+        (artifact['market'], artifact['name'], os.path.join(bundle_dir, artifact['file']))
+        for artifact in manifest['artifacts']
+    ]
+
+def save_bundle(models, scaler, models_dir, training_state=None, prefix=''):
+    """
+    Modelleri, scaler'ı ve manifest'i yeni bir sürüm klasörüne yazar ve geçerli sürümü
+    ona çevirir. Paket önce geçici klasörde hazırlanıp tek adımda yerine taşındığı için
+    yarım kalan bir kayıt geçerli sürümü bozmaz.
+    """
+    bundles_dir = _bundles_dir(models_dir, prefix)
+    os.makedirs(bundles_dir, exist_ok=True)
+    
+    data_hash = training_data_hash(training_state) if training_state is not None else None
+    version = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+    if data_hash is not None:
+        version = f'{version}-{data_hash[:8]}'
+    
+    tmp_dir = os.path.join(bundles_dir, f'.tmp-{version}')
+    os.makedirs(tmp_dir)
+    try:
+        artifacts = []
+        for model_type, model_dict in models.items():
+            if model_type == 'btts_selector':
+                entries = [(None, model_dict, f'{model_type}.joblib')]
+            else:
+                entries = [(name, model, f'{model_type}_{name}_model.joblib') for name, model in model_dict.items()]
+            for name, model, file_name in entries:
+                joblib.dump(model, os.path.join(tmp_dir, file_name))
+                artifacts.append({
+                    'market': model_type,
+                    'name': name,
+                    'estimator': type(model).__name__,
+                    'file': file_name
+                })
+        joblib.dump(scaler, os.path.join(tmp_dir, 'scaler.joblib'))
+        artifacts.append({'market': 'scaler', 'name': None, 'estimator': type(scaler).__name__, 'file': 'scaler.joblib'})
+        
+        if training_state is not None:
+            with open(os.path.join(tmp_dir, 'training_state.json'), 'w', encoding='utf-8') as f:
+                json.dump(training_state, f, ensure_ascii=False, indent=2)
+        
+        feature_columns = getattr(scaler, 'feature_names_in_', None)
+        manifest = {
+            'format_version': BUNDLE_FORMAT_VERSION,
+            'version': version,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'markets': {
+                model_type: sorted(model_dict) if isinstance(model_dict, dict) else [type(model_dict).__name__]
+                for model_type, model_dict in models.items()
+            },
+            'artifacts': artifacts,
+            'feature_columns': None if feature_columns is None else [str(column) for column in feature_columns],
+            'n_features': int(scaler.n_features_in_),
+            'training_data_hash': data_hash,
+            'sklearn_version': sklearn_version(),
+            'joblib_version': joblib.__version__,
+            'python_version': platform.python_version()
+        }
+        with open(os.path.join(tmp_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        
+        os.replace(tmp_dir, os.path.join(bundles_dir, version))
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    
+    _atomic_write_text(_current_path(models_dir, prefix), version)
+    prune_versions(models_dir, prefix=prefix)
+    return version
+
+def sklearn_version():
+    """
+    Yüklü scikit-learn sürümünü, sklearn'ün kendisini (ve scipy'yi) içe aktarmadan paket bilgisinden okur.
+    """
+    return importlib.metadata.version('scikit-learn')
+
+def check_manifest(manifest, scaler):
+    """
+    Yüklenen paketin ortamla ve kendi içinde tutarlı olduğunu kontrol eder, uyarıları yazdırır.
+    """
+    installed = sklearn_version()
+    if manifest['sklearn_version'] != installed:
+        print(f"Uyarı: Modeller scikit-learn {manifest['sklearn_version']} ile kaydedilmiş, "
+              f"yüklü sürüm {installed}.")
+    if manifest['n_features'] != scaler.n_features_in_:
+        raise ValueError(f"Manifest {manifest['n_features']} özellik bekliyor, scaler {scaler.n_features_in_} özellikli.")
+
+def load_training_state(models_dir, version=None, prefix=''):
+    """
+    Paketle birlikte kaydedilen eğitim durumunu döndürür; yoksa None.
+    """
+    version = version or current_version(models_dir, prefix)
+    if version is None:
+        return None
+    state_path = os.path.join(_bundles_dir(models_dir, prefix), version, 'training_state.json')
+    if not os.path.exists(state_path):
+        return None
+    with open(state_path, encoding='utf-8') as f:
+        return json.load(f)
+
+def rollback(models_dir, version=None, prefix=''):
+    """
+    Geçerli sürümü verilen sürüme, verilmezse bir önceki sürüme çevirir.
+    """
+    versions = list_versions(models_dir, prefix)
+    if version is None:
+        current = current_version(models_dir, prefix)
+        older = [name for name in versions if current is None or name < current]
+        if not older:
+            raise ValueError("Geri dönülecek önceki bir model sürümü yok.")
+        version = older[-1]
+    elif version not in versions:
+        raise ValueError(f"Model sürümü bulunamadı: {version}")
+    
+    _atomic_write_text(_current_path(models_dir, prefix), version)
+    return version
+
+def prune_versions(models_dir, keep=MAX_BUNDLE_VERSIONS, prefix=''):
+    """
+    Geçerli sürüm dışında en yeni keep sürümü bırakıp eskilerini siler.
+    """
+    current = current_version(models_dir, prefix)
+    versions = list_versions(models_dir, prefix)
+    for version in versions[:-keep] if keep > 0 else versions:
+        if version != current:
+            shutil.rmtree(os.path.join(_bundles_dir(models_dir, prefix), version), ignore_errors=True)
+
+def main(argv=None):
+    """
+    Model paketlerini listeleyen ve önceki sürüme dönen komut satırı arayüzü.
+    """
+    from model_store import MODELS_DIR
+    
+    parser = argparse.ArgumentParser(description="Sürümlü model paketleri")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('list', help="Kaydedilmiş sürümleri listele")
+    rollback_parser = subparsers.add_parser('rollback', help="Önceki (veya verilen) sürüme dön")
+    rollback_parser.add_argument('version', nargs='?', help="Geçilecek sürüm")
+    args = parser.parse_args(argv)
+    
+    if args.command == 'list':
+        current = current_version(MODELS_DIR)
+        for version in list_versions(MODELS_DIR):
+            manifest = read_manifest(MODELS_DIR, version)
+            marker = '*' if version == current else ' '
+            markets = ', '.join(f"{market}: {len(names)}" for market, names in manifest['markets'].items())
+            print(f"{marker} {version}  sklearn {manifest['sklearn_version']}  {markets}")
+        return 0
+    
+    try:
+        version = rollback(MODELS_DIR, args.version)
+    except ValueError as e:
+        print(f"HATA: {str(e)}")
+        return 1
+    print(f"Geçerli model sürümü: {version}")
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,163 @@
+import argparse
+import os
+import threading
+import time
+import tracemalloc
+import joblib
+from model_store import load_models, current_model_version
+from prediction_functions import MatchPredictor
+
+# Verilirse model dizileri dosyadan eşlenir ve gunicorn ile çatallanan işçiler
+# aynı bellek sayfalarını paylaşır. SVC tahminleri yazılabilir dizi istediği için
+# 'r' yerine yazıldığında kopyalanan 'c' kullanılmalıdır.
+MMAP_MODE = os.environ.get('MODEL_MMAP_MODE') or None
+
+def _resident_memory():
+    """
+    Sürecin fiziksel bellek kullanımını (bayt) döndürür; /proc olmayan sistemlerde None.
+    Ağaç düğümleri C tarafında ayrıldığı için tracemalloc bunları göremez.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+class ModelRegistry:
+    """
+    Modelleri ve scaler'ı süreç başına bir kez yükleyip CLI ve web arayüzüne
+    paylaştıran thread-safe kayıt. Her dosyanın yüklenme süresi ve bellek
+    kullanımı (tracemalloc) raporlanır.
+    """
+    def __init__(self, prefix='', mmap_mode=MMAP_MODE):
+        self.prefix = prefix
+        self.mmap_mode = mmap_mode
+        self.models = None
+        self.scaler = None
+        self.version = None
+        self.artifacts = []
+        self._predictor = None
+        self._lock = threading.Lock()
+    
+    def _load_artifact(self, path, mmap_mode=None):
+        """
+        Tek bir joblib dosyasını yükler ve süresini/bellek kullanımını kaydeder.
+        """
+        python_before = tracemalloc.get_traced_memory()[0]
+        resident_before = _resident_memory()
+        start = time.perf_counter()
+        artifact = joblib.load(path, mmap_mode=mmap_mode)
+        elapsed = time.perf_counter() - start
+        resident_after = _resident_memory()
+        self.artifacts.append({
+            'file': os.path.basename(path),
+            'seconds': elapsed,
+            'python_memory': tracemalloc.get_traced_memory()[0] - python_before,
+            'resident_memory': None if resident_before is None else resident_after - resident_before,
+            'file_size': os.path.getsize(path)
+        })
+        return artifact
+    
+    def load(self, reload=False):
+        """
+        Modelleri ve scaler'ı döndürür; ilk çağrıda (veya reload=True ise) diskten yükler.
+        Yükleme başarısız olursa load_models gibi (None, None) döndürür.
+        """
+        with self._lock:
+            if self.models is not None and not reload:
+                return self.models, self.scaler
+            
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start()
+            self.artifacts = []
+            version = current_model_version(self.prefix)
+            try:
+                models, scaler = load_models(self.prefix, self.mmap_mode, loader=self._load_artifact)
+            finally:
+                if started_tracing:
+                    tracemalloc.stop()
+            if models is None:
+                return None, None
+            
+            self.models, self.scaler, self.version = models, scaler, version
+            self._predictor = None
+            return models, scaler
+    
+    def set(self, models, scaler, version=None):
+        """
+        Yeni eğitilen veya güncellenen modelleri diskten tekrar okumadan kayda yerleştirir.
+        version verilmezse az önce kaydedilen geçerli model sürümü kullanılır.
+        """
+        with self._lock:
+            self.models, self.scaler = models, scaler
+            self.version = version or current_model_version(self.prefix)
+            self.artifacts = []
+            self._predictor = None
+    
+    def predictor(self):
+        """
+        Kayıttaki modellerle çalışan, paylaşılan MatchPredictor'ı döndürür.
+        """
+        models, scaler = self.load()
+        with self._lock:
+            if self._predictor is None:
+                self._predictor = MatchPredictor(models, scaler)
+            return self._predictor
+    
+    def is_loaded(self):
+        return self.models is not None
+    
+    def report(self):
+        """
+        Son yüklemedeki dosya bazlı süre ve bellek bilgilerini döndürür.
+        """
+        with self._lock:
+            return list(self.artifacts)
+    
+    def print_report(self):
+        """
+        Dosya bazlı yükleme raporunu yazdırır.
+        """
+        artifacts = self.report()
+        if not artifacts:
+            return
+        mode = f"mmap_mode={self.mmap_mode}" if self.mmap_mode else "bellek içi"
+        print(f"\nModel yükleme raporu ({mode}):")
+        for artifact in sorted(artifacts, key=lambda item: -item['seconds']):
+            print(f"- {artifact['file']}: {artifact['seconds'] * 1000:.0f} ms, {_format_memory(artifact)}, "
+                  f"dosya {artifact['file_size'] / 2**20:.1f} MB")
+        total = {
+            'python_memory': sum(artifact['python_memory'] for artifact in artifacts),
+            'resident_memory': (None if artifacts[0]['resident_memory'] is None
+                                else sum(artifact['resident_memory'] for artifact in artifacts))
+        }
+        total_seconds = sum(artifact['seconds'] for artifact in artifacts)
+        print(f"Toplam: {total_seconds:.2f} sn, {_format_memory(total)}")
+
+def _format_memory(artifact):
+    python_memory = f"Python yığını {artifact['python_memory'] / 2**20:.1f} MB"
+    if artifact['resident_memory'] is None:
+        return python_memory
+    return f"bellek {artifact['resident_memory'] / 2**20:.1f} MB ({python_memory})"
+
+# Tüm modüllerin paylaştığı model kaydı
+model_registry = ModelRegistry()
+
+def main(argv=None):
+    """
+    Modelleri yükleyip dosya bazlı yükleme raporunu yazdırır.
+    """
+    parser = argparse.ArgumentParser(description="Model yükleme süresi ve bellek raporu")
+    parser.add_argument('--mmap', action='store_true', help="Model dizilerini dosyadan eşle (mmap_mode='c')")
+    args = parser.parse_args(argv)
+    
+    registry = ModelRegistry(mmap_mode='c' if args.mmap else MMAP_MODE)
+    models, _ = registry.load()
+    if models is None:
+        return 1
+    registry.print_report()
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,126 @@
+import json
+import os
+import joblib
+from latency_metrics import timed_stage
+from model_bundle import (
+    save_bundle, read_manifest, bundle_artifact_paths, check_manifest, current_version,
+    load_training_state as load_bundle_training_state
+)
+
+# Models klasörü yolu
+MODELS_DIR = 'models'
+
+# Paket öncesi sürümlerde models klasörüne yazılan eğitim durumu dosyası
+TRAINING_STATE_FILE = 'training_state.json'
+
+def load_training_state(prefix=''):
+    """
+    Geçerli model paketinin eğitim durumunu yükler; yoksa None döndürür.
+    """
+    state = load_bundle_training_state(MODELS_DIR, prefix=prefix)
+    if state is not None:
+        return state
+    
+    # Paket öncesi kayıtlar
+    state_path = os.path.join(MODELS_DIR, f'{prefix}{TRAINING_STATE_FILE}')
+    if not os.path.exists(state_path):
+        return None
+    with open(state_path, encoding='utf-8') as f:
+        return json.load(f)
+
+def save_models(models, scaler, prefix='', training_state=None):
+    """
+    Eğitilmiş modelleri ve scaler'ı models klasörüne yeni bir sürümlü paket olarak kaydeder.
+    Paket; tahmin türlerini, modelleri, özellik sırasını, eğitim verisi özetini ve
+    scikit-learn sürümünü içeren bir manifest ile birlikte atomik olarak yazılır.
+    training_state verilirse artımlı güncelleme için eğitim durumu da pakete eklenir.
+    """
+    os.makedirs(MODELS_DIR, exist_ok=True)
+    version = save_bundle(models, scaler, MODELS_DIR, training_state, prefix)
+    print(f"\nModeller {MODELS_DIR} klasörüne kaydedildi (sürüm {version}).")
+
+def _legacy_artifact_paths(prefix=''):
+    """
+    Paket öncesi sürümlerin models klasörüne tek tek yazdığı dosyaları bulur.
+    """
+    artifacts = []
+    model_types = ['match_result', 'score', 'htft', 'btts']
+    model_names = ['RandomForest', 'GradientBoosting', 'SVC', 'SVR']
+    
+    for model_type in model_types:
+        for name in model_names:
+            model_path = os.path.join(MODELS_DIR, f'{prefix}{model_type}_{name}_model.joblib')
+            if os.path.exists(model_path):
+                artifacts.append((model_type, name, model_path))
+    
+    selector_path = os.path.join(MODELS_DIR, f'{prefix}btts_selector.joblib')
+    if os.path.exists(selector_path):
+        artifacts.append(('btts_selector', None, selector_path))
+    artifacts.append(('scaler', None, os.path.join(MODELS_DIR, f'{prefix}scaler.joblib')))
+    return artifacts
+
+def model_artifact_paths(prefix=''):
+    """
+    Yüklenecek model dosyalarını (tahmin türü, model adı, yol) olarak ve geçerli paketin
+    manifest'ini döndürür. Paket yoksa eski tek tek kaydedilmiş dosyalar kullanılır ve
+    manifest None olur. Selector ve scaler için model adı None'dır.
+    """
+    manifest = read_manifest(MODELS_DIR, prefix=prefix)
+    if manifest is None:
+        return _legacy_artifact_paths(prefix), None
+    return bundle_artifact_paths(MODELS_DIR, manifest, prefix), manifest
+
+def models_exist(prefix=''):
+    """
+    Yüklenebilecek kayıtlı modeller (paket veya eski dosyalar) olup olmadığını döndürür.
+    """
+    return (current_version(MODELS_DIR, prefix) is not None
+            or os.path.exists(os.path.join(MODELS_DIR, f'{prefix}scaler.joblib')))
+
+def current_model_version(prefix=''):
+    """
+    Kayıtlı modellerin sürümünü döndürür: geçerli paket sürümü veya eski dosyalar için
+    scaler dosyasının değişiklik zamanı. Kayıtlı model yoksa None.
+    """
+    version = current_version(MODELS_DIR, prefix)
+    if version is not None:
+        return version
+    scaler_path = os.path.join(MODELS_DIR, f'{prefix}scaler.joblib')
+    if os.path.exists(scaler_path):
+        return f'legacy-{os.stat(scaler_path).st_mtime_ns}'
+    return None
+
+@timed_stage('load_models')
+def load_models(prefix='', mmap_mode=None, loader=joblib.load):
+    """
+    Kaydedilmiş modelleri ve scaler'ı models klasöründen tek geçişte yükler.
+    mmap_mode verilirse büyük diziler belleğe kopyalanmak yerine dosyadan eşlenir.
+    loader, her dosyayı (yol, mmap_mode) ile yükleyen fonksiyondur.
+    """
+    try:
+        models = {
+            'match_result': {},
+            'score': {},
+            'htft': {},
+            'btts': {}
+        }
+        scaler = None
+        
+        artifacts, manifest = model_artifact_paths(prefix)
+        for model_type, name, model_path in artifacts:
+            artifact = loader(model_path, mmap_mode=mmap_mode)
+            if model_type == 'scaler':
+                scaler = artifact
+            elif name is None:
+                models[model_type] = artifact
+            else:
+                models[model_type][name] = artifact
+        
+        if manifest is not None:
+            check_manifest(manifest, scaler)
+        
+        return models, scaler
+    except Exception as e:
+        print(f"Modeller yüklenirken hata oluştu: {str(e)}")
+        print("Modeller yeniden eğitilecek.")
+        return None, None
@@ -0,0 +1,100 @@
+import argparse
+import hashlib
+import os
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+# LazyPredict sonuçlarının saklandığı klasör
+SURVEY_DIR = os.path.join('models', 'survey')
+
+def training_data_hash(*arrays):
+    """
+    Eğitim verisinin (özellikler ve hedefler) içerik özetini döndürür.
+    """
+    digest = hashlib.sha256()
+    for array in arrays:
+        if array is None:
+            digest.update(b'none')
+            continue
+        values = np.ascontiguousarray(np.asarray(array))
+        if values.dtype == object:
+            values = values.astype(str)
+        digest.update(str(values.shape).encode())
+        digest.update(values.dtype.str.encode())
+        digest.update(values.tobytes())
+    return digest.hexdigest()[:16]
+
+def _survey_paths(data_hash, survey_dir):
+    return {
+        'classifier': os.path.join(survey_dir, f'{data_hash}_classifier.csv'),
+        'regressor': os.path.join(survey_dir, f'{data_hash}_regressor.csv')
+    }
+
+def run_model_survey(X_train, X_test, y_train, y_test, y_score_train=None, y_score_test=None,
+                     force=False, survey_dir=SURVEY_DIR):
+    """
+    LazyPredict ile maç sonucu (sınıflandırma) ve gol sayısı (regresyon) için
+    model karşılaştırması yapar. Sonuçlar eğitim verisinin özetiyle saklanır;
+    aynı veri için tekrar çağrıldığında force=True verilmedikçe kayıttan okunur.
+    """
+    data_hash = training_data_hash(X_train, X_test, y_train, y_test, y_score_train, y_score_test)
+    paths = _survey_paths(data_hash, survey_dir)
+    results = {}
+    
+    if not force and os.path.exists(paths['classifier']):
+        print(f"\nKaydedilmiş model karşılaştırması kullanılıyor ({data_hash}).")
+        results['classifier'] = pd.read_csv(paths['classifier'], index_col=0, encoding='utf-8')
+        if os.path.exists(paths['regressor']):
+            results['regressor'] = pd.read_csv(paths['regressor'], index_col=0, encoding='utf-8')
+    else:
+        # LazyPredict onlarca modeli içe aktardığı için yalnızca burada yüklenir
+        from lazypredict.Supervised import LazyClassifier, LazyRegressor
+        
+        print("\nLazyPredict ile model karşılaştırması yapılıyor...")
+        clf = LazyClassifier(verbose=0, ignore_warnings=True, custom_metric=None)
+        results['classifier'], _ = clf.fit(X_train, X_test, y_train, y_test)
+        
+        if y_score_train is not None:
+            # Regresyon karşılaştırması gol sayıları üzerinde yapılır
+            reg = LazyRegressor(verbose=0, ignore_warnings=True, custom_metric=None)
+            results['regressor'], _ = reg.fit(X_train, X_test, y_score_train, y_score_test)
+        
+        os.makedirs(survey_dir, exist_ok=True)
+        for kind, table in results.items():
+            table.to_csv(paths[kind], encoding='utf-8')
+        print(f"Model karşılaştırması {survey_dir} klasörüne kaydedildi ({data_hash}).")
+    
+    print("\nTüm modellerin performans karşılaştırması:")
+    print(results['classifier'])
+    if 'regressor' in results:
+        print("\nRegresyon modellerinin performans karşılaştırması:")
+        print(results['regressor'])
+    return results
+
+def main(argv=None):
+    """
+    Üretim modellerini yeniden eğitmeden model karşılaştırmasını çalıştırır.
+    """
+    parser = argparse.ArgumentParser(description="LazyPredict model karşılaştırması")
+    parser.add_argument('--force', action='store_true', help="Kayıtlı sonuç olsa bile yeniden çalıştır")
+    args = parser.parse_args(argv)
+    
+    from training_data import load_training_data
+    from time_splits import load_splits
+    
+    features, y_match, y_score, _, _ = load_training_data()
+    X_scaled = StandardScaler().fit_transform(features)
+    
+    # train_models ile aynı ayrım: tarih sınırından en yeni ~%20 test seti
+    test_start, _ = load_splits(features.index)
+    run_model_survey(
+        X_scaled[:test_start], X_scaled[test_start:],
+        y_match[:test_start], y_match[test_start:],
+        y_score[:test_start], y_score[test_start:],
+        force=args.force
+    )
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,43 +1,158 @@
-from lazypredict.Supervised import LazyClassifier, LazyRegressor
-from sklearn.model_selection import train_test_split, cross_val_score, TimeSeriesSplit
 from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier, RandomForestRegressor, GradientBoostingRegressor
-from sklearn.svm import SVC, SVR
-from sklearn.metrics import make_scorer, mean_squared_error, accuracy_score
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.svm import SVR
+from sklearn.metrics import mean_squared_error, accuracy_score
 from sklearn.feature_selection import SelectFromModel
+from sklearn.base import clone
+from joblib import Parallel, delayed
+from data_preprocessing import load_team_frame
+from feature_store import STATS_DIR, file_checksum
+from gb_backends import GB_BACKEND, gradient_boosting
+from svc_calibration import SVC_CALIBRATION, svc_classifier
+from time_splits import date_split_index, load_splits, fold_indices, time_series_folds
+from training_data import load_training_data
+# Kayıt/yükleme fonksiyonları model_store'dadır; eski içe aktarmalar için buradan da sunulur
+from model_store import (
+    MODELS_DIR, TRAINING_STATE_FILE, load_training_state, save_models, model_artifact_paths,
+    models_exist, current_model_version, load_models
+)
 import numpy as np
 import pandas as pd
-import joblib
+import copy
 import os
+import time
 
-# Models klasörü yolu
-MODELS_DIR = 'models'
+# Eğitimde kullanılacak paralel işçi sayısı (-1: tüm çekirdekler, 1: sıralı);
+# TRAINING_JOBS ortam değişkeniyle veya main.py --jobs ile değiştirilebilir
+try:
+    N_JOBS = int(os.environ.get('TRAINING_JOBS') or -1)
+except ValueError:
+    print(f"Uyarı: Geçersiz TRAINING_JOBS değeri ({os.environ['TRAINING_JOBS']}), tüm çekirdekler kullanılacak.")
+    N_JOBS = -1
 
-def evaluate_model(model, X, y, model_type, name, cv=5):
+# Artımlı güncellemede her ağaç topluluğuna eklenecek ağaç sayısı
+WARM_START_ESTIMATORS = 50
+
+# Tahmin türü başına gradient boosting parametreleri (sklearn adlarıyla; diğer
+# kütüphanelere gb_backends.gradient_boosting içinde çevrilir)
+GB_PARAMS = {
+    'match_result': {'n_estimators': 500, 'learning_rate': 0.01, 'max_depth': 4,
+                     'min_samples_split': 10, 'min_samples_leaf': 4, 'random_state': 42},
+    'score': {'n_estimators': 500, 'learning_rate': 0.01, 'max_depth': 4,
+              'min_samples_split': 10, 'min_samples_leaf': 4, 'random_state': 42},
+    'htft': {'n_estimators': 500, 'learning_rate': 0.01, 'max_depth': 4,
+             'min_samples_split': 10, 'min_samples_leaf': 4, 'random_state': 42},
+    # KG modelleri daha sıkı regularizasyonla eğitilir
+    'btts': {'n_estimators': 2000, 'learning_rate': 0.001, 'max_depth': 2, 'min_samples_split': 30,
+             'min_samples_leaf': 10, 'subsample': 0.8, 'max_features': 'sqrt', 'random_state': 42}
+}
+
+def _row_dates(X):
     """
-    Model performansını time series cross validation ile değerlendirir.
+    Satırların maç tarihlerini döndürür. load_training_data çıktısında indeks tarihlerdir;
+    diğer veride satırlar zaten zaman sırasında kabul edilir ve sıra numarası kullanılır.
     """
-    # TimeSeriesSplit kullanarak zaman bazlı cross-validation
-    tscv = TimeSeriesSplit(n_splits=5, test_size=int(len(X) * 0.2))
-    
-    if model_type == 'regression':
-        # Regresyon modelleri için RMSE kullan
-        scorer = make_scorer(lambda y_true, y_pred: -np.sqrt(mean_squared_error(y_true, y_pred)))
-        scores = cross_val_score(model, X, y, cv=tscv, scoring=scorer)
-        print(f"\n{name} Cross-Validation RMSE Skorları:")
-        print(f"Ortalama: {-scores.mean():.4f} (+/- {scores.std() * 2:.4f})")
+    if isinstance(X, pd.DataFrame) and isinstance(X.index, pd.DatetimeIndex):
+        return X.index.to_numpy(dtype='datetime64[ns]')
+    return np.arange(len(X)).astype('datetime64[ns]')
+
+def _cv_splits(X, n_splits=5):
+    """
+    Tarih sınırlarına oturtulmuş zaman bazlı cross-validation katlarını (eğitim, test
+    indeksleri) döndürür; katlar _run_training_job işlerinde puanlanır.
+    """
+    return fold_indices(time_series_folds(_row_dates(X), n_splits))
+
+def _run_training_job(kind, market, name, fold, model, X, y, train_idx, test_idx, model_type):
+    """
+    Tek bir eğitim işini çalıştırır: bir CV katı ('cv'), son eğitim ('fit')
+    veya KG özellik seçici eğitimi ('selector'). Süresiyle birlikte sonucu döndürür.
+    """
+    start = time.perf_counter()
+    if kind == 'cv':
+        try:
+            estimator = clone(model).fit(X[train_idx], y[train_idx])
+            y_pred = estimator.predict(X[test_idx])
+            if model_type == 'regression':
+                result = -np.sqrt(mean_squared_error(y[test_idx], y_pred))
+            else:
+                result = accuracy_score(y[test_idx], y_pred)
+        except Exception:
+            # cross_val_score'daki error_score=np.nan davranışı
+            result = np.nan
     else:
-        # Sınıflandırma modelleri için accuracy kullan
-        scores = cross_val_score(model, X, y, cv=tscv, scoring=make_scorer(accuracy_score))
-        print(f"\n{name} Cross-Validation Accuracy Skorları:")
-        print(f"Ortalama: {scores.mean():.4f} (+/- {scores.std() * 2:.4f})")
-    return scores.mean()
+        result = model.fit(X, y)
+    return kind, market, name, fold, result, time.perf_counter() - start
+
+def _model_jobs(market, estimators, X, y, model_type, splits=None):
+    """
+    Bir tahmin türünün her modeli için CV katı ve son eğitim işlerini oluşturur.
+    splits verilmezse satırlar zaman sırasında kabul edilip katlar hesaplanır.
+    """
+    jobs = []
+    splits = _cv_splits(X) if splits is None else splits
+    for name, model in estimators.items():
+        # Uzun süren son eğitimler önce kuyruğa girsin
+        jobs.append(('fit', market, name, None, model, X, y, None, None, model_type))
+        for fold, (train_idx, test_idx) in enumerate(splits):
+            jobs.append(('cv', market, name, fold, model, X, y, train_idx, test_idx, model_type))
+    return jobs
+
+def _collect_job_results(results, models, model_types, timings):
+    """
+    Paralel işlerin sonuçlarını modellere ekler ve CV skorlarını yazdırır.
+    """
+    scores = {}
+    for kind, market, name, fold, result, elapsed in results:
+        timings.append((market, name, kind, fold, elapsed))
+        if kind == 'cv':
+            scores.setdefault((market, name), []).append(result)
+        elif kind == 'fit':
+            models[market][name] = result
+    
+    for market, name in scores:
+        fold_scores = np.array(scores[(market, name)])
+        if model_types[market] == 'regression':
+            print(f"\n{market} / {name} Cross-Validation RMSE Skorları:")
+            print(f"Ortalama: {-fold_scores.mean():.4f} (+/- {fold_scores.std() * 2:.4f})")
+        else:
+            print(f"\n{market} / {name} Cross-Validation Accuracy Skorları:")
+            print(f"Ortalama: {fold_scores.mean():.4f} (+/- {fold_scores.std() * 2:.4f})")
 
-def train_models(X, y, y_score=None, y_htft=None, y_btts=None):
+def print_training_timings(timings, wall_time):
+    """
+    Her (tahmin türü, model) işinin süresini ve toplam duvar saati süresini yazdırır.
+    """
+    print("\nEğitim süreleri:")
+    summary = {}
+    for market, name, kind, fold, elapsed in timings:
+        entry = summary.setdefault((market, name), {'cv': [], 'fit': 0.0})
+        if kind == 'cv':
+            entry['cv'].append(elapsed)
+        else:
+            entry['fit'] += elapsed
+    for (market, name), entry in sorted(summary.items(), key=lambda item: -(item[1]['fit'] + sum(item[1]['cv']))):
+        cv_info = (f", CV {len(entry['cv'])} kat: toplam {sum(entry['cv']):.1f} sn (en uzun {max(entry['cv']):.1f} sn)"
+                   if entry['cv'] else "")
+        print(f"- {market} / {name}: eğitim {entry['fit']:.1f} sn{cv_info}")
+    total = sum(elapsed for *_, elapsed in timings)
+    print(f"Toplam iş süresi: {total:.1f} sn, duvar saati: {wall_time:.1f} sn")
+
+def train_models(X, y, y_score=None, y_htft=None, y_btts=None, n_jobs=N_JOBS, run_survey=False,
+                 gb_backend=GB_BACKEND, svc_calibration=SVC_CALIBRATION):
     """
     Birden fazla model eğitir ve en iyi modelleri seçer.
     Regularizasyon ve zaman bazlı cross-validation kullanır.
+    Bağımsız (tahmin türü, model) eğitimleri ve CV katları n_jobs işçili bir
+    süreç havuzunda paralel çalıştırılır (-1: tüm çekirdekler, 1: sıralı).
+    run_survey=True ise LazyPredict model karşılaştırması da yapılır
+    (bkz. model_survey.py). gb_backend gradient boosting modellerinin kütüphanesini
+    seçer: 'sklearn', 'hist', 'lightgbm' veya 'xgboost' (bkz. gb_backends.py).
+    svc_calibration SVC olasılıklarının kalibrasyonunu seçer: 'platt' (libsvm iç CV)
+    veya 'holdout' (en yeni maçlarla tek kalibrasyon; bkz. svc_calibration.py).
     """
+    wall_start = time.perf_counter()
+    
     # Eksik değerleri kontrol et
     if X.isnull().any().any():
         print("Uyarı: Veride eksik değerler var. Sıfır ile doldurulacak.")
@@ -47,25 +162,30 @@ def train_models(X, y, y_score=None, y_htft=None, y_btts=None):
     scaler = StandardScaler()
     X_scaled = scaler.fit_transform(X)
     
-    # Son 2 sezonu test seti olarak ayır (yaklaşık %20)
-    test_size = int(len(X) * 0.2)
-    X_train = X_scaled[:-test_size]
-    X_test = X_scaled[-test_size:]
-    y_train = y[:-test_size]
-    y_test = y[-test_size:]
+    # En yeni maçların yaklaşık %20'sini tarih sınırından test seti olarak ayır;
+    # ayrım ve eğitim kısmının CV katları veri özetiyle diskte saklanır
+    test_start, splits = load_splits(_row_dates(X))
+    X_train = X_scaled[:test_start]
+    X_test = X_scaled[test_start:]
+    y_train = y[:test_start]
+    y_test = y[test_start:]
     
     models = {}
+    model_types = {}
+    jobs = []
     
-    # LazyPredict ile model karşılaştırması
-    print("\nLazyPredict ile model karşılaştırması yapılıyor...")
-    clf = LazyClassifier(verbose=0, ignore_warnings=True, custom_metric=None)
-    lazy_pred = clf.fit(X_train, X_test, y_train, y_test)
-    print("\nTüm modellerin performans karşılaştırması:")
-    print(lazy_pred)
+    # LazyPredict ile model karşılaştırması (isteğe bağlı, sonuçlar veri özetiyle saklanır)
+    if run_survey:
+        from model_survey import run_model_survey
+        run_model_survey(
+            X_train, X_test, y_train, y_test,
+            y_score[:test_start] if y_score is not None else None,
+            y_score[test_start:] if y_score is not None else None
+        )
     
     # Maç sonucu modelleri (regularizasyon eklenmiş)
     print("\nMaç sonucu modelleri eğitiliyor...")
-    models['match_result'] = {
+    match_estimators = {
         'RandomForest': RandomForestClassifier(
             n_estimators=500,
             max_depth=8,
@@ -73,38 +193,23 @@ def train_models(X, y, y_score=None, y_htft=None, y_btts=None):
             min_samples_leaf=4,
             random_state=42
         ),
-        'GradientBoosting': GradientBoostingClassifier(
-            n_estimators=500,
-            learning_rate=0.01,
-            max_depth=4,
-            min_samples_split=10,
-            min_samples_leaf=4,
-            random_state=42
-        ),
-        'SVC': SVC(
-            probability=True,
+        'GradientBoosting': gradient_boosting('classification', gb_backend, X_train.shape[1], **GB_PARAMS['match_result']),
+        'SVC': svc_classifier(
+            svc_calibration,
             C=0.8,
             kernel='rbf',
             random_state=42
         )
     }
-    
-    for name, model in models['match_result'].items():
-        print(f"\n{name} için cross validation yapılıyor...")
-        evaluate_model(model, X_train, y_train, 'classification', name)
-        model.fit(X_train, y_train)
+    models['match_result'] = {}
+    model_types['match_result'] = 'classification'
+    jobs += _model_jobs('match_result', match_estimators, X_train, np.asarray(y_train), 'classification', splits)
     
     # Skor tahmin modelleri
     if y_score is not None:
         print("\nSkor tahmin modelleri eğitiliyor...")
         
-        # LazyRegressor ile model karşılaştırması
-        reg = LazyRegressor(verbose=0, ignore_warnings=True, custom_metric=None)
-        lazy_reg_pred = reg.fit(X_train, X_test, y_train, y_test)
-        print("\nRegresyon modellerinin performans karşılaştırması:")
-        print(lazy_reg_pred)
-        
-        models['score'] = {
+        score_estimators = {
             'RandomForest': RandomForestRegressor(
                 n_estimators=500,
                 max_depth=8,
@@ -112,29 +217,21 @@ def train_models(X, y, y_score=None, y_htft=None, y_btts=None):
                 min_samples_leaf=4,
                 random_state=42
             ),
-            'GradientBoosting': GradientBoostingRegressor(
-                n_estimators=500,
-                learning_rate=0.01,
-                max_depth=4,
-                min_samples_split=10,
-                min_samples_leaf=4,
-                random_state=42
-            ),
+            'GradientBoosting': gradient_boosting('regression', gb_backend, X_train.shape[1], **GB_PARAMS['score']),
             'SVR': SVR(
                 C=0.8,
                 kernel='rbf',
                 epsilon=0.2
             )
         }
-        for name, model in models['score'].items():
-            print(f"\n{name} için cross validation yapılıyor...")
-            evaluate_model(model, X_train, y_score[:-test_size], 'regression', name)
-            model.fit(X_train, y_score[:-test_size])
+        models['score'] = {}
+        model_types['score'] = 'regression'
+        jobs += _model_jobs('score', score_estimators, X_train, np.asarray(y_score[:test_start]), 'regression', splits)
     
     # İY/MS tahmin modelleri
     if y_htft is not None:
         print("\nİY/MS tahmin modelleri eğitiliyor...")
-        models['htft'] = {
+        htft_estimators = {
             'RandomForest': RandomForestClassifier(
                 n_estimators=500,
                 max_depth=8,
@@ -142,57 +239,21 @@ def train_models(X, y, y_score=None, y_htft=None, y_btts=None):
                 min_samples_leaf=4,
                 random_state=42
             ),
-            'GradientBoosting': GradientBoostingClassifier(
-                n_estimators=500,
-                learning_rate=0.01,
-                max_depth=4,
-                min_samples_split=10,
-                min_samples_leaf=4,
-                random_state=42
-            ),
-            'SVC': SVC(
-                probability=True,
+            'GradientBoosting': gradient_boosting('classification', gb_backend, X_train.shape[1], **GB_PARAMS['htft']),
+            'SVC': svc_classifier(
+                svc_calibration,
                 C=0.8,
                 kernel='rbf',
                 random_state=42
             )
         }
-        for name, model in models['htft'].items():
-            print(f"\n{name} için cross validation yapılıyor...")
-            evaluate_model(model, X_train, y_htft[:-test_size], 'classification', name)
-            model.fit(X_train, y_htft[:-test_size])
+        models['htft'] = {}
+        model_types['htft'] = 'classification'
+        jobs += _model_jobs('htft', htft_estimators, X_train, np.asarray(y_htft[:test_start]), 'classification', splits)
     
-    # KG tahmin modelleri (daha sıkı regularizasyon)
+    # KG özellik seçicisi diğer işlerle birlikte ilk aşamada eğitilir
     if y_btts is not None:
-        print("\nKG tahmin modelleri eğitiliyor...")
-        models['btts'] = {
-            'RandomForest': RandomForestClassifier(
-                n_estimators=2000,
-                max_depth=3,
-                min_samples_split=30,
-                min_samples_leaf=10,
-                max_features='sqrt',
-                class_weight='balanced',
-                random_state=42
-            ),
-            'GradientBoosting': GradientBoostingClassifier(
-                n_estimators=2000,
-                learning_rate=0.001,
-                max_depth=2,
-                min_samples_split=30,
-                min_samples_leaf=10,
-                subsample=0.8,
-                max_features='sqrt',
-                random_state=42
-            ),
-            'SVC': SVC(
-                probability=True,
-                C=0.3,
-                kernel='rbf',
-                class_weight='balanced',
-                random_state=42
-            )
-        }
+        y_btts_train = np.asarray(y_btts[:test_start])
         
         # Feature selection için SelectFromModel kullan
         selector = SelectFromModel(
@@ -207,82 +268,249 @@ def train_models(X, y, y_score=None, y_htft=None, y_btts=None):
             max_features=8,  # En önemli 8 özelliği seç
             threshold='median'
         )
-        X_selected = selector.fit_transform(X_train, y_btts[:-test_size])
-        X_test_selected = selector.transform(X_test)
+        jobs.insert(0, ('selector', 'btts_selector', 'SelectFromModel', None, selector,
+                        X_train, y_btts_train, None, None, 'classification'))
+    
+    timings = []
+    print(f"\n{len(jobs)} eğitim işi paralel çalıştırılıyor...")
+    with Parallel(n_jobs=n_jobs) as parallel:
+        results = parallel(delayed(_run_training_job)(*job) for job in jobs)
         
-        # Selector'ı modeller sözlüğüne ekle
-        models['btts_selector'] = selector
+        _collect_job_results(results, models, model_types, timings)
         
-        # Seçilen özellikleri kullanarak modelleri eğit
-        for name, model in models['btts'].items():
-            print(f"\n{name} için cross validation yapılıyor...")
-            evaluate_model(model, X_selected, y_btts[:-test_size], 'classification', name)
-            model.fit(X_selected, y_btts[:-test_size])
+        # KG tahmin modelleri (daha sıkı regularizasyon)
+        if y_btts is not None:
+            print("\nKG tahmin modelleri eğitiliyor...")
+            
+            # Selector'ı modeller sözlüğüne ekle
+            selector = next(result for kind, _, _, _, result, _ in results if kind == 'selector')
+            models['btts'] = {}
+            models['btts_selector'] = selector
+            X_selected = selector.transform(X_train)
+            
+            btts_estimators = {
+                'RandomForest': RandomForestClassifier(
+                    n_estimators=2000,
+                    max_depth=3,
+                    min_samples_split=30,
+                    min_samples_leaf=10,
+                    max_features='sqrt',
+                    class_weight='balanced',
+                    random_state=42
+                ),
+                'GradientBoosting': gradient_boosting('classification', gb_backend, X_selected.shape[1],
+                                                      **GB_PARAMS['btts']),
+                'SVC': svc_classifier(
+                    svc_calibration,
+                    C=0.3,
+                    kernel='rbf',
+                    class_weight='balanced',
+                    random_state=42
+                )
+            }
             
-        # Feature importance bilgisini kaydet ve göster
-        feature_importance = pd.DataFrame({
-            'feature': X.columns[selector.get_support()],
-            'importance': selector.estimator_.feature_importances_[selector.get_support()]
-        })
-        feature_importance = feature_importance.sort_values('importance', ascending=False)
-        print("\nSeçilen 15 Önemli Özellik:")
-        print(feature_importance)
+            # Seçilen özellikleri kullanarak modelleri eğit
+            model_types['btts'] = 'classification'
+            btts_jobs = _model_jobs('btts', btts_estimators, X_selected, y_btts_train, 'classification', splits)
+            results = parallel(delayed(_run_training_job)(*job) for job in btts_jobs)
+            _collect_job_results(results, models, model_types, timings)
+            
+            # Feature importance bilgisini kaydet ve göster
+            feature_importance = pd.DataFrame({
+                'feature': X.columns[selector.get_support()],
+                'importance': selector.estimator_.feature_importances_[selector.get_support()]
+            })
+            feature_importance = feature_importance.sort_values('importance', ascending=False)
+            print("\nSeçilen 15 Önemli Özellik:")
+            print(feature_importance)
     
+    print_training_timings(timings, time.perf_counter() - wall_start)
     return models, scaler
 
-def save_models(models, scaler, prefix=''):
+def _team_state(dates, file_path):
     """
-    Eğitilmiş modelleri ve scaler'ı models klasörüne kaydeder.
+    Bir takımın eğitime giren son maç tarihini, satır sayısını ve dosya özetini döndürür.
     """
-    os.makedirs(MODELS_DIR, exist_ok=True)
-    
-    for model_type, model_dict in models.items():
-        if model_type == 'btts_selector':
-            # Selector'ı ayrı kaydet
-            model_path = os.path.join(MODELS_DIR, f'{prefix}{model_type}.joblib')
-            joblib.dump(model_dict, model_path)
+    last_date = pd.Series(dates).max()
+    return {
+        'last_date': None if pd.isna(last_date) else last_date.isoformat(),
+        'rows': int(len(dates)),
+        'checksum': file_checksum(file_path)
+    }
+
+def build_training_state(stats_dir=STATS_DIR):
+    """
+    stats klasöründeki tüm takımların eğitim durumunu döndürür.
+    Tam eğitimden sonra modellerle birlikte kaydedilir.
+    """
+    teams = {}
+    for file in sorted(os.listdir(stats_dir)):
+        if file.endswith('.csv'):
+            file_path = os.path.join(stats_dir, file)
+            teams[file[:-4]] = _team_state(load_team_frame(file_path)['Tarih'], file_path)
+    return {'stats_dir': stats_dir, 'teams': teams}
+
+def find_new_rows(state, stats_dir=STATS_DIR):
+    """
+    Eğitim durumundaki son tarihten sonra eklenen maçları takım bazında bulur.
+    Tüm eğitim verisini (tam eğitimle aynı load_training_data çıktısı; float32,
+    eskiden yeniye sıralı), yeni satır maskesini ve güncel eğitim durumunu döndürür.
+    """
+    *data, row_teams = load_training_data(stats_dir, return_teams=True)
+    dates = data[0].index.to_numpy(dtype='datetime64[ns]')
+    codes = row_teams.cat.codes.to_numpy()
+    new_mask = np.zeros(len(dates), dtype=bool)
+    teams = {}
+    for code, team in enumerate(row_teams.cat.categories):
+        rows = np.flatnonzero(codes == code)
+        team_dates = dates[rows]
+        team_state = state['teams'].get(team)
+        
+        if team_state is None or team_state['last_date'] is None:
+            # Yeni eklenen takımın tüm maçları yenidir
+            new_mask[rows] = True
         else:
-            # Normal modelleri kaydet
-            for name, model in model_dict.items():
-                model_path = os.path.join(MODELS_DIR, f'{prefix}{model_type}_{name}_model.joblib')
-                joblib.dump(model, model_path)
+            mask = team_dates > pd.Timestamp(team_state['last_date']).to_datetime64()
+            if len(rows) - team_state['rows'] > mask.sum():
+                print(f"Uyarı: {team} için son eğitim tarihinden önceki maçlar eklenmiş. "
+                      "Bu maçlar için tam eğitim önerilir.")
+            new_mask[rows] = mask
+        
+        teams[team] = _team_state(team_dates, os.path.join(stats_dir, f'{team}.csv'))
+    
+    return tuple(data), new_mask, {'stats_dir': stats_dir, 'teams': teams}
+
+def _scaled_feature_values(X, scaler):
+    """
+    Her özelliğin veride görülen farklı değerlerini scaler.transform ile ölçekleyip
+    küçükten büyüğe döndürür. Değerler ağaçlara verilen ölçeklenmiş girdilerle bit
+    düzeyinde aynıdır; bu yüzden eşik taşıma hiçbir veri değerinin kararını değiştirmez.
+    """
+    uniques = [np.unique(column) for column in np.asarray(X).T]
+    length = max(len(unique) for unique in uniques)
     
-    scaler_path = os.path.join(MODELS_DIR, f'{prefix}scaler.joblib')
-    joblib.dump(scaler, scaler_path)
+    # Tüm özellikler tek transform çağrısında ölçeklenir; kısa sütunlar son değerle doldurulur
+    table = np.column_stack([np.pad(unique, (0, length - len(unique)), mode='edge') for unique in uniques])
+    if hasattr(scaler, 'feature_names_in_'):
+        table = pd.DataFrame(table, columns=scaler.feature_names_in_)
+    scaled = np.asarray(scaler.transform(table), dtype=np.float32)
+    return [scaled[:len(unique), i] for i, unique in enumerate(uniques)]
+
+def _rescale_tree_thresholds(model, old_values, new_values):
+    """
+    Ağaç topluluğundaki bölme eşiklerini eski scaler ölçeğinden yenisine taşır.
+    Her eşik, eski ölçekte iki yanında kalan veri değerlerinin yeni ölçekteki
+    orta noktasına konur; böylece mevcut ağaçlar verideki her değer için aynı
+    kararı vermeye devam eder.
+    """
+    trees = [estimator.tree_ for estimator in np.ravel(model.estimators_)]
+    features = np.concatenate([tree.feature for tree in trees])
+    thresholds = np.concatenate([tree.threshold for tree in trees])
+    
+    # Tüm ağaçların düğümleri özellik bazında tek seferde taşınır
+    for i in np.unique(features[features >= 0]):
+        nodes = np.flatnonzero(features == i)
+        old, new = old_values[i], new_values[i].astype(np.float64)
+        right = np.searchsorted(old, thresholds[nodes], side='right')
+        inner = new[np.clip(right - 1, 0, len(new) - 1)] / 2.0 + new[np.clip(right, 0, len(new) - 1)] / 2.0
+        thresholds[nodes] = np.where(right == 0, new[0] - 1.0,
+                                     np.where(right == len(new), new[-1] + 1.0, inner))
     
-    print(f"\nModeller {MODELS_DIR} klasörüne kaydedildi.")
+    start = 0
+    for tree in trees:
+        tree.threshold[:] = thresholds[start:start + tree.node_count]
+        start += tree.node_count
 
-def load_models(prefix=''):
+def _update_model_job(market, name, model, X, y, old_values, new_values, added_estimators):
     """
-    Kaydedilmiş modelleri ve scaler'ı models klasöründen yükler.
+    Tek bir modeli yeni ölçeklenmiş veriyle günceller. Ağaç toplulukları warm_start
+    ile added_estimators kadar yeni ağaç ekler; SVM modelleri yeniden eğitilir.
+    """
+    start = time.perf_counter()
+    if hasattr(model, 'estimators_'):
+        model = copy.deepcopy(model)
+        _rescale_tree_thresholds(model, old_values, new_values)
+        model.set_params(warm_start=True, n_estimators=model.n_estimators + added_estimators)
+        model.fit(X, y)
+        model.set_params(warm_start=False)
+    else:
+        model = clone(model).fit(X, y)
+    return market, name, model, time.perf_counter() - start
+
+def update_models(models, scaler, state=None, stats_dir=STATS_DIR,
+                  added_estimators=WARM_START_ESTIMATORS, n_jobs=N_JOBS):
     """
+    Son eğitimden sonra takım CSV'lerine eklenen maçlarla modelleri artımlı günceller.
+    Scaler partial_fit ile yeni maçları öğrenir, ağaç topluluklarının eşikleri yeni
+    ölçeğe taşınıp warm_start ile yeni ağaçlar eklenir, SVM modelleri yeniden eğitilir.
+    Güncellenmiş modeller, scaler ve yeni eğitim durumu döndürülür; yeni maç yoksa,
+    eğitim durumu bilinmiyorsa veya güncelleme başarısız olursa eğitim durumu None
+    olur ve modeller değişmez.
+    """
+    if state is None:
+        state = load_training_state()
+    if state is None:
+        print("Eğitim durumu bulunamadı, artımlı güncelleme yapılamıyor.")
+        return models, scaler, None
+    
     try:
-        models = {
-            'match_result': {},
-            'score': {},
-            'htft': {},
-            'btts': {}
-        }
-        
-        model_types = ['match_result', 'score', 'htft', 'btts']
-        model_names = ['RandomForest', 'GradientBoosting', 'SVC']
-        
-        for model_type in model_types:
-            for name in model_names:
-                model_path = os.path.join(MODELS_DIR, f'{prefix}{model_type}_{name}_model.joblib')
-                if os.path.exists(model_path):
-                    models[model_type][name] = joblib.load(model_path)
-        
-        # Selector'ı yükle
-        selector_path = os.path.join(MODELS_DIR, f'{prefix}btts_selector.joblib')
-        if os.path.exists(selector_path):
-            models['btts_selector'] = joblib.load(selector_path)
+        return _incremental_update(models, scaler, state, stats_dir, added_estimators, n_jobs)
+    except Exception as e:
+        print(f"Modeller güncellenirken hata oluştu: {str(e)}")
+        print("Kaydedilmiş modeller kullanılmaya devam edilecek.")
+        return models, scaler, None
+
+def _incremental_update(models, scaler, state, stats_dir, added_estimators, n_jobs):
+    """
+    update_models'in asıl işi: yeni maçları bulur ve modelleri günceller.
+    """
+    (X, y_match, y_score, y_htft, y_btts), new_mask, new_state = find_new_rows(state, stats_dir)
+    if not new_mask.any():
+        print("Yeni maç bulunamadı, modeller güncel.")
+        return models, scaler, None
+    
+    wall_start = time.perf_counter()
+    print(f"\n{int(new_mask.sum())} yeni maç ile modeller güncelleniyor...")
+    
+    # Scaler'ı yalnızca yeni maçlarla güncelle (eski scaler değiştirilmez)
+    old_values = _scaled_feature_values(X, scaler)
+    scaler = copy.deepcopy(scaler)
+    scaler.partial_fit(X[new_mask])
+    new_values = _scaled_feature_values(X, scaler)
+    X_scaled = scaler.transform(X)
+    
+    # train_models ile aynı tarih ayrımı; yeni maçlar en yeni maçlar olduğu için
+    # test tarafına düşse de güncellemenin amacı oldukları için eğitime alınır
+    test_start = date_split_index(_row_dates(X))
+    train_mask = (np.arange(len(X)) < test_start) | new_mask
+    X_train = X_scaled[train_mask]
+    targets = {'match_result': y_match, 'score': y_score, 'htft': y_htft, 'btts': y_btts}
+    
+    jobs = []
+    for market, target in targets.items():
+        if not models.get(market):
+            continue
         
-        scaler_path = os.path.join(MODELS_DIR, f'{prefix}scaler.joblib')
-        scaler = joblib.load(scaler_path)
+        # KG modelleri seçilen özellikler üzerinde çalışır
+        columns = np.arange(X_train.shape[1])
+        if market == 'btts' and 'btts_selector' in models:
+            columns = models['btts_selector'].get_support(indices=True)
         
-        return models, scaler
-    except Exception as e:
-        print(f"Modeller yüklenirken hata oluştu: {str(e)}")
-        print("Modeller yeniden eğitilecek.")
-        return None, None 
\ No newline at end of file
+        y_train = np.asarray(target)[train_mask]
+        for name, model in models[market].items():
+            jobs.append((market, name, model, X_train[:, columns], y_train,
+                         [old_values[i] for i in columns], [new_values[i] for i in columns],
+                         added_estimators))
+    
+    results = Parallel(n_jobs=n_jobs)(delayed(_update_model_job)(*job) for job in jobs)
+    
+    # Çağıranın modelleri değiştirilmeden yeni sözlük oluşturulur
+    updated = {market: dict(model_dict) if isinstance(model_dict, dict) else model_dict
+               for market, model_dict in models.items()}
+    timings = []
+    for market, name, model, elapsed in results:
+        updated[market][name] = model
+        timings.append((market, name, 'fit', None, elapsed))
+    
+    print_training_timings(timings, time.perf_counter() - wall_start)
+    return updated, scaler, new_state
@@ -0,0 +1,107 @@
+import os
+import threading
+import time
+from latency_metrics import latency_metrics
+
+# Hazırlık durumları
+STARTING = 'starting'
+LOADING = 'loading'
+READY = 'ready'
+FAILED = 'failed'
+
+# Hazır olmayan sunucunun istemcilere önerdiği yeniden deneme süresi (saniye)
+RETRY_AFTER = 5
+
+# Başarısız hazırlığın yeniden denenmesi için beklenen ilk süre ve üst sınır (saniye);
+# her başarısız denemede süre iki katına çıkar
+RETRY_BACKOFF = 30
+MAX_RETRY_BACKOFF = 600
+
+class ModelWarmup:
+    """
+    Modelleri web sunucusunu bekletmeden arka planda yükleyen (gerekirse eğiten) işçi.
+    warm_fn modelleri kayda yerleştirir, hata durumunda istisna fırlatır. Durum
+    /readyz için status() ile alınır; hazır olana kadar istekler beklemeden
+    "hazırlanıyor" yanıtı döndürebilir. Başarısız hazırlık, bekleme süresi
+    dolduktan sonraki ilk start() çağrısında (her istekte yapılır) yeniden denenir.
+    """
+    def __init__(self, warm_fn, retry_backoff=RETRY_BACKOFF, max_retry_backoff=MAX_RETRY_BACKOFF):
+        self.warm_fn = warm_fn
+        self.retry_backoff = retry_backoff
+        self.max_retry_backoff = max_retry_backoff
+        self.state = STARTING
+        self.error = None
+        self.attempts = 0
+        self.started_at = None
+        self.finished_at = None
+        self.retry_at = None
+        self._worker = None
+        self._pid = None
+        self._ready = threading.Event()
+        self._finished = threading.Event()
+        self._lock = threading.Lock()
+    
+    def start(self):
+        """
+        İşçiyi başlatır; modeller hazırsa, işçi çalışıyorsa veya başarısız denemenin
+        bekleme süresi dolmadıysa bir şey yapmaz. Çatallanan süreçlere (gunicorn
+        --preload) iş parçacıkları geçmediği için, hazırlık ana süreçte bitmeden
+        çatallanan süreçte işçi yeniden başlatılır.
+        """
+        with self._lock:
+            if self._ready.is_set():
+                return
+            if self._pid == os.getpid() and not (self.state == FAILED and time.time() >= self.retry_at):
+                return
+            self._pid = os.getpid()
+            self.state = LOADING
+            self.attempts += 1
+            self.started_at = time.time()
+            self.finished_at = None
+            self._finished.clear()
+            self._worker = threading.Thread(target=self._run, name='model-warmup', daemon=True)
+            self._worker.start()
+    
+    def _run(self):
+        try:
+            with latency_metrics.timed('model_warmup'):
+                self.warm_fn()
+        except Exception as e:
+            backoff = min(self.retry_backoff * 2 ** (self.attempts - 1), self.max_retry_backoff)
+            print(f"Modeller hazırlanırken hata oluştu: {str(e)} ({backoff} sn sonra yeniden denenecek)")
+            self.error = str(e)
+            self.finished_at = time.time()
+            self.retry_at = self.finished_at + backoff
+            self.state = FAILED
+        else:
+            self.error = None
+            self.finished_at = time.time()
+            self.state = READY
+            self._ready.set()
+        finally:
+            self._finished.set()
+    
+    def is_ready(self):
+        return self._ready.is_set()
+    
+    def wait(self, timeout=None):
+        """
+        Süren hazırlık denemesinin bitmesini (en fazla timeout saniye) bekler;
+        modeller hazırsa True döndürür.
+        """
+        self._finished.wait(timeout)
+        return self.is_ready()
+    
+    def status(self):
+        """
+        Hazırlık durumunu, deneme sayısını, geçen süreyi ve varsa son hatayı ve
+        yeniden denemeye kalan süreyi sözlük olarak döndürür.
+        """
+        status = {'status': self.state, 'attempts': self.attempts}
+        if self.started_at is not None:
+            status['elapsed_s'] = round((self.finished_at or time.time()) - self.started_at, 3)
+        if self.state == FAILED:
+            status['retry_in_s'] = round(max(0.0, self.retry_at - time.time()), 1)
+        if self.error is not None:
+            status['error'] = self.error
+        return status
@@ -1,7 +1,7 @@
 import numpy as np
-from data_preprocessing import get_team_stats
-from model_training import load_models
-from prediction_functions import predict_match_result, predict_score, predict_ht_ft, predict_btts, get_highest_probability_prediction
+from data_preprocessing import get_team_stats, get_head_to_head_stats, result_codes
+from model_registry import model_registry
+from prediction_matrix import predict_match
 from datetime import datetime
 from io import StringIO
 
@@ -43,18 +43,80 @@ def get_team_performance_stats(team_data, last_n=5):
     stats['Puan'] = (stats['Galibiyet'] * 3) + stats['Beraberlik']
     
     # Son maçların detayları
-    stats['Son Maçlar'] = []
-    for _, match in recent_data.iterrows():
-        match_info = {
-            'Tarih': format_date(match['Tarih']),
-            'Rakip': match['Rakip'],
-            'Gol': match['MS Gol'],
-            'Sonuç': match['Sonuç']
-        }
-        stats['Son Maçlar'].append(match_info)
+    stats['Son Maçlar'] = recent_match_records(recent_data)
     
     return stats
 
+# Maç özetlerindeki sonuç etiketleri (sıra result_codes ile aynı: galibiyet, beraberlik, mağlubiyet)
+LAST_MATCH_RESULTS = np.array(['Galibiyet', 'Beraberlik', 'Mağlubiyet'], dtype=object)
+LAST_MATCH_COLUMNS = ('Rakip', 'Ev Sahibi/Deplasman', 'MS Gol', 'MS Yenilen Gol')
+H2H_RESULTS = np.array(['Ev Sahibi Galip', 'Beraberlik', 'Deplasman Galip'], dtype=object)
+
+def score_labels(goals_for, goals_against):
+    """
+    Gol sütunlarından 'x-y' skor metinlerini oluşturur.
+    """
+    return [f"{home}-{away}" for home, away in zip(goals_for.tolist(), goals_against.tolist())]
+
+def match_records(keys, *columns):
+    """
+    Sütun listelerini satır sözlüklerine çevirir. Birkaç satırlık özetlerde
+    DataFrame oluşturup to_dict('records') çağırmaktan çok daha ucuzdur.
+    """
+    return [dict(zip(keys, values)) for values in zip(*columns)]
+
+def recent_match_records(recent_data):
+    """
+    Son maçların tarih, rakip, gol ve sonuç özetlerini döndürür.
+    """
+    return match_records(
+        ('Tarih', 'Rakip', 'Gol', 'Sonuç'),
+        [format_date(date) for date in recent_data['Tarih'].tolist()],
+        recent_data['Rakip'].tolist(),
+        recent_data['MS Gol'].tolist(),
+        recent_data['Sonuç'].tolist()
+    )
+
+def get_last_matches(team_data, count=5):
+    """Takımın son maçlarını döndürür."""
+    # head() ile yeni bir DataFrame kurmak ve Series işlemleri birkaç satır için
+    # kaydı oluşturmaktan pahalıdır; gereken sütunların dizileri doğrudan dilimlenir
+    recent = {column: team_data[column].to_numpy()[:count] for column in LAST_MATCH_COLUMNS}
+    goals_for, goals_against = recent['MS Gol'], recent['MS Yenilen Gol']
+    return match_records(
+        ('date', 'opponent', 'is_home', 'score', 'result'),
+        # Tarihler pandas Timestamp olarak kalsın diye Series üzerinden alınır
+        team_data['Tarih'].iloc[:count].tolist(),
+        recent['Rakip'].tolist(),
+        [side == 'Ev Sahibi' for side in recent['Ev Sahibi/Deplasman'].tolist()],
+        score_labels(goals_for, goals_against),
+        LAST_MATCH_RESULTS[result_codes(goals_for, goals_against)].tolist()
+    )
+
+def get_head_to_head_matches(home_team, away_team, count=5):
+    """İki takım arasındaki son karşılaşmaları döndürür."""
+    # Her iki takımın da yalnızca son count karşılaşması rakip indeksinden alınır
+    home_vs_away, away_vs_home = get_head_to_head_stats(home_team, away_team, count)
+    h2h_matches = []
+    
+    # Deplasman takımının kayıtlarında skor ev sahibine göre ters çevrilir;
+    # sonuç etiketi her iki tabloda da kaydın sahibinin gollerine göredir
+    for frame, owner, opponent, reverse in [(home_vs_away, home_team, away_team, False),
+                                            (away_vs_home, away_team, home_team, True)]:
+        goals_for, goals_against = frame['MS Gol'], frame['MS Yenilen Gol']
+        h2h_matches += match_records(
+            ('date', 'home_team', 'away_team', 'score', 'result'),
+            frame['Tarih'].tolist(),
+            [owner] * len(frame),
+            [opponent] * len(frame),
+            score_labels(goals_against, goals_for) if reverse else score_labels(goals_for, goals_against),
+            H2H_RESULTS[result_codes(goals_for, goals_against)].tolist()
+        )
+    
+    # Tarihe göre sırala
+    h2h_matches.sort(key=lambda x: x['date'], reverse=True)
+    return h2h_matches[:count]  # Son maçlar
+
 def display_predictions(home_team, away_team):
     """
     Tüm tahminleri gösterir ve result.txt dosyasına kaydeder.
@@ -63,9 +125,6 @@ def display_predictions(home_team, away_team):
         # Çıktıyı kaydetmek için StringIO kullan
         output = StringIO()
         
-        # Modelleri yükle
-        models, scaler = load_models()
-        
         # Takım verilerini al
         home_data = get_team_stats(home_team)
         away_data = get_team_stats(away_team)
@@ -74,20 +133,13 @@ def display_predictions(home_team, away_team):
         home_stats = get_team_performance_stats(home_data)
         away_stats = get_team_performance_stats(away_data)
         
-        # Maç sonucu tahminleri
-        final_pred = predict_match_result(home_team, away_team, models, scaler)
-        
-        # Skor tahmini
-        home_goals, away_goals, score_prob = predict_score(home_team, away_team, models, scaler)
-        
-        # İY/MS tahmini
-        ht_ft, htft_prob = predict_ht_ft(home_team, away_team, models, scaler)
-        
-        # KG tahmini
-        btts, btts_prob = predict_btts(home_team, away_team, models, scaler)
-        
-        # En yüksek olasılıklı tahmini bul
-        best_pred, best_prob = get_highest_probability_prediction(final_pred, score_prob, htft_prob, btts_prob)
+        # Tüm tahminleri tek seferde hesapla
+        prediction = predict_match(home_team, away_team, model_registry)
+        final_pred = prediction['match_result']
+        home_goals, away_goals, score_prob = prediction['score']
+        ht_ft, htft_prob = prediction['htft']
+        btts, btts_prob = prediction['btts']
+        best_pred, best_prob = prediction['best']
         
         # Tahmin zamanını al
         prediction_time = datetime.now().strftime('%d.%m.%Y %H:%M:%S')
@@ -329,7 +381,7 @@ def display_predictions(home_team, away_team):
         
         # StringIO'yu kapat
         output.close()
-        
+    
     except Exception as e:
         error_msg = f"Tahminleri gösterirken bir hata oluştu: {str(e)}\nLütfen tekrar deneyin."
         print(error_msg)
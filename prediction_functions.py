@@ -1,237 +1,296 @@
 import numpy as np
-from data_preprocessing import get_team_stats, get_head_to_head_stats, prepare_features
+from data_preprocessing import team_form_vector
+from latency_metrics import latency_metrics
 
-def predict_match_result(home_team, away_team, models, scaler):
+# Modeller kullanılamadığında dönülecek varsayılan tahminler
+DEFAULT_MATCH_RESULT = {'home_win': 0.33, 'draw': 0.34, 'away_win': 0.33}
+DEFAULT_SCORE = (1, 1, 0.33)
+DEFAULT_HTFT = ("X-X", 0.33)
+DEFAULT_BTTS = ("YOK", 0.33)
+
+def build_match_vectors(home_team, away_team, scaler):
     """
-    İki takım arasındaki maç sonucunu tahmin eder.
+    İki takımın son 5 maç ortalamasından ölçeklenmiş özellik vektörlerini hazırlar.
     """
-    try:
-        # Takımların son maçlarındaki performanslarını al
-        home_data = get_team_stats(home_team)
-        away_data = get_team_stats(away_team)
-        
-        # Son 5 maçın ortalamasını al
-        home_recent = home_data.head(5)
-        away_recent = away_data.head(5)
-        
-        # Geçmiş karşılaşmaları al
-        h2h_home, h2h_away = get_head_to_head_stats(home_team, away_team)
-        
-        # Özellikleri hazırla
-        X_home, _, _, _, _ = prepare_features(home_recent)
-        X_away, _, _, _, _ = prepare_features(away_recent)
-        
-        # Ortalama değerleri al
-        X_home_mean = X_home.mean().values.reshape(1, -1)
-        X_away_mean = X_away.mean().values.reshape(1, -1)
-        
-        # Verileri ölçeklendir
+    # Son 5 maçın ortalama özellik vektörleri (takım verisi değişene kadar saklanır)
+    X_home_mean = team_form_vector(home_team, 5).reshape(1, -1)
+    X_away_mean = team_form_vector(away_team, 5).reshape(1, -1)
+    
+    # Verileri ölçeklendir
+    with latency_metrics.timed('scaler_transform'):
         X_home_scaled = scaler.transform(X_home_mean)
         X_away_scaled = scaler.transform(X_away_mean)
-        
-        # Her model için tahminleri al
-        predictions = {}
+    
+    return X_home_scaled, X_away_scaled
+
+def team_market_outputs(market, X_scaled, models):
+    """
+    Bir tahmin türünün tüm modellerini ölçeklenmiş takım matrisi üzerinde
+    tek seferde çalıştırır. Her model için satır başına çıktıları döndürür.
+    """
+    if market == 'match_result':
+        # Her model için sınıf olasılıkları (0: Mağlup, 1: Berabere, 2: Galip)
+        outputs = []
         for name, model in models['match_result'].items():
-            home_pred = model.predict_proba(X_home_scaled)[0]
-            away_pred = model.predict_proba(X_away_scaled)[0]
-            
-            # Ev sahibi avantajını hesaba kat
-            home_advantage = 0.1
-            predictions[name] = {
-                'home_win': (home_pred[2] + home_advantage) * 0.6 + away_pred[0] * 0.4,  # Galip (2)
-                'draw': home_pred[1] * 0.5 + away_pred[1] * 0.5,                         # Berabere (1)
-                'away_win': home_pred[0] * 0.4 + (away_pred[2] + home_advantage) * 0.6   # Mağlup (0)
-            }
-        
-        # Tüm modellerin tahminlerini ortala
-        final_pred = {
-            'home_win': np.mean([p['home_win'] for p in predictions.values()]),
-            'draw': np.mean([p['draw'] for p in predictions.values()]),
-            'away_win': np.mean([p['away_win'] for p in predictions.values()])
-        }
-        
-        # Olasılıkları normalize et
-        total = sum(final_pred.values())
-        if total > 0:
-            for key in final_pred:
-                final_pred[key] /= total
-        
-        return final_pred
+            with latency_metrics.model_timer(market, name, 'predict_proba'):
+                outputs.append(model.predict_proba(X_scaled))
+        return outputs
+    
+    if market == 'score':
+        outputs = []
+        for name, model in models['score'].items():
+            with latency_metrics.model_timer(market, name, 'predict'):
+                outputs.append(model.predict(X_scaled))
+        return outputs
+    
+    if market == 'btts':
+        # Feature selection uygula
+        selector = models.get('btts_selector')
+        if selector:
+            with latency_metrics.model_timer(market, 'btts_selector', 'transform'):
+                X_scaled = selector.transform(X_scaled)
+    
+    # İY/MS ve KG için tahmin edilen sınıf ve en yüksek olasılık; sınıf, predict
+    # ayrıca çağrılmadan aynı olasılıkların en büyüğünden seçilir
+    outputs = []
+    for name, model in models[market].items():
+        with latency_metrics.model_timer(market, name, 'predict_proba'):
+            proba = model.predict_proba(X_scaled)
+        outputs.append((model.classes_[np.argmax(proba, axis=1)], np.max(proba, axis=1)))
+    return outputs
+
+def _majority_vote(labels):
+    """
+    Modellerin (model x maç) etiket matrisinden maç başına en çok tahmin
+    edilen etiketi seçer. Eşitlikte ilk modelin etiketi kazanır (Counter.most_common ile aynı).
+    """
+    labels = np.asarray(labels)
+    votes = (labels[:, None, :] == labels[None, :, :]).sum(axis=1)
+    winner = np.argmax(votes, axis=0)
+    return labels[winner, np.arange(labels.shape[1])]
+
+def combine_match_result(outputs, home_idx, away_idx):
+    """
+    Model olasılıklarından maç sonucu olasılıklarını hesaplar.
+    """
+    home_win, draw, away_win = [], [], []
+    for proba in outputs:
+        home_pred = proba[home_idx]
+        away_pred = proba[away_idx]
+        
+        # Ev sahibi avantajını hesaba kat
+        home_advantage = 0.1
+        home_win.append((home_pred[:, 2] + home_advantage) * 0.6 + away_pred[:, 0] * 0.4)  # Galip (2)
+        draw.append(home_pred[:, 1] * 0.5 + away_pred[:, 1] * 0.5)                         # Berabere (1)
+        away_win.append(home_pred[:, 0] * 0.4 + (away_pred[:, 2] + home_advantage) * 0.6)  # Mağlup (0)
+    
+    # Tüm modellerin tahminlerini ortala
+    home_win = np.mean(home_win, axis=0)
+    draw = np.mean(draw, axis=0)
+    away_win = np.mean(away_win, axis=0)
+    
+    # Olasılıkları normalize et
+    total = home_win + draw + away_win
+    scale = np.where(total > 0, total, 1.0)
+    return home_win / scale, draw / scale, away_win / scale
+
+def combine_score(outputs, home_idx, away_idx):
+    """
+    Model tahminlerinden skoru ve olasılığını hesaplar.
+    """
+    home_goals_pred = np.array([pred[home_idx] for pred in outputs])
+    away_goals_pred = np.array([pred[away_idx] for pred in outputs])
+    
+    # Tahminlerin ortalamasını al ve yuvarla
+    home_mean = np.mean(home_goals_pred, axis=0)
+    away_mean = np.mean(away_goals_pred, axis=0)
+    home_goals = np.round(home_mean)
+    away_goals = np.round(away_mean)
+    
+    # Tahmin edilen skor ile ortalama arasındaki farkı hesapla
+    home_diff = np.abs(home_goals - home_mean)
+    away_diff = np.abs(away_goals - away_mean)
+    
+    # Olasılığı hesapla (ne kadar sapma varsa o kadar düşük olasılık)
+    score_prob = np.exp(-(home_diff + away_diff) / 2) * 0.7  # Max %70 olasılık
+    
+    return (np.maximum(0, home_goals).astype(int),
+            np.maximum(0, away_goals).astype(int),
+            score_prob)
+
+def _combine_classifier_votes(outputs, home_idx, away_idx, pick_label):
+    """
+    İY/MS ve KG için model bazında etiket seçer, oylar ve olasılığı hesaplar.
+    """
+    predictions = []
+    probabilities = []
+    for labels, max_proba in outputs:
+        home_prob = max_proba[home_idx]
+        away_prob = max_proba[away_idx]
+        predictions.append(pick_label(labels[home_idx], labels[away_idx], home_prob, away_prob))
+        probabilities.append(np.maximum(home_prob, away_prob))
+    
+    # En çok tahmin edilen sonucu bul
+    most_common = _majority_vote(predictions)
+    
+    # Olasılık hesapla
+    # Tahminlerin tutarlılığına göre olasılığı ayarla
+    prob_std = np.std(probabilities, axis=0)
+    avg_prob = np.mean(probabilities, axis=0)
+    
+    # Olasılığı sınırla (maksimum %65)
+    final_prob = np.minimum(0.65, avg_prob * np.exp(-prob_std))
+    
+    return most_common, final_prob
+
+def combine_htft(outputs, home_idx, away_idx):
+    """
+    Model tahminlerinden İY/MS tahminini ve olasılığını hesaplar.
+    """
+    return _combine_classifier_votes(
+        outputs, home_idx, away_idx,
+        lambda home_pred, away_pred, home_prob, away_prob: np.where(home_prob > away_prob, home_pred, away_pred)
+    )
+
+def combine_btts(outputs, home_idx, away_idx):
+    """
+    Model tahminlerinden Karşılıklı Gol tahminini ve olasılığını hesaplar.
+    """
+    most_common, final_prob = _combine_classifier_votes(
+        outputs, home_idx, away_idx,
+        lambda home_pred, away_pred, home_prob, away_prob: home_pred.astype(bool) | away_pred.astype(bool)
+    )
+    return np.where(most_common, "VAR", "YOK"), final_prob
+
+MARKET_COMBINERS = {
+    'match_result': combine_match_result,
+    'score': combine_score,
+    'htft': combine_htft,
+    'btts': combine_btts
+}
+
+def _market_from_vectors(market, X_home_scaled, X_away_scaled, models):
+    """
+    Tek bir maç için ev sahibi ve deplasman vektörlerini aynı matriste çalıştırır.
+    """
+    X_scaled = np.vstack([X_home_scaled, X_away_scaled])
+    outputs = team_market_outputs(market, X_scaled, models)
+    return MARKET_COMBINERS[market](outputs, np.array([0]), np.array([1]))
+
+def match_result_from_vectors(X_home_scaled, X_away_scaled, models):
+    """
+    Ölçeklenmiş özellik vektörlerinden maç sonucu olasılıklarını hesaplar.
+    """
+    home_win, draw, away_win = _market_from_vectors('match_result', X_home_scaled, X_away_scaled, models)
+    return {'home_win': home_win[0], 'draw': draw[0], 'away_win': away_win[0]}
+
+def score_from_vectors(X_home_scaled, X_away_scaled, models):
+    """
+    Ölçeklenmiş özellik vektörlerinden skoru ve olasılığını hesaplar.
+    """
+    home_goals, away_goals, score_prob = _market_from_vectors('score', X_home_scaled, X_away_scaled, models)
+    return int(home_goals[0]), int(away_goals[0]), score_prob[0]
+
+def htft_from_vectors(X_home_scaled, X_away_scaled, models):
+    """
+    Ölçeklenmiş özellik vektörlerinden İY/MS tahminini ve olasılığını hesaplar.
+    """
+    most_common, final_prob = _market_from_vectors('htft', X_home_scaled, X_away_scaled, models)
+    return most_common[0], final_prob[0]
+
+def btts_from_vectors(X_home_scaled, X_away_scaled, models):
+    """
+    Ölçeklenmiş özellik vektörlerinden Karşılıklı Gol tahminini ve olasılığını hesaplar.
+    """
+    label, final_prob = _market_from_vectors('btts', X_home_scaled, X_away_scaled, models)
+    return str(label[0]), final_prob[0]
+
+def predict_match_result(home_team, away_team, models, scaler):
+    """
+    İki takım arasındaki maç sonucunu tahmin eder.
+    """
+    try:
+        X_home_scaled, X_away_scaled = build_match_vectors(home_team, away_team, scaler)
+        return match_result_from_vectors(X_home_scaled, X_away_scaled, models)
     except Exception as e:
         print(f"Tahmin sırasında bir hata oluştu: {str(e)}")
-        return {'home_win': 0.33, 'draw': 0.34, 'away_win': 0.33}
+        return dict(DEFAULT_MATCH_RESULT)
 
 def predict_score(home_team, away_team, models, scaler):
     """
     Maç skorunu ve olasılığını tahmin eder.
     """
     try:
-        # Takımların son maçlarındaki performanslarını al
-        home_data = get_team_stats(home_team)
-        away_data = get_team_stats(away_team)
-        
-        # Son 5 maçın ortalamasını al
-        home_recent = home_data.head(5)
-        away_recent = away_data.head(5)
-        
-        # Özellikleri hazırla
-        X_home, _, _, _, _ = prepare_features(home_recent)
-        X_away, _, _, _, _ = prepare_features(away_recent)
-        
-        # Ortalama değerleri al
-        X_home_mean = X_home.mean().values.reshape(1, -1)
-        X_away_mean = X_away.mean().values.reshape(1, -1)
-        
-        # Verileri ölçeklendir
-        X_home_scaled = scaler.transform(X_home_mean)
-        X_away_scaled = scaler.transform(X_away_mean)
-        
-        # Her model için tahminleri al
-        home_goals_pred = []
-        away_goals_pred = []
-        
-        for name, model in models['score'].items():
-            home_goals_pred.append(model.predict(X_home_scaled)[0])
-            away_goals_pred.append(model.predict(X_away_scaled)[0])
-        
-        # Tahminlerin ortalamasını al ve yuvarla
-        home_goals = round(np.mean(home_goals_pred))
-        away_goals = round(np.mean(away_goals_pred))
-        
-        # Olasılık hesapla
-        # Tahminlerin standart sapması ve ortalaması arasındaki farka göre olasılık hesapla
-        home_std = np.std(home_goals_pred)
-        away_std = np.std(away_goals_pred)
-        home_mean = np.mean(home_goals_pred)
-        away_mean = np.mean(away_goals_pred)
-        
-        # Tahmin edilen skor ile ortalama arasındaki farkı hesapla
-        home_diff = abs(home_goals - home_mean)
-        away_diff = abs(away_goals - away_mean)
-        
-        # Olasılığı hesapla (ne kadar sapma varsa o kadar düşük olasılık)
-        score_prob = np.exp(-(home_diff + away_diff) / 2) * 0.7  # Max %70 olasılık
-        
-        return max(0, home_goals), max(0, away_goals), score_prob
+        X_home_scaled, X_away_scaled = build_match_vectors(home_team, away_team, scaler)
+        return score_from_vectors(X_home_scaled, X_away_scaled, models)
     except Exception as e:
         print(f"Skor tahmini sırasında bir hata oluştu: {str(e)}")
-        return 1, 1, 0.33
+        return DEFAULT_SCORE
 
 def predict_ht_ft(home_team, away_team, models, scaler):
     """
     İlk Yarı / Maç Sonucu tahminini ve olasılığını yapar.
     """
     try:
-        # Takımların son maçlarındaki performanslarını al
-        home_data = get_team_stats(home_team)
-        away_data = get_team_stats(away_team)
-        
-        # Son 5 maçın ortalamasını al
-        home_recent = home_data.head(5)
-        away_recent = away_data.head(5)
-        
-        # Özellikleri hazırla
-        X_home, _, _, _, _ = prepare_features(home_recent)
-        X_away, _, _, _, _ = prepare_features(away_recent)
-        
-        # Ortalama değerleri al
-        X_home_mean = X_home.mean().values.reshape(1, -1)
-        X_away_mean = X_away.mean().values.reshape(1, -1)
-        
-        # Verileri ölçeklendir
-        X_home_scaled = scaler.transform(X_home_mean)
-        X_away_scaled = scaler.transform(X_away_mean)
-        
-        # Her model için tahminleri al
-        predictions = {}
-        probabilities = []
-        
-        for name, model in models['htft'].items():
-            home_pred = model.predict(X_home_scaled)[0]
-            away_pred = model.predict(X_away_scaled)[0]
-            home_prob = np.max(model.predict_proba(X_home_scaled)[0])
-            away_prob = np.max(model.predict_proba(X_away_scaled)[0])
-            
-            predictions[name] = home_pred if home_prob > away_prob else away_pred
-            probabilities.append(max(home_prob, away_prob))
-        
-        # En çok tahmin edilen sonucu bul
-        from collections import Counter
-        most_common = Counter(predictions.values()).most_common(1)[0][0]
-        
-        # Olasılık hesapla
-        # Tahminlerin standart sapmasına göre olasılığı azalt
-        prob_std = np.std(probabilities)
-        avg_prob = np.mean(probabilities)
-        
-        # Olasılığı sınırla (maksimum %65)
-        final_prob = min(0.65, avg_prob * np.exp(-prob_std))
-        
-        return most_common, final_prob
+        X_home_scaled, X_away_scaled = build_match_vectors(home_team, away_team, scaler)
+        return htft_from_vectors(X_home_scaled, X_away_scaled, models)
     except Exception as e:
         print(f"İY/MS tahmini sırasında bir hata oluştu: {str(e)}")
-        return "X-X", 0.33
+        return DEFAULT_HTFT
 
 def predict_btts(home_team, away_team, models, scaler):
     """
     Karşılıklı Gol tahminini ve olasılığını yapar.
     """
     try:
-        # Takımların son maçlarındaki performanslarını al
-        home_data = get_team_stats(home_team)
-        away_data = get_team_stats(away_team)
-        
-        # Son 5 maçın ortalamasını al
-        home_recent = home_data.head(5)
-        away_recent = away_data.head(5)
-        
-        # Özellikleri hazırla
-        X_home, _, _, _, _ = prepare_features(home_recent)
-        X_away, _, _, _, _ = prepare_features(away_recent)
-        
-        # Ortalama değerleri al
-        X_home_mean = X_home.mean().values.reshape(1, -1)
-        X_away_mean = X_away.mean().values.reshape(1, -1)
-        
-        # Verileri ölçeklendir
-        X_home_scaled = scaler.transform(X_home_mean)
-        X_away_scaled = scaler.transform(X_away_mean)
-        
-        # Feature selection uygula
-        selector = models.get('btts_selector')
-        if selector:
-            X_home_scaled = selector.transform(X_home_scaled)
-            X_away_scaled = selector.transform(X_away_scaled)
-        
-        # Her model için tahminleri al
-        predictions = {}
-        probabilities = []
-        
-        for name, model in models['btts'].items():
-            home_pred = model.predict(X_home_scaled)[0]
-            away_pred = model.predict(X_away_scaled)[0]
-            home_prob = np.max(model.predict_proba(X_home_scaled)[0])
-            away_prob = np.max(model.predict_proba(X_away_scaled)[0])
-            
-            predictions[name] = bool(home_pred or away_pred)
-            probabilities.append(max(home_prob, away_prob))
-        
-        # En çok tahmin edilen sonucu bul
-        from collections import Counter
-        most_common = Counter(predictions.values()).most_common(1)[0][0]
-        
-        # Olasılık hesapla
-        # Tahminlerin tutarlılığına göre olasılığı ayarla
-        prob_std = np.std(probabilities)
-        avg_prob = np.mean(probabilities)
-        
-        # Olasılığı sınırla (maksimum %65)
-        final_prob = min(0.65, avg_prob * np.exp(-prob_std))
-        
-        return "VAR" if most_common else "YOK", final_prob
+        X_home_scaled, X_away_scaled = build_match_vectors(home_team, away_team, scaler)
+        return btts_from_vectors(X_home_scaled, X_away_scaled, models)
     except Exception as e:
         print(f"KG tahmini sırasında bir hata oluştu: {str(e)}")
-        return "YOK", 0.33
+        return DEFAULT_BTTS
+
+class MatchPredictor:
+    """
+    Dört tahmin türünü (maç sonucu, skor, İY/MS, KG) tek bir özellik
+    hazırlığından hesaplar. Takım verileri ve ölçekleme maç başına bir kez yapılır.
+    """
+    def __init__(self, models, scaler):
+        self.models = models
+        self.scaler = scaler
+    
+    def predict(self, home_team, away_team):
+        """
+        Tüm tahminleri tek bir sözlükte döndürür:
+        match_result, score, htft, btts ve best (en yüksek olasılıklı tahmin).
+        """
+        try:
+            X_home_scaled, X_away_scaled = build_match_vectors(home_team, away_team, self.scaler)
+        except Exception as e:
+            print(f"Özellikler hazırlanırken bir hata oluştu: {str(e)}")
+            X_home_scaled = X_away_scaled = None
+        
+        markets = [
+            ('match_result', match_result_from_vectors, DEFAULT_MATCH_RESULT, "Tahmin"),
+            ('score', score_from_vectors, DEFAULT_SCORE, "Skor tahmini"),
+            ('htft', htft_from_vectors, DEFAULT_HTFT, "İY/MS tahmini"),
+            ('btts', btts_from_vectors, DEFAULT_BTTS, "KG tahmini")
+        ]
+        
+        result = {}
+        for key, market_fn, default, label in markets:
+            # Varsayılan sözlüğün paylaşılan kopyası değiştirilmesin
+            result[key] = dict(default) if isinstance(default, dict) else default
+            if X_home_scaled is None:
+                continue
+            try:
+                result[key] = market_fn(X_home_scaled, X_away_scaled, self.models)
+            except Exception as e:
+                print(f"{label} sırasında bir hata oluştu: {str(e)}")
+        
+        result['best'] = get_highest_probability_prediction(
+            result['match_result'], result['score'][2], result['htft'][1], result['btts'][1]
+        )
+        return result
 
 def get_highest_probability_prediction(final_pred, score_prob, htft_prob, btts_prob):
     """
@@ -248,4 +307,4 @@ def get_highest_probability_prediction(final_pred, score_prob, htft_prob, btts_p
     
     # En yüksek olasılıklı tahmini bul
     max_pred = max(predictions.items(), key=lambda x: x[1])
-    return max_pred[0], max_pred[1] 
\ No newline at end of file
+    return max_pred[0], max_pred[1]
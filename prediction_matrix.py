@@ -0,0 +1,276 @@
+import argparse
+import os
+import threading
+import numpy as np
+import pandas as pd
+from batch_prediction import predict_fixtures
+from feature_store import STATS_DIR
+from model_store import MODELS_DIR
+
+# Tüm takım eşleşmelerinin önceden hesaplanmış tahminlerinin kaydedildiği dosya
+MATRIX_FILE = 'prediction_matrix.npz'
+
+# Dosya biçiminin sürümü; tahmin hesaplaması değiştiğinde artırılır ve eski matrisler yeniden hesaplanır
+# (2: İY/MS ve KG sınıfları predict yerine predict_proba'nın en büyüğünden seçilir)
+MATRIX_FORMAT = 2
+
+# Metin sonuçlarının sabit etiket listeleri (diziler bu listelerdeki sıra numaralarını tutar)
+HTFT_LABELS = ['1-1', '1-X', '1-2', 'X-1', 'X-X', 'X-2', '2-1', '2-X', '2-2']
+BTTS_LABELS = ['VAR', 'YOK']
+BEST_LABELS = ['Ev Sahibi Kazanır', 'Beraberlik', 'Deplasman Kazanır', 'Tahmini Skor', 'İY/MS', 'Karşılıklı Gol']
+
+# Olasılık sütunları float64, sınıf sütunları etiket listelerine göre kodlanır
+FLOAT_COLUMNS = ['home_win', 'draw', 'away_win', 'score_prob', 'htft_prob', 'btts_prob', 'best_prob']
+INT_COLUMNS = ['home_goals', 'away_goals']
+LABEL_COLUMNS = {'htft': HTFT_LABELS, 'btts': BTTS_LABELS, 'best': BEST_LABELS}
+
+def _team_signature(stats_dir, team):
+    try:
+        stat = os.stat(os.path.join(stats_dir, f'{team}.csv'))
+    except OSError:
+        return (-1, -1)
+    return (stat.st_mtime_ns, stat.st_size)
+
+class PredictionMatrix:
+    """
+    Tüm (ev sahibi, deplasman) eşleşmelerinin tahminlerini takım x takım dizilerinde tutar.
+    Her takımın CSV imzası (mtime, boyut) ve modellerin sürümü saklanır; bir takımın
+    dosyası değişirse yalnızca o takımın satır ve sütunu geçersiz sayılır.
+    """
+    def __init__(self, teams, arrays, signatures, model_version, stats_dir=STATS_DIR):
+        self.teams = list(teams)
+        self.team_index = {team: i for i, team in enumerate(self.teams)}
+        self.arrays = arrays
+        self.signatures = signatures
+        self.model_version = model_version
+        self.stats_dir = stats_dir
+    
+    @classmethod
+    def empty(cls, teams, model_version, stats_dir=STATS_DIR):
+        n = len(teams)
+        arrays = {column: np.full((n, n), np.nan) for column in FLOAT_COLUMNS}
+        arrays.update({column: np.zeros((n, n), dtype=np.int16) for column in INT_COLUMNS})
+        arrays.update({column: np.full((n, n), -1, dtype=np.int8) for column in LABEL_COLUMNS})
+        signatures = np.full((n, 2), -1, dtype=np.int64)
+        return cls(teams, arrays, signatures, model_version, stats_dir)
+    
+    def is_fresh(self, team):
+        """
+        Takımın tahminleri CSV dosyasının güncel haliyle hesaplanmışsa True döndürür.
+        """
+        i = self.team_index.get(team)
+        if i is None:
+            return False
+        return tuple(self.signatures[i]) == _team_signature(self.stats_dir, team)
+    
+    def fill(self, predictions, signatures):
+        """
+        predict_fixtures çıktısını matrise yazar ve hesaplanan takımların imzalarını günceller.
+        """
+        if len(predictions):
+            home_idx = predictions['home_team'].map(self.team_index).to_numpy()
+            away_idx = predictions['away_team'].map(self.team_index).to_numpy()
+            for column in FLOAT_COLUMNS:
+                self.arrays[column][home_idx, away_idx] = predictions[column].to_numpy(dtype=np.float64)
+            for column in INT_COLUMNS:
+                self.arrays[column][home_idx, away_idx] = predictions[column].to_numpy()
+            for column, labels in LABEL_COLUMNS.items():
+                codes = {label: code for code, label in enumerate(labels)}
+                self.arrays[column][home_idx, away_idx] = predictions[column].map(codes).to_numpy()
+        for team, signature in signatures.items():
+            self.signatures[self.team_index[team]] = signature
+    
+    def lookup(self, home_team, away_team):
+        """
+        Maçın tahminlerini MatchPredictor.predict ile aynı biçimde döndürür.
+        Eşleşme matriste yoksa veya takımlardan birinin verisi değişmişse None döner.
+        """
+        i = self.team_index.get(home_team)
+        j = self.team_index.get(away_team)
+        if i is None or j is None or i == j:
+            return None
+        if self.arrays['htft'][i, j] < 0 or not (self.is_fresh(home_team) and self.is_fresh(away_team)):
+            return None
+        
+        arrays = self.arrays
+        return {
+            'match_result': {
+                'home_win': arrays['home_win'][i, j],
+                'draw': arrays['draw'][i, j],
+                'away_win': arrays['away_win'][i, j]
+            },
+            'score': (int(arrays['home_goals'][i, j]), int(arrays['away_goals'][i, j]), arrays['score_prob'][i, j]),
+            'htft': (HTFT_LABELS[arrays['htft'][i, j]], arrays['htft_prob'][i, j]),
+            'btts': (BTTS_LABELS[arrays['btts'][i, j]], arrays['btts_prob'][i, j]),
+            'best': (BEST_LABELS[arrays['best'][i, j]], arrays['best_prob'][i, j])
+        }
+    
+    def to_frame(self):
+        """
+        Matrisi predict_fixtures ile aynı sütunlara sahip bir DataFrame'e çevirir.
+        """
+        home_idx, away_idx = np.nonzero(self.arrays['htft'] >= 0)
+        teams = np.array(self.teams, dtype=object)
+        frame = {'home_team': teams[home_idx], 'away_team': teams[away_idx]}
+        for column in ['home_win', 'draw', 'away_win', 'home_goals', 'away_goals', 'score_prob',
+                       'htft', 'htft_prob', 'btts', 'btts_prob', 'best', 'best_prob']:
+            values = self.arrays[column][home_idx, away_idx]
+            if column in LABEL_COLUMNS:
+                values = np.array(LABEL_COLUMNS[column], dtype=object)[values]
+            frame[column] = values
+        return pd.DataFrame(frame)
+    
+    def save(self, path):
+        """
+        Matrisi tek bir .npz dosyasına atomik olarak kaydeder.
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.tmp-{os.getpid()}.npz"
+        np.savez(
+            tmp_path,
+            teams=np.array(self.teams, dtype=str),
+            signatures=self.signatures,
+            format=np.int64(MATRIX_FORMAT),
+            model_version=np.array(self.model_version or ''),
+            stats_dir=np.array(self.stats_dir),
+            **self.arrays
+        )
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def load(cls, path):
+        """
+        Kaydedilmiş matrisi yükler; dosya yoksa, okunamıyorsa veya eski biçimdeyse None döndürür.
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if 'format' not in data or int(data['format']) != MATRIX_FORMAT:
+                    print("Tahmin matrisi eski biçimde, yeniden hesaplanacak.")
+                    return None
+                arrays = {column: data[column] for column in FLOAT_COLUMNS + INT_COLUMNS + list(LABEL_COLUMNS)}
+                return cls(data['teams'].tolist(), arrays, data['signatures'],
+                           str(data['model_version']) or None, str(data['stats_dir']))
+        except Exception as e:
+            print(f"Tahmin matrisi okunamadı: {str(e)}")
+            return None
+
+def build_prediction_matrix(models, scaler, model_version, previous=None, stats_dir=STATS_DIR):
+    """
+    Tüm takım eşleşmelerinin tahmin matrisini oluşturur. previous aynı model sürümüyle ve
+    aynı klasörden hesaplanmışsa yalnızca yeni veya dosyası değişmiş takımların maçları
+    yeniden hesaplanır, diğerleri kopyalanır.
+    """
+    teams = sorted(file[:-4] for file in os.listdir(stats_dir) if file.endswith('.csv'))
+    matrix = PredictionMatrix.empty(teams, model_version, stats_dir)
+    
+    reusable = (previous is not None and previous.model_version == model_version
+                and previous.stats_dir == stats_dir)
+    if reusable:
+        fresh = [team for team in teams if previous.is_fresh(team)]
+        new_idx = np.array([matrix.team_index[team] for team in fresh], dtype=int)
+        old_idx = np.array([previous.team_index[team] for team in fresh], dtype=int)
+        for column, values in previous.arrays.items():
+            matrix.arrays[column][np.ix_(new_idx, new_idx)] = values[np.ix_(old_idx, old_idx)]
+        matrix.signatures[new_idx] = previous.signatures[old_idx]
+        stale = set(teams) - set(fresh)
+        if not stale and previous.teams == teams:
+            return previous
+    else:
+        stale = set(teams)
+    
+    if not stale:
+        return matrix
+    
+    # Dosya imzaları tahminlerden önce alınır; hesaplama sırasında değişen dosya bir
+    # sonraki yenilemede tekrar hesaplanır
+    signatures = {team: _team_signature(stats_dir, team) for team in stale}
+    pairs = [(home, away) for home in teams for away in teams
+             if home != away and (home in stale or away in stale)]
+    matrix.fill(predict_fixtures(pairs, models, scaler), signatures)
+    return matrix
+
+# Süreç içinde paylaşılan matris
+_matrix_lock = threading.Lock()
+_matrix_cache = {}
+
+def refresh_prediction_matrix(models, scaler, model_version, path=None, stats_dir=STATS_DIR):
+    """
+    Diskteki (veya bellekteki) matrisi güncel verilere ve model sürümüne göre yeniler,
+    kaydeder ve döndürür. Eğitimden veya veri güncellemesinden sonra çağrılır.
+    """
+    path = path or os.path.join(MODELS_DIR, MATRIX_FILE)
+    with _matrix_lock:
+        previous = _matrix_cache.get(path) or PredictionMatrix.load(path)
+        matrix = build_prediction_matrix(models, scaler, model_version, previous, stats_dir)
+        if matrix is not previous:
+            matrix.save(path)
+        _matrix_cache[path] = matrix
+        return matrix
+
+def lookup_prediction(home_team, away_team, models, scaler, model_version, path=None, stats_dir=STATS_DIR):
+    """
+    Maçın tahminini önceden hesaplanmış matristen döndürür. Matris yoksa, model sürümü
+    değişmişse veya takımlardan birinin dosyası değişmişse matris önce yenilenir.
+    """
+    path = path or os.path.join(MODELS_DIR, MATRIX_FILE)
+    matrix = _matrix_cache.get(path)
+    if matrix is not None and matrix.model_version == model_version:
+        prediction = matrix.lookup(home_team, away_team)
+        if prediction is not None:
+            return prediction
+    matrix = refresh_prediction_matrix(models, scaler, model_version, path, stats_dir)
+    return matrix.lookup(home_team, away_team)
+
+def refresh_registry_matrix(registry):
+    """
+    Kayıttaki modellerle matrisi yeniler; hata olursa yazdırıp None döndürür.
+    """
+    try:
+        models, scaler = registry.load()
+        if models is None:
+            return None
+        return refresh_prediction_matrix(models, scaler, registry.version)
+    except Exception as e:
+        print(f"Tahmin matrisi hazırlanamadı: {str(e)}")
+        return None
+
+def predict_match(home_team, away_team, registry):
+    """
+    Maçın tahminini önce matristen, bulunamazsa kayıttaki MatchPredictor ile hesaplar.
+    """
+    try:
+        models, scaler = registry.load()
+        prediction = lookup_prediction(home_team, away_team, models, scaler, registry.version)
+        if prediction is not None:
+            return prediction
+    except Exception as e:
+        print(f"Tahmin matrisi kullanılamadı: {str(e)}")
+    return registry.predictor().predict(home_team, away_team)
+
+def main(argv=None):
+    """
+    Kayıtlı modellerle tahmin matrisini oluşturan/yenileyen komut satırı arayüzü.
+    """
+    from model_registry import model_registry
+    
+    parser = argparse.ArgumentParser(description="Tüm takım eşleşmelerinin tahmin matrisini hazırlar")
+    parser.add_argument('--output', help="Matrisin ayrıca yazılacağı CSV dosyası")
+    args = parser.parse_args(argv)
+    
+    models, scaler = model_registry.load()
+    if models is None:
+        print("HATA: Modeller yüklenemedi! Önce main.py ile modelleri eğitin.")
+        return 1
+    
+    matrix = refresh_prediction_matrix(models, scaler, model_registry.version)
+    frame = matrix.to_frame()
+    print(f"{len(frame)} maç tahmini {os.path.join(MODELS_DIR, MATRIX_FILE)} dosyasında.")
+    if args.output:
+        frame.to_csv(args.output, index=False, encoding='utf-8')
+        print(f"Tahminler {args.output} dosyasına kaydedildi.")
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
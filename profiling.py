@@ -0,0 +1,87 @@
+import argparse
+import cProfile
+import itertools
+import os
+import pstats
+import time
+
+# Profil dosyalarının yazıldığı klasör
+PROFILE_DIR = os.environ.get('PROFILE_DIR') or 'profiles'
+
+# Web isteklerinde profil açma anahtarı (?profile=1 veya X-Profile: 1); istemciler sunucuya
+# dosya yazdırabildiği için yalnızca REQUEST_PROFILING=1 ayarlıysa kullanılabilir
+REQUEST_PROFILING = os.environ.get('REQUEST_PROFILING') == '1'
+
+# Aynı saniyede yazılan dosyaların adları çakışmasın
+_profile_counter = itertools.count(1)
+
+def profile_path(name, profile_dir=PROFILE_DIR):
+    """
+    Çalıştırma için benzersiz bir .prof dosya yolu döndürür (ad-tarih-süreç-sıra.prof).
+    """
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    safe_name = ''.join(ch if ch.isalnum() or ch in '-_' else '_' for ch in name)
+    return os.path.join(profile_dir, f'{safe_name}-{stamp}-{os.getpid()}-{next(_profile_counter)}.prof')
+
+def start_profiler():
+    """
+    Geçerli iş parçacığı için cProfile başlatır. Başka bir profil zaten çalışıyorsa
+    (ör. eşzamanlı iki profilli istek) None döndürür.
+    """
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as e:
+        print(f"Profil başlatılamadı: {str(e)}")
+        return None
+    return profiler
+
+def save_profile(profiler, name, profile_dir=PROFILE_DIR):
+    """
+    Profili durdurup pstats dosyası olarak kaydeder ve yolunu döndürür. Dosya
+    'python -m pstats', snakeviz veya flameprof (alev grafiği) ile açılabilir.
+    """
+    profiler.disable()
+    os.makedirs(profile_dir, exist_ok=True)
+    path = profile_path(name, profile_dir)
+    profiler.dump_stats(path)
+    return path
+
+def print_profile(path, sort='cumulative', top=25):
+    """
+    Profil dosyasındaki en maliyetli top fonksiyonu yazdırır.
+    """
+    stats = pstats.Stats(path)
+    stats.strip_dirs().sort_stats(sort).print_stats(top)
+
+def profile_call(fn, *args, name='run', profile_dir=PROFILE_DIR, top=25, **kwargs):
+    """
+    fn'i cProfile altında çalıştırır, profili kaydeder ve özetini yazdırır.
+    fn hata verse bile o ana kadarki profil kaydedilir. fn'in sonucu döndürülür.
+    """
+    profiler = start_profiler()
+    if profiler is None:
+        return fn(*args, **kwargs)
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        path = save_profile(profiler, name, profile_dir)
+        print(f"\nProfil {path} dosyasına kaydedildi.")
+        if top:
+            print_profile(path, top=top)
+
+def main(argv=None):
+    """
+    Kaydedilmiş bir profil dosyasını özetleyen komut satırı arayüzü.
+    """
+    parser = argparse.ArgumentParser(description="cProfile dosyası özeti")
+    parser.add_argument('path', help="Profil dosyası (.prof)")
+    parser.add_argument('--sort', default='cumulative', help="Sıralama: cumulative, tottime, calls ...")
+    parser.add_argument('--top', type=int, default=30, help="Gösterilecek fonksiyon sayısı")
+    args = parser.parse_args(argv)
+    
+    print_profile(args.path, args.sort, args.top)
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,124 @@
+import os
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin, clone
+from sklearn.preprocessing import LabelEncoder
+from sklearn.svm import SVC
+from scipy.optimize import minimize
+from scipy.special import expit
+
+# SVC olasılıklarının kalibrasyon yöntemleri:
+# - platt: SVC(probability=True); libsvm eğitimde 5 katlı iç CV ile Platt ölçeklemesi yapar
+# - holdout: SVC bir kez eğitilir, Platt ölçeklemesi en yeni maçlardan ayrılan kısımda öğrenilir
+SVC_CALIBRATIONS = ['platt', 'holdout']
+
+# Varsayılan yöntem; SVC_CALIBRATION ortam değişkeniyle değiştirilebilir
+SVC_CALIBRATION = os.environ.get('SVC_CALIBRATION') or 'platt'
+
+# holdout yönteminde kalibrasyona ayrılan en yeni satırların oranı
+CALIBRATION_FRACTION = 0.2
+
+def platt_coefficients(scores, positive):
+    """
+    Platt ölçeklemesinin (a, b) katsayılarını bulur: P(sınıf) = 1 / (1 + exp(-(a * skor + b))).
+    Platt'ın önerdiği gibi hedefler 0/1 yerine sınıf sayılarıyla yumuşatılır.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    positive = np.asarray(positive, dtype=bool)
+    n_pos = positive.sum()
+    n_neg = len(positive) - n_pos
+    target = np.where(positive, (n_pos + 1.0) / (n_pos + 2.0), 1.0 / (n_neg + 2.0))
+    
+    def loss_grad(ab):
+        z = ab[0] * scores + ab[1]
+        residual = expit(z) - target
+        return np.sum(np.logaddexp(0, z) - target * z), np.array([residual @ scores, residual.sum()])
+    
+    start = np.array([0.0, np.log((n_pos + 1.0) / (n_neg + 1.0))])
+    return minimize(loss_grad, start, jac=True, method='L-BFGS-B').x
+
+class HoldoutCalibratedClassifier(ClassifierMixin, BaseEstimator):
+    """
+    SVC'yi satırların ilk kısmında bir kez eğitir ve her sınıfın karar skorunu son
+    calibration_fraction kadar satırda (zaman sırasındaki veride en yeni maçlar)
+    Platt ölçeklemesiyle olasılığa çevirir. SVC(probability=True)'nun eğitim
+    sırasındaki 5 katlı iç CV'si yerine tek bir uydurma yapılır; tahminde libsvm
+    yalnızca bir kez (ikili karşılaştırma skorları için) çağrılır.
+    """
+    def __init__(self, estimator, calibration_fraction=CALIBRATION_FRACTION):
+        self.estimator = estimator
+        self.calibration_fraction = calibration_fraction
+    
+    def fit(self, X, y):
+        y = np.asarray(y)
+        self.label_encoder_ = LabelEncoder().fit(y)
+        self.classes_ = self.label_encoder_.classes_
+        split = len(y) - int(len(y) * self.calibration_fraction)
+        
+        # Eğitim kısmındaki her sınıf kalibrasyon kısmında da bulunmalı; aksi halde
+        # (çok az veri) model tüm veriyle eğitilip aynı veriyle kalibre edilir
+        if not (0 < split < len(y) and np.isin(np.unique(y[:split]), y[split:]).all()):
+            split = len(y)
+        estimator = clone(self.estimator).set_params(decision_function_shape='ovo')
+        self.estimator_ = estimator.fit(X[:split], y[:split])
+        
+        # libsvm'in ikili karşılaştırma sırası (i < j) ve sınıf başına skor matrisleri
+        n_classes = len(estimator.classes_)
+        pairs = [(i, j) for i in range(n_classes) for j in range(i + 1, n_classes)]
+        self.pair_first_ = np.zeros((len(pairs), n_classes))
+        self.pair_second_ = np.zeros((len(pairs), n_classes))
+        for k, (i, j) in enumerate(pairs):
+            self.pair_first_[k, i] = 1.0
+            self.pair_second_[k, j] = 1.0
+        
+        calibration = slice(split, None) if split < len(y) else slice(None)
+        scores = self._class_scores(X[calibration])
+        y_calibration = y[calibration]
+        if n_classes == 2:
+            positives = [y_calibration == estimator.classes_[1]]
+        else:
+            positives = [y_calibration == label for label in estimator.classes_]
+        self.coef_ = np.array([platt_coefficients(column, positive)
+                               for column, positive in zip(scores.T, positives)])
+        # Modelin sınıflarının classes_ içindeki sütunları
+        self.columns_ = self.label_encoder_.transform(estimator.classes_)
+        return self
+    
+    def _class_scores(self, X):
+        """
+        Karar skorlarını döndürür: ikili sınıflandırmada tek sütun, çok sınıflıda
+        SVC'nin 'ovr' biçimiyle aynı sınıf başına oy + güven skoru.
+        """
+        decision = self.estimator_.decision_function(X)
+        if decision.ndim == 1:
+            return decision[:, None]
+        votes = (decision >= 0) @ self.pair_first_ + (decision < 0) @ self.pair_second_
+        confidence = decision @ (self.pair_first_ - self.pair_second_)
+        return votes + confidence / (3 * (np.abs(confidence) + 1))
+    
+    def predict_proba(self, X):
+        calibrated = expit(self._class_scores(X) * self.coef_[:, 0] + self.coef_[:, 1])
+        if calibrated.shape[1] == 1:
+            proba = np.hstack([1.0 - calibrated, calibrated])
+        else:
+            # Sınıf olasılıkları toplamı 1 olacak şekilde normalize edilir
+            total = calibrated.sum(axis=1, keepdims=True)
+            proba = np.where(total > 0, calibrated / np.where(total > 0, total, 1.0), 1.0 / calibrated.shape[1])
+        if len(self.columns_) == len(self.classes_):
+            return proba
+        # Eğitim kısmında görülmeyen sınıfların olasılığı sıfırdır
+        full = np.zeros((proba.shape[0], len(self.classes_)))
+        full[:, self.columns_] = proba
+        return full
+    
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+def svc_classifier(calibration=SVC_CALIBRATION, **params):
+    """
+    Olasılık tahmini yapan SVC'yi seçilen kalibrasyon yöntemiyle oluşturur.
+    """
+    if calibration not in SVC_CALIBRATIONS:
+        raise ValueError(f"Bilinmeyen SVC kalibrasyon yöntemi: {calibration} (seçenekler: {', '.join(SVC_CALIBRATIONS)})")
+    if calibration == 'holdout':
+        return HoldoutCalibratedClassifier(SVC(**params))
+    return SVC(probability=True, **params)
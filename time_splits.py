@@ -0,0 +1,93 @@
+import hashlib
+import os
+import numpy as np
+
+# Hesaplanan eğitim/test ayrımlarının ve CV katlarının saklandığı klasör
+SPLITS_DIR = os.path.join('models', 'splits')
+
+# Test setine ayrılan en yeni maçların oranı ve CV kat sayısı
+TEST_FRACTION = 0.2
+CV_SPLITS = 5
+
+def chronological_order(dates):
+    """
+    Satırları eskiden yeniye sıralayan kararlı indeksi döndürür; aynı tarihteki
+    maçlar yüklenme sırasını korur. Tarihi okunamayan (NaT) satırlar sona düşer.
+    """
+    return np.argsort(np.asarray(dates), kind='stable')
+
+def _snap_to_date(dates, position):
+    """
+    Sınırı, aynı tarihteki maçlar iki tarafa bölünmeyecek şekilde o tarihin ilk satırına çeker.
+    """
+    if position >= len(dates):
+        return len(dates)
+    return int(np.searchsorted(dates, dates[position], side='left'))
+
+def date_split_index(dates, test_fraction=TEST_FRACTION):
+    """
+    Tarihe göre sıralı satırlarda test setinin başladığı konumu döndürür. Yaklaşık
+    test_fraction kadar en yeni maç teste ayrılır; sınır tarihindeki tüm maçlar
+    (aynı maçın iki takım dosyasındaki kayıtları dahil) test tarafında kalır.
+    """
+    n = len(dates)
+    position = n - int(n * test_fraction)
+    snapped = _snap_to_date(dates, position)
+    return snapped if snapped > 0 else position
+
+def time_series_folds(dates, n_splits=CV_SPLITS):
+    """
+    Tarihe göre sıralı satırlar için genişleyen pencereli CV katlarını (test başlangıcı,
+    test bitişi) konumları olarak döndürür; her katın eğitim seti test başlangıcına kadardır.
+    TimeSeriesSplit sınırları tarih sınırlarına çekilir, böylece hiçbir kat
+    gelecekteki veya aynı günkü maçlarla eğitilmez.
+    """
+    # sklearn yalnızca eğitimde gerekir; tarih sıralaması için yüklenmesin
+    from sklearn.model_selection import TimeSeriesSplit
+    
+    n = len(dates)
+    bounds = []
+    for train_idx, test_idx in TimeSeriesSplit(n_splits=n_splits).split(np.empty((n, 1))):
+        test_start = _snap_to_date(dates, test_idx[0])
+        test_stop = _snap_to_date(dates, test_idx[-1] + 1)
+        if test_start > 0 and test_stop > test_start:
+            bounds.append((test_start, test_stop))
+    return np.array(bounds, dtype=np.int64).reshape(-1, 2)
+
+def fold_indices(bounds):
+    """
+    Kat sınırlarını (eğitim indeksleri, test indeksleri) listesine çevirir.
+    """
+    return [(np.arange(test_start), np.arange(test_start, test_stop)) for test_start, test_stop in bounds]
+
+def _splits_key(dates, test_fraction, n_splits):
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(np.asarray(dates, dtype='datetime64[ns]')).view(np.int64).tobytes())
+    digest.update(f'{test_fraction}:{n_splits}'.encode())
+    return digest.hexdigest()[:16]
+
+def load_splits(dates, test_fraction=TEST_FRACTION, n_splits=CV_SPLITS, splits_dir=SPLITS_DIR):
+    """
+    Tarihe göre sıralı satırlar için test başlangıcını ve eğitim kısmının CV katlarını
+    döndürür. Sonuç tarih dizisinin özetiyle diskte saklanır; aynı veriyle tekrarlanan
+    eğitimler ve deneyler aynı ayrımları yeniden hesaplamadan kullanır.
+    """
+    dates = np.asarray(dates, dtype='datetime64[ns]')
+    path = os.path.join(splits_dir, f'{_splits_key(dates, test_fraction, n_splits)}.npz')
+    if os.path.exists(path):
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                return int(data['test_start']), fold_indices(data['folds'])
+        except Exception as e:
+            print(f"Kayıtlı CV katları okunamadı, yeniden hesaplanacak: {str(e)}")
+    
+    test_start = date_split_index(dates, test_fraction)
+    folds = time_series_folds(dates[:test_start], n_splits)
+    try:
+        os.makedirs(splits_dir, exist_ok=True)
+        tmp_path = f'{path}.tmp-{os.getpid()}.npz'
+        np.savez(tmp_path, test_start=np.int64(test_start), folds=folds)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"CV katları kaydedilemedi: {str(e)}")
+    return test_start, fold_indices(folds)
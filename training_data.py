@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+from data_preprocessing import DERIVED_FEATURES, FEATURE_COLUMNS, HTFT_LABELS, result_codes
+from feature_store import STATS_DIR, STORE_DIR, fresh_feature_store
+from time_splits import chronological_order
+
+# Eğitim matrisinin veri tipi; ağaç modelleri zaten float32 ile çalışır
+FEATURE_DTYPE = np.float32
+
+# Depodan okunan ham özellik sütunları (oranlar okunduktan sonra hesaplanır)
+RAW_FEATURE_COLUMNS = [col for col in FEATURE_COLUMNS if col not in DERIVED_FEATURES]
+
+# Maç sonucu için hedef değişken (0: Mağlup, 1: Berabere, 2: Galip)
+RESULT_MAPPING = {'Galip': 2, 'Berabere': 1, 'Mağlup': 0}
+
+def _store_column(store, entry, col):
+    """
+    Takımın depodaki sütununu float64 dizi olarak mmap'ten okur; eksik değerler NaN olur.
+    Takımda bulunmayan sütunlar tamamen eksik sayılır (özellik matrisinde 0 olur).
+    """
+    start, stop = entry['start'], entry['stop']
+    if col not in entry['columns']:
+        return np.full(stop - start, np.nan)
+    kind, pos = store.manifest['layout'][col]
+    if kind == 'numeric':
+        return np.asarray(store.numeric[start:stop, pos], dtype=np.float64)
+    values = store.text[start:stop, pos].astype(object)
+    values[store.text_missing[start:stop, pos]] = np.nan
+    return pd.to_numeric(values).astype(np.float64)
+
+def _store_results(store, entry):
+    """
+    Takımın maç sonuçlarını RESULT_MAPPING kodlarına çevirir; bilinmeyen sonuçlar NaN olur.
+    """
+    start, stop = entry['start'], entry['stop']
+    codes = np.full(stop - start, np.nan)
+    if 'Sonuç' not in entry['columns']:
+        return codes
+    kind, pos = store.manifest['layout']['Sonuç']
+    if kind != 'text':
+        return codes
+    results = store.text[start:stop, pos]
+    present = ~store.text_missing[start:stop, pos]
+    for label, code in RESULT_MAPPING.items():
+        codes[present & (results == label)] = code
+    return codes
+
+def load_training_data(stats_dir=STATS_DIR, dtype=FEATURE_DTYPE, store_dir=STORE_DIR, return_teams=False):
+    """
+    Tüm takımların eğitim verisini prepare_features(load_all_teams()) ile aynı
+    değerlerle, ancak düşük bellekle hazırlar. Veri derlenmiş özellik deposundan
+    (feature_store.py; gerekiyorsa artımlı olarak güncellenir) okunur: yalnızca
+    özellik, sonuç ve tarih sütunları mmap edilmiş dizilerden takım takım alınır ve
+    önceden ayrılmış tek bir matrise doğrudan yazılır; DataFrame oluşturulmaz.
+    Satırlar sonunda tüm takımlar için eskiden yeniye sıralanır ve özelliklerin
+    indeksi maç tarihleri olur (bkz. time_splits.py). Sonuç prepare_features gibi
+    (özellikler, maç sonucu, skor, İY/MS, KG) döndürülür; return_teams=True ise
+    sona her satırın takımı da eklenir (artımlı güncelleme yeni maçları bununla bulur).
+    """
+    store, teams = fresh_feature_store(stats_dir, store_dir)
+    entries = [store.manifest['teams'][team] for team in teams]
+    capacity = sum(entry['stop'] - entry['start'] for entry in entries)
+    
+    # Sütun öncelikli: her sütun bitişik olur ve yeniden sıralama sütun sütun yapılabilir
+    features = np.zeros((capacity, len(FEATURE_COLUMNS)), dtype=dtype, order='F')
+    dates = np.empty(capacity, dtype='datetime64[ns]')
+    y_match = np.empty(capacity, dtype=np.float64)
+    y_score = np.empty(capacity, dtype=np.float64)
+    y_htft = np.empty(capacity, dtype=np.int8)
+    y_btts = np.empty(capacity, dtype=bool)
+    team_codes = np.empty(capacity, dtype=np.int32)
+    column_index = {col: i for i, col in enumerate(FEATURE_COLUMNS)}
+    
+    offset = 0
+    for code, entry in enumerate(entries):
+        stop = offset + entry['stop'] - entry['start']
+        team_codes[offset:stop] = code
+        
+        # Ham sütunlar; eksik değerler prepare_features'taki gibi 0 olur
+        values = {}
+        for col in RAW_FEATURE_COLUMNS:
+            column = _store_column(store, entry, col)
+            values[col] = np.where(np.isnan(column), 0.0, column)
+            features[offset:stop, column_index[col]] = values[col]
+        for col, (numerator, denominator) in DERIVED_FEATURES.items():
+            divisor = values[denominator]
+            features[offset:stop, column_index[col]] = values[numerator] / np.where(divisor == 0, 1, divisor)
+        
+        dates[offset:stop] = store.dates[entry['start']:entry['stop']]
+        goals_for, goals_against = values['MS Gol'], values['MS Yenilen Gol']
+        y_match[offset:stop] = _store_results(store, entry)
+        y_score[offset:stop] = goals_for
+        y_htft[offset:stop] = (result_codes(values['İY Gol'], values['İY Yenilen Gol']) * 3
+                               + result_codes(goals_for, goals_against))
+        y_btts[offset:stop] = (goals_for > 0) & (goals_against > 0)
+        offset = stop
+    
+    # Tüm takımların maçlarını eskiden yeniye sırala; matris sütun sütun yerinde sıralanır
+    order = chronological_order(dates)
+    for i in range(features.shape[1]):
+        features[:, i] = features[order, i]
+    index = pd.DatetimeIndex(dates[order], name='Tarih')
+    
+    X = pd.DataFrame(features, index=index, columns=FEATURE_COLUMNS, copy=False)
+    y_match = y_match[order]
+    if not np.isnan(y_match).any():
+        y_match = y_match.astype(np.int64)
+    data = (
+        X,
+        pd.Series(y_match, index=index, name='Sonuç'),
+        pd.Series(y_score[order], index=index, name='MS Gol'),
+        pd.Series(HTFT_LABELS[y_htft[order]], index=index),
+        pd.Series(y_btts[order], index=index)
+    )
+    if return_teams:
+        row_teams = pd.Series(pd.Categorical.from_codes(team_codes[order], categories=teams), index=index, name='Takım')
+        return data + (row_teams,)
+    return data